@@ -1,9 +1,77 @@
+import calendar
+import math
+import os
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from datetime import datetime
 
+from pricing_analysis import (
+    COMMITMENT_TERMS,
+    GOAL_METRICS,
+    GOAL_VARIABLES,
+    GROWTH_DISTRIBUTIONS,
+    SENSITIVITY_PARAMETERS,
+    VOLUME_DISTRIBUTIONS,
+    break_even_volume,
+    sensitivity_parameters,
+    sweep_values,
+    validate_commitment_terms,
+)
+from pricing_caches import (
+    cached_break_even_chart,
+    cached_break_even_table,
+    cached_burn_down,
+    cached_burn_down_chart,
+    cached_commitment,
+    cached_commitment_chart,
+    cached_comparison,
+    cached_comparison_chart,
+    cached_cost_csv,
+    cached_cost_parquet,
+    cached_cost_per_query_chart,
+    cached_cost_pie,
+    cached_costs,
+    cached_costs_cents,
+    cached_executive_summary,
+    cached_fan_chart,
+    cached_goal_seek,
+    cached_monthly_chart,
+    cached_monthly_timeline,
+    cached_multiyear_chart,
+    cached_sensitivity_grid,
+    cached_sensitivity_heatmap,
+    cached_simulation,
+    cached_store,
+    cached_summary_table,
+    cached_tco_by_volume,
+    cached_tornado_analysis,
+    cached_tornado_chart,
+    cached_usage_bytes,
+    cached_usage_file,
+    cached_volume_paths,
+)
+from pricing_engine import (
+    CREDIT_PRICING_OPTIONS,
+    CREDIT_ROUNDING_OPTIONS,
+    DEPLOYMENT_MODELS,
+    GROWTH_CURVE_OPTIONS,
+    SIZE_TEMPLATES,
+    aggregate_monthly_to_yearly,
+    batch_table,
+    calculate_costs_cents,
+    deployment_pricing,
+    estimate_queries_from_phases,
+    format_number,
+    growth_factor,
+    tiered_consumption_cost,
+    validate_growth_curve,
+)
+from pricing_exports import EXPORT_FORMATS
+from pricing_graph import DerivedGraph
+from pricing_profiler import NULL_PROFILER, PROFILE_HISTORY, RerunProfiler, history_table
+from pricing_store import DEFAULT_STORE_PATH, quote_hash
+from pricing_usage import USAGE_LOG_DIR, fitted_queries_per_credit, list_usage_logs, usage_log_path
+
 # Page configuration
 st.set_page_config(
     page_title="AI Platform - Pricing Calculator",
@@ -12,6 +80,13 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Render profiling, opt-in with PRICING_PROFILE=1 or ?profile=1 (debug panel at the bottom of the sidebar)
+if os.environ.get('PRICING_PROFILE') == '1' or st.experimental_get_query_params().get('profile') == ['1']:
+    profiler = RerunProfiler(use_cprofile=st.session_state.get('profile_cprofile', False))
+else:
+    profiler = NULL_PROFILER
+profiler.section("Setup")
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -64,119 +139,121 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Deployment models with queries per credit
-DEPLOYMENT_MODELS = {
-    'Customer VPC': {
-        'queries_per_credit': 400,
-        'description': 'Deploy in your own Virtual Private Cloud',
-        'benefits': ['4x query efficiency', 'Full data control', 'Lowest cost per query'],
-        'considerations': ['Infrastructure management', 'VPC setup required']
-    },
-    'Uniphore VPC': {
-        'queries_per_credit': 100,
-        'description': 'Deploy in Uniphore-managed cloud',
-        'benefits': ['Fastest time to value', 'Zero infrastructure overhead', 'Managed updates'],
-        'considerations': ['Higher consumption cost', 'Shared infrastructure']
-    }
-}
+# One store per server, shared by every session
+scenario_store = cached_store(DEFAULT_STORE_PATH)
 
-# Customer size templates
-SIZE_TEMPLATES = {
-    'Small': {
-        'annual_queries': 125000,
-        'description': 'Small team or pilot deployment',
-        'typical_profile': '10-25 users, single use case'
-    },
-    'Medium': {
-        'annual_queries': 200000,
-        'description': 'Department-level deployment',
-        'typical_profile': '25-100 users, 2-3 use cases'
-    },
-    'Large': {
-        'annual_queries': 300000,
-        'description': 'Enterprise-wide deployment',
-        'typical_profile': '100+ users, multiple use cases'
-    },
-    'Custom': {
-        'annual_queries': 0,
-        'description': 'Define your own volume',
-        'typical_profile': 'Customize based on your needs'
-    }
-}
+# Derived values (costs, comparison, TCO, exports) are nodes of a dependency
+# graph kept per session, so a rerun only recomputes what is downstream of the
+# inputs that changed; the shared caches (pricing_caches) still serve the rest
+if 'derived_graph' not in st.session_state:
+    st.session_state.derived_graph = DerivedGraph()
+graph = st.session_state.derived_graph
+graph.begin_rerun()
 
-def format_number(value, decimals=0, prefix='', suffix=''):
-    """Format numbers with commas"""
-    if decimals == 0:
-        formatted = f"{value:,.0f}"
-    else:
-        formatted = f"{value:,.{decimals}f}"
-    return f"{prefix}{formatted}{suffix}"
-
-def calculate_costs(annual_queries, platform_fee, credit_cost, queries_per_credit, years=3, growth_rate=0):
-    """Calculate comprehensive cost breakdown"""
-    results = []
-    
-    for year in range(1, years + 1):
-        # Apply growth rate
-        year_queries = annual_queries * ((1 + growth_rate) ** (year - 1))
-        
-        # Credits needed
-        credits_needed = year_queries / queries_per_credit
-        
-        # Consumption cost
-        consumption_cost = credits_needed * credit_cost
-        
-        # Total annual cost
-        total_cost = platform_fee + consumption_cost
-        
-        # Derived metrics
-        cost_per_query = total_cost / year_queries
-        monthly_cost = total_cost / 12
-        
-        results.append({
-            'year': year,
-            'queries': year_queries,
-            'credits_needed': credits_needed,
-            'platform_fee': platform_fee,
-            'consumption_cost': consumption_cost,
-            'total_cost': total_cost,
-            'cost_per_query': cost_per_query,
-            'monthly_cost': monthly_cost
-        })
-    
-    return results
-
-def estimate_queries_from_phases(build_months, build_queries_per_month, run_months, run_queries_per_month):
-    """Estimate annual queries from build and run phases"""
-    build_total = build_months * build_queries_per_month
-    run_total = run_months * run_queries_per_month
-    return build_total + run_total
+# Time the pricing and export calls (no-op unless profiling)
+cached_costs = profiler.timed("calculate_costs", cached_costs)
+cached_costs_cents = profiler.timed("calculate_costs_cents", cached_costs_cents)
+cached_monthly_timeline = profiler.timed("monthly_timeline", cached_monthly_timeline)
+cached_simulation = profiler.timed("simulate_costs", cached_simulation)
+cached_volume_paths = profiler.timed("simulate_volume_paths", cached_volume_paths)
+cached_commitment = profiler.timed("optimize_commitment", cached_commitment)
+cached_usage_file = profiler.timed("aggregate_usage_file", cached_usage_file)
+cached_usage_bytes = profiler.timed("aggregate_usage_bytes", cached_usage_bytes)
+cached_burn_down = profiler.timed("burn_down", cached_burn_down)
+cached_sensitivity_grid = profiler.timed("sensitivity_grid", cached_sensitivity_grid)
+cached_tornado_analysis = profiler.timed("tornado_analysis", cached_tornado_analysis)
+cached_break_even_table = profiler.timed("break_even_table", cached_break_even_table)
+cached_comparison = profiler.timed("compare_deployments", cached_comparison)
+cached_goal_seek = profiler.timed("goal_seek", cached_goal_seek)
+cached_tco_by_volume = profiler.timed("tco_by_volume", cached_tco_by_volume)
+cached_summary_table = profiler.timed("build_summary_table", cached_summary_table)
+cached_cost_csv = profiler.timed("build_cost_csv", cached_cost_csv)
+cached_cost_parquet = profiler.timed("build_cost_parquet", cached_cost_parquet)
+cached_executive_summary = profiler.timed("build_executive_summary", cached_executive_summary)
 
 # Sidebar - Configuration
+profiler.section("Sidebar")
 with st.sidebar:
     st.title("💰 Pricing Calculator")
     
     st.markdown("### 🏢 Platform Configuration")
     
-    platform_fee = st.number_input(
-        "Annual Platform Fee ($)",
-        min_value=0,
-        max_value=1000000,
-        value=150000,
-        step=10000,
-        format="%d",
-        help="Fixed annual access fee"
+    # Forms hold their inputs until Apply, so editing several values reruns the page once
+    with st.form("platform_pricing"):
+        platform_fee = st.number_input(
+            "Annual Platform Fee ($)",
+            min_value=0,
+            max_value=1000000,
+            value=150000,
+            step=10000,
+            format="%d",
+            help="Fixed annual access fee"
+        )
+        
+        credit_cost = st.number_input(
+            "Cost per Credit ($)",
+            min_value=1,
+            max_value=100,
+            value=5,
+            step=1,
+            format="%d",
+            help="Price of each consumption credit"
+        )
+        
+        st.form_submit_button("Apply", use_container_width=True)
+    
+    credit_pricing = st.radio(
+        "Credit Pricing",
+        options=list(CREDIT_PRICING_OPTIONS),
+        help="Flat price per credit, or a tiered price book applied to each year's credits"
     )
     
-    credit_cost = st.number_input(
-        "Cost per Credit ($)",
-        min_value=1,
-        max_value=100,
-        value=5,
-        step=1,
-        format="%d",
-        help="Price of each consumption credit"
+    credit_schedule = None
+    if credit_pricing != 'Flat':
+        tiers_df = st.data_editor(
+            pd.DataFrame({
+                'up_to': [500, 2500, None],
+                'credit_cost': [credit_cost, credit_cost * 0.9, credit_cost * 0.8]
+            }),
+            column_config={
+                'up_to': st.column_config.NumberColumn("Up to (credits/yr)", min_value=1, step=1, help="Leave the last tier empty (open-ended)"),
+                'credit_cost': st.column_config.NumberColumn("$ / Credit", min_value=0.0, format="$%.2f")
+            },
+            num_rows="dynamic",
+            hide_index=True,
+            key=f"credit_tiers_{credit_pricing}"
+        )
+        credit_schedule = {
+            'mode': CREDIT_PRICING_OPTIONS[credit_pricing],
+            'tiers': [
+                {'up_to': None if pd.isna(row.up_to) else row.up_to, 'credit_cost': row.credit_cost}
+                for row in tiers_df.dropna(subset=['credit_cost']).sort_values('up_to', na_position='last').itertuples()
+            ]
+        }
+        if credit_pricing == 'Committed Bands':
+            credit_schedule['committed_credits'] = st.number_input(
+                "Committed Credits per Year",
+                min_value=0,
+                value=1000,
+                step=100,
+                help="Band rate is set by the commitment; billed for the greater of usage and commitment"
+            )
+        try:
+            tiered_consumption_cost(0, credit_schedule)
+        except ValueError as error:
+            st.error(f"{error}. Using flat pricing.")
+            credit_schedule = None
+    
+    exact_cents = st.checkbox(
+        "Exact cents",
+        help="Price in integer cents so every year, total and export agrees to the cent"
     )
+    if exact_cents:
+        credit_rounding = CREDIT_ROUNDING_OPTIONS[st.selectbox(
+            "Credit Rounding",
+            options=list(CREDIT_ROUNDING_OPTIONS),
+            help="How each year's credits are billed; volumes are rounded to whole queries"
+        )]
     
     st.markdown("---")
     st.markdown("### 🌐 Deployment Model")
@@ -189,12 +266,20 @@ with st.sidebar:
     
     queries_per_credit = DEPLOYMENT_MODELS[deployment_model]['queries_per_credit']
     
+    # Every model's pricing terms: its own registry prices where set, else the prices above
+    deployment_terms = deployment_pricing(platform_fee, credit_cost)
+    own_pricing = ""
+    if (deployment_terms[deployment_model]['platform_fee'], deployment_terms[deployment_model]['credit_cost']) != (platform_fee, credit_cost):
+        platform_fee = deployment_terms[deployment_model]['platform_fee']
+        credit_cost = deployment_terms[deployment_model]['credit_cost']
+        own_pricing = f"<br><small>Own pricing: {format_number(platform_fee, prefix='$')} platform fee, {format_number(credit_cost, decimals=2, prefix='$')}/credit</small>"
+    
     # Show deployment details
     st.markdown(f"""
         <div class="deployment-card">
-        <strong>{deployment_model}</strong><br>
+        <strong>{DEPLOYMENT_MODELS[deployment_model]['icon']} {deployment_model}</strong><br>
         <span style="font-size: 24px; color: #007bff;">{queries_per_credit} queries/credit</span><br>
-        <small>{DEPLOYMENT_MODELS[deployment_model]['description']}</small>
+        <small>{DEPLOYMENT_MODELS[deployment_model]['description']}</small>{own_pricing}
         </div>
     """, unsafe_allow_html=True)
     
@@ -207,19 +292,38 @@ with st.sidebar:
             value=queries_per_credit,
             step=50
         )
+
+    # Ratio fitted from a query log loaded in the Usage Burn-down section
+    fitted_ratio = st.session_state.get('fitted_queries_per_credit', {}).get(deployment_model)
+    if fitted_ratio and st.checkbox(f"Use ratio fitted from usage log ({fitted_ratio:,.0f} queries/credit)"):
+        # Whole queries per credit, as exact pricing needs
+        queries_per_credit = round(fitted_ratio)
+
+    # Checked once the pricing terms and ratio are final
+    if exact_cents:
+        try:
+            calculate_costs_cents(1, platform_fee, credit_cost, queries_per_credit, 1, 0, credit_schedule, credit_rounding)
+        except ValueError as error:
+            st.error(f"{error}. Using standard pricing.")
+            exact_cents = False
     
     st.markdown("---")
     st.markdown("### 📊 Volume Estimation Method")
     
     estimation_method = st.radio(
         "How do you want to estimate volume?",
-        options=['Size Template', 'Build & Run Phases', 'Direct Input']
+        options=['Size Template', 'Build & Run Phases', 'Direct Input', 'Goal Seek']
     )
 
 # Main content area
 st.title("🎯 AI Platform Pricing & Cost Calculator")
 
+# Goal seek: default target per metric, and the multiples of the target solved alongside it
+GOAL_DEFAULTS = {'total_cost': 300000.0, 'tco': 900000.0, 'cost_per_query': 0.8}
+GOAL_LADDER = [0.5, 0.75, 1, 1.25, 1.5]
+
 # Volume estimation based on selected method
+profiler.section("Volume Estimation")
 if estimation_method == 'Size Template':
     st.markdown("## 📏 Select Customer Size Template")
     
@@ -282,53 +386,56 @@ elif estimation_method == 'Build & Run Phases':
         </div>
     """, unsafe_allow_html=True)
     
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("### 🏗️ Build Phase")
-        build_months = st.slider(
-            "Build Phase Duration (months)",
-            min_value=1,
-            max_value=12,
-            value=3,
-            help="Typical: 2-4 months for development and pilot"
-        )
+    with st.form("phase_inputs"):
+        col1, col2 = st.columns(2)
         
-        build_queries_per_month = st.number_input(
-            "Queries per Month (Build)",
-            min_value=1000,
-            max_value=1000000,
-            value=20000,
-            step=1000,
-            format="%d",
-            help="Higher volume during testing and tuning"
-        )
+        with col1:
+            st.markdown("### 🏗️ Build Phase")
+            build_months = st.slider(
+                "Build Phase Duration (months)",
+                min_value=1,
+                max_value=12,
+                value=3,
+                help="Typical: 2-4 months for development and pilot"
+            )
+            
+            build_queries_per_month = st.number_input(
+                "Queries per Month (Build)",
+                min_value=1000,
+                max_value=1000000,
+                value=20000,
+                step=1000,
+                format="%d",
+                help="Higher volume during testing and tuning"
+            )
+            
+            build_total = build_months * build_queries_per_month
+            st.metric("Build Phase Total", format_number(build_total))
         
-        build_total = build_months * build_queries_per_month
-        st.metric("Build Phase Total", format_number(build_total))
-    
-    with col2:
-        st.markdown("### 🚀 Run Phase")
-        run_months = st.slider(
-            "Run Phase Duration (months)",
-            min_value=1,
-            max_value=12,
-            value=9,
-            help="Remaining months in year 1"
-        )
+        with col2:
+            st.markdown("### 🚀 Run Phase")
+            run_months = st.slider(
+                "Run Phase Duration (months)",
+                min_value=1,
+                max_value=12,
+                value=9,
+                help="Remaining months in year 1"
+            )
+            
+            run_queries_per_month = st.number_input(
+                "Queries per Month (Run)",
+                min_value=1000,
+                max_value=1000000,
+                value=15000,
+                step=1000,
+                format="%d",
+                help="Steady-state production volume"
+            )
+            
+            run_total = run_months * run_queries_per_month
+            st.metric("Run Phase Total", format_number(run_total))
         
-        run_queries_per_month = st.number_input(
-            "Queries per Month (Run)",
-            min_value=1000,
-            max_value=1000000,
-            value=15000,
-            step=1000,
-            format="%d",
-            help="Steady-state production volume"
-        )
-        
-        run_total = run_months * run_queries_per_month
-        st.metric("Run Phase Total", format_number(run_total))
+        st.form_submit_button("Apply")
     
     annual_queries = estimate_queries_from_phases(
         build_months, build_queries_per_month,
@@ -342,6 +449,54 @@ elif estimation_method == 'Build & Run Phases':
         </div>
     """, unsafe_allow_html=True)
 
+elif estimation_method == 'Goal Seek':
+    st.markdown("## 🎯 Goal Seek")
+    st.caption("Work back from a budget or a target cost per query to the volume, credit price or platform fee that reaches it")
+
+    goal_metric_by_label = {label: name for name, label in GOAL_METRICS.items()}
+    goal_variable_by_label = {label: name for name, label in GOAL_VARIABLES.items()}
+
+    with st.form("goal_inputs"):
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            goal_metric = goal_metric_by_label[st.selectbox(
+                "Target",
+                options=list(goal_metric_by_label),
+                help="Projection TCO and the average cost per query use the projection period and growth below"
+            )]
+
+        with col2:
+            goal_target = st.number_input(
+                GOAL_METRICS[goal_metric],
+                min_value=0.0,
+                value=GOAL_DEFAULTS[goal_metric],
+                step=0.01 if goal_metric == 'cost_per_query' else 10000.0,
+                format="%.4f" if goal_metric == 'cost_per_query' else "%.0f",
+                key=f"goal_target_{goal_metric}"
+            )
+
+        with col3:
+            goal_solve_for = goal_variable_by_label[st.selectbox(
+                "Solve For",
+                options=list(goal_variable_by_label),
+                help="The other inputs come from the sidebar and the projection settings"
+            )]
+
+        if goal_solve_for != 'annual_queries':
+            annual_queries = st.number_input(
+                "Annual Query Volume",
+                min_value=1000,
+                max_value=10000000,
+                value=200000,
+                step=10000,
+                format="%d"
+            )
+
+        st.form_submit_button("Apply")
+
+    st.caption("The result is shown under the Multi-Year Projection settings, which the solve uses.")
+
 else:  # Direct Input
     st.markdown("## 🎯 Direct Volume Input")
     
@@ -359,41 +514,234 @@ else:  # Direct Input
 st.markdown("---")
 st.markdown("## 📈 Multi-Year Projection")
 
-col1, col2 = st.columns(2)
+with st.form("projection_inputs"):
+    col1, col2, col3 = st.columns(3)
 
-with col1:
-    projection_years = st.slider(
-        "Projection Period (years)",
-        min_value=1,
-        max_value=5,
-        value=3
+    with col1:
+        projection_years = st.slider(
+            "Projection Period (years)",
+            min_value=1,
+            max_value=5,
+            value=3
+        )
+
+    with col2:
+        growth_rate = st.slider(
+            "Annual Growth Rate (%)",
+            min_value=0,
+            max_value=50,
+            value=15,
+            help="Expected year-over-year query volume growth"
+        ) / 100
+
+    with col3:
+        growth_curve_type = GROWTH_CURVE_OPTIONS[st.selectbox(
+            "Growth Curve",
+            options=list(GROWTH_CURVE_OPTIONS),
+            help="Shape of volume growth over the projection; Apply to show the curve's settings"
+        )]
+
+    growth_curve = None if growth_curve_type == 'compound' else {'type': growth_curve_type}
+    if growth_curve_type == 'logistic':
+        growth_curve['saturation'] = st.number_input(
+            "Saturation (x Year 1 volume)",
+            min_value=1.1,
+            max_value=20.0,
+            value=3.0,
+            step=0.5,
+            help="Volume the adoption S-curve levels off at; the growth rate sets the Year 2 step"
+        )
+    elif growth_curve_type == 'custom':
+        curve_upload = st.file_uploader(
+            "Upload a curve (CSV)",
+            type=['csv'],
+            help="A 'factor' column (or the first column), one row per year from Year 1"
+        )
+        if curve_upload is not None:
+            curve_frame = pd.read_csv(curve_upload)
+            curve_column = curve_frame['factor'] if 'factor' in curve_frame else curve_frame.iloc[:, 0]
+            curve_factors = pd.to_numeric(curve_column, errors='coerce').dropna().tolist()
+        else:
+            curve_factors = st.data_editor(
+                pd.DataFrame({'year': range(1, 6), 'factor': [1.0, 1.5, 2.0, 2.5, 3.0]}),
+                column_config={
+                    'year': st.column_config.NumberColumn("Year", disabled=True),
+                    'factor': st.column_config.NumberColumn("x Year 1 Volume", min_value=0.0, format="%.2f")
+                },
+                hide_index=True,
+                key="custom_growth_curve"
+            )['factor'].dropna().tolist()
+        growth_curve['factors'] = curve_factors
+
+    if st.checkbox("Seasonal monthly profile", help="Shape the monthly timeline by month; annual volumes are unchanged"):
+        seasonality_df = st.data_editor(
+            pd.DataFrame({'month': list(calendar.month_abbr)[1:], 'weight': [1.0] * 12}),
+            column_config={
+                'month': st.column_config.TextColumn("Month", disabled=True),
+                'weight': st.column_config.NumberColumn("Relative Volume", min_value=0.0, format="%.2f")
+            },
+            hide_index=True,
+            key="growth_seasonality"
+        )
+        growth_curve = dict(growth_curve or {'type': 'compound'}, seasonality=seasonality_df['weight'].fillna(0).tolist())
+
+    st.form_submit_button("Apply")
+
+try:
+    validate_growth_curve(growth_curve)
+    growth_factor(growth_rate, 1, growth_curve)
+except ValueError as error:
+    st.error(f"{error}. Using compound growth.")
+    growth_curve = None
+
+# Goal seek: solve for the chosen input, with a ladder of targets around it in the same call
+if estimation_method == 'Goal Seek':
+    goal_inputs = {
+        'annual_queries': annual_queries if goal_solve_for != 'annual_queries' else None,
+        'platform_fee': platform_fee,
+        'credit_cost': credit_cost,
+        'queries_per_credit': queries_per_credit,
+        'years': projection_years,
+        'growth_rate': growth_rate,
+        'credit_schedule': credit_schedule,
+        'growth_curve': growth_curve,
+        'credit_rounding': credit_rounding if exact_cents else None,
+    }
+    goal_targets = [goal_target * step for step in GOAL_LADDER]
+
+    def format_goal(value):
+        if math.isnan(value):
+            return '—'
+        if goal_solve_for == 'annual_queries':
+            return format_number(value, suffix=' queries/yr')
+        return format_number(value, decimals=2 if goal_solve_for == 'credit_cost' else 0, prefix='$')
+
+    st.markdown("### 🎯 Goal Seek Result")
+    try:
+        goal_solutions = cached_goal_seek(goal_targets, goal_metric, goal_solve_for, **goal_inputs).tolist()
+    except ValueError as error:
+        st.error(f"{error}.")
+        goal_solutions = [float('nan')] * len(goal_targets)
+
+    solved = goal_solutions[GOAL_LADDER.index(1)]
+    if math.isnan(solved):
+        fallback = SIZE_TEMPLATES['Medium']['annual_queries'] if goal_solve_for == 'annual_queries' else \
+            {'credit_cost': credit_cost, 'platform_fee': platform_fee}[goal_solve_for]
+        st.warning(f"No {GOAL_VARIABLES[goal_solve_for].lower()} reaches this target with the current inputs; "
+                   f"showing {format_goal(fallback)}.")
+        solved = fallback
+    else:
+        st.metric(GOAL_VARIABLES[goal_solve_for], format_goal(solved),
+                  help=f"Reaches {GOAL_METRICS[goal_metric].lower()} of {format_number(goal_target, decimals=4 if goal_metric == 'cost_per_query' else 0, prefix='$')}")
+
+    st.dataframe(
+        {
+            GOAL_METRICS[goal_metric]: [format_number(target, decimals=4 if goal_metric == 'cost_per_query' else 0, prefix='$')
+                                        for target in goal_targets],
+            GOAL_VARIABLES[goal_solve_for]: [format_goal(value) for value in goal_solutions],
+        },
+        use_container_width=True,
+        hide_index=True
     )
 
-with col2:
-    growth_rate = st.slider(
-        "Annual Growth Rate (%)",
-        min_value=0,
-        max_value=50,
-        value=15,
-        help="Expected year-over-year query volume growth"
-    ) / 100
+    if goal_solve_for == 'annual_queries':
+        annual_queries = solved
+    else:
+        if goal_solve_for == 'credit_cost':
+            credit_cost = solved
+        else:
+            platform_fee = solved
+        # The solved price replaces the quote's price in every model that doesn't set its own
+        deployment_terms = {
+            name: dict(terms, **{goal_solve_for: solved})
+            if name == deployment_model or DEPLOYMENT_MODELS[name].get(goal_solve_for) is None else terms
+            for name, terms in deployment_terms.items()
+        }
 
-# Calculate costs for selected deployment
-costs = calculate_costs(
-    annual_queries,
-    platform_fee,
-    credit_cost,
-    queries_per_credit,
-    projection_years,
-    growth_rate
+# Pricing inputs are final from here on (goal seek may have solved one of them)
+graph.set(
+    annual_queries=annual_queries,
+    platform_fee=platform_fee,
+    credit_cost=credit_cost,
+    queries_per_credit=queries_per_credit,
+    deployment_model=deployment_model,
+    deployment_terms=deployment_terms,
+    years=projection_years,
+    growth_rate=growth_rate,
+    growth_curve=growth_curve,
+    credit_schedule=credit_schedule,
+    credit_pricing=credit_pricing if credit_schedule else 'Flat',
+    credit_rounding=credit_rounding if exact_cents else None,
+    generated=datetime.now().strftime('%Y-%m-%d %H:%M'),
 )
 
+def project_costs(credit_rounding, **inputs):
+    """Multi-year costs, in exact cents when credit_rounding is set"""
+    if credit_rounding is None:
+        return cached_costs(**inputs)
+    return cached_costs_cents(credit_rounding=credit_rounding, **inputs)
+
+def summarize_tco(costs):
+    """Projection totals"""
+    total_tco = costs.total('total_cost')
+    total_queries = costs.total('queries')
+    return {'total_cost': total_tco, 'queries': total_queries, 'cost_per_query': total_tco / total_queries}
+
+def summarize_comparison(comparison):
+    """Year 1 costs per model and the cheapest model against the next cheapest"""
+    comparison_costs = {name: model_costs[0] for name, model_costs in comparison['costs'].items()}
+    cheaper_option = comparison['cheapest'][0]
+    runner_up = comparison['cheapest'][min(1, len(comparison['cheapest']) - 1)]
+    cost_difference = comparison_costs[runner_up]['total_cost'] - comparison_costs[cheaper_option]['total_cost']
+    return {
+        'comparison_costs': comparison_costs,
+        'cheaper_option': cheaper_option,
+        'runner_up': runner_up,
+        'cost_difference': cost_difference,
+        'cost_difference_pct': (cost_difference / comparison_costs[runner_up]['total_cost']) * 100,
+    }
+
+def build_summary_text(comparison_summary, **inputs):
+    """Executive summary text"""
+    return cached_executive_summary(
+        comparison_costs=comparison_summary['comparison_costs'],
+        cost_difference=comparison_summary['cost_difference'],
+        cost_difference_pct=comparison_summary['cost_difference_pct'],
+        cheaper_option=comparison_summary['cheaper_option'],
+        **inputs
+    )
+
+graph.node('costs', project_costs, 'annual_queries', 'platform_fee', 'credit_cost', 'queries_per_credit', 'years',
+           'growth_rate', 'credit_schedule', 'growth_curve', 'credit_rounding')
+graph.node('year1', lambda costs: costs[0], 'costs')
+graph.node('tco', summarize_tco, 'costs')
+graph.node('summary_table', cached_summary_table, 'costs')
+graph.node('cost_pie', cached_cost_pie, 'year1', 'deployment_model')
+graph.node('multiyear_chart', cached_multiyear_chart, 'costs', 'growth_rate', 'growth_curve')
+graph.node('cost_per_query_chart', cached_cost_per_query_chart, 'costs')
+# Year 1 of every model, without growth: projection settings don't reach it
+graph.node('comparison', cached_comparison, 'annual_queries', 'credit_schedule', 'credit_rounding',
+           models='deployment_terms')
+graph.node('comparison_summary', summarize_comparison, 'comparison')
+graph.node('comparison_chart', lambda comparison_summary: cached_comparison_chart(
+    list(comparison_summary['comparison_costs']), list(comparison_summary['comparison_costs'].values())
+), 'comparison_summary')
+graph.node('cost_csv', cached_cost_csv, 'costs', 'queries_per_credit', 'credit_cost', 'deployment_model')
+graph.node('cost_parquet', cached_cost_parquet, 'costs', 'queries_per_credit', 'credit_cost', 'deployment_model')
+graph.node('executive_summary', build_summary_text, 'comparison_summary', 'generated', 'platform_fee',
+           'credit_cost', 'deployment_model', 'queries_per_credit', 'costs', 'growth_rate', 'credit_pricing',
+           'growth_curve')
+
+# Calculate costs for selected deployment
+profiler.section("Year 1 Summary")
+costs = graph['costs']
+
 # Key Metrics Display
 st.markdown("## 💎 Year 1 Cost Summary")
 
 col1, col2, col3, col4 = st.columns(4)
 
-year1 = costs[0]
+year1 = graph['year1']
 
 with col1:
     st.metric(
@@ -423,169 +771,108 @@ with col4:
         help="Total credits for annual volume"
     )
 
-# Cost Breakdown
-st.markdown("## 📊 Year 1 Cost Breakdown")
+# Report sections: only the selected one is built and sent to the browser, so
+# a rerun ships the figures of one section instead of all of them
+REPORT_VIEWS = {
+    "📊 Year 1 Breakdown": 'Year 1 Breakdown',
+    "📅 Multi-Year Projection": 'Multi-Year Projection',
+    "📆 Monthly Timeline": 'Monthly Timeline',
+    "📉 Usage Burn-down": 'Usage Burn-down',
+    "🔬 Sensitivity Analysis": 'Sensitivity Analysis',
+    "⚖️ Deployment Comparison": 'Deployment Comparison',
+}
 
-col1, col2 = st.columns(2)
+st.markdown("---")
+report_view = REPORT_VIEWS[st.radio(
+    "Report Section",
+    options=list(REPORT_VIEWS),
+    horizontal=True,
+    key="report_view",
+    label_visibility="collapsed"
+)]
 
-with col1:
-    # Cost composition pie chart
-    fig_pie = go.Figure(data=[go.Pie(
-        labels=['Platform Fee', 'Consumption (Credits)'],
-        values=[year1['platform_fee'], year1['consumption_cost']],
-        marker=dict(colors=['#667eea', '#764ba2']),
-        textinfo='label+percent+value',
-        texttemplate='%{label}<br>$%{value:,.0f}<br>(%{percent})',
-        hovertemplate='%{label}<br>$%{value:,.0f}<br>%{percent}<extra></extra>'
-    )])
-    
-    fig_pie.update_layout(
-        title=f"Cost Composition - {deployment_model}",
-        height=400
-    )
-    
-    st.plotly_chart(fig_pie, use_container_width=True)
+if report_view == 'Year 1 Breakdown':
+    # Cost Breakdown
+    st.markdown("## 📊 Year 1 Cost Breakdown")
 
-with col2:
-    # Cost breakdown details
-    st.markdown(f"""
-        <div class="cost-breakdown">
-        <h4>Detailed Breakdown</h4>
-        <table style="width:100%; border-collapse: collapse;">
-        <tr style="border-bottom: 1px solid #ddd;">
-            <td style="padding: 8px;"><strong>Annual Query Volume</strong></td>
-            <td style="padding: 8px; text-align: right;">{format_number(year1['queries'])}</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #ddd;">
-            <td style="padding: 8px;"><strong>Queries per Credit</strong></td>
-            <td style="padding: 8px; text-align: right;">{format_number(queries_per_credit)}</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #ddd;">
-            <td style="padding: 8px;"><strong>Credits Required</strong></td>
-            <td style="padding: 8px; text-align: right;">{format_number(year1['credits_needed'])}</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #ddd;">
-            <td style="padding: 8px;"><strong>Cost per Credit</strong></td>
-            <td style="padding: 8px; text-align: right;">${credit_cost}</td>
-        </tr>
-        <tr style="border-bottom: 2px solid #000;">
-            <td style="padding: 8px;"><strong>Consumption Cost</strong></td>
-            <td style="padding: 8px; text-align: right;">{format_number(year1['consumption_cost'], prefix='$')}</td>
-        </tr>
-        <tr style="border-bottom: 1px solid #ddd;">
-            <td style="padding: 8px;"><strong>Platform Fee</strong></td>
-            <td style="padding: 8px; text-align: right;">{format_number(year1['platform_fee'], prefix='$')}</td>
-        </tr>
-        <tr style="background-color: #f0f0f0; font-weight: bold;">
-            <td style="padding: 8px;"><strong>Total Annual Cost</strong></td>
-            <td style="padding: 8px; text-align: right;">{format_number(year1['total_cost'], prefix='$')}</td>
-        </tr>
-        </table>
-        </div>
-    """, unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+
+    with col1:
+        # Cost composition pie chart
+        fig_pie = graph['cost_pie']
+        
+        st.plotly_chart(fig_pie, use_container_width=True)
+
+    with col2:
+        # Cost breakdown details
+        if credit_schedule is None:
+            credit_cost_display = f"${credit_cost}"
+        else:
+            credit_cost_display = format_number(year1['effective_credit_cost'], decimals=2, prefix='$') + " (blended)"
+        
+        st.markdown(f"""
+            <div class="cost-breakdown">
+            <h4>Detailed Breakdown</h4>
+            <table style="width:100%; border-collapse: collapse;">
+            <tr style="border-bottom: 1px solid #ddd;">
+                <td style="padding: 8px;"><strong>Annual Query Volume</strong></td>
+                <td style="padding: 8px; text-align: right;">{format_number(year1['queries'])}</td>
+            </tr>
+            <tr style="border-bottom: 1px solid #ddd;">
+                <td style="padding: 8px;"><strong>Queries per Credit</strong></td>
+                <td style="padding: 8px; text-align: right;">{format_number(queries_per_credit)}</td>
+            </tr>
+            <tr style="border-bottom: 1px solid #ddd;">
+                <td style="padding: 8px;"><strong>Credits Required</strong></td>
+                <td style="padding: 8px; text-align: right;">{format_number(year1['credits_needed'])}</td>
+            </tr>
+            <tr style="border-bottom: 1px solid #ddd;">
+                <td style="padding: 8px;"><strong>Cost per Credit</strong></td>
+                <td style="padding: 8px; text-align: right;">{credit_cost_display}</td>
+            </tr>
+            <tr style="border-bottom: 2px solid #000;">
+                <td style="padding: 8px;"><strong>Consumption Cost</strong></td>
+                <td style="padding: 8px; text-align: right;">{format_number(year1['consumption_cost'], prefix='$')}</td>
+            </tr>
+            <tr style="border-bottom: 1px solid #ddd;">
+                <td style="padding: 8px;"><strong>Platform Fee</strong></td>
+                <td style="padding: 8px; text-align: right;">{format_number(year1['platform_fee'], prefix='$')}</td>
+            </tr>
+            <tr style="background-color: #f0f0f0; font-weight: bold;">
+                <td style="padding: 8px;"><strong>Total Annual Cost</strong></td>
+                <td style="padding: 8px; text-align: right;">{format_number(year1['total_cost'], prefix='$')}</td>
+            </tr>
+            </table>
+            </div>
+        """, unsafe_allow_html=True)
 
 # Multi-year projection
-if projection_years > 1:
+profiler.section("Multi-Year Projection")
+if report_view == 'Multi-Year Projection' and projection_years > 1:
     st.markdown(f"## 📅 {projection_years}-Year Financial Projection")
     
-    # Prepare data for charts
-    years_list = [f"Year {c['year']}" for c in costs]
-    total_costs = [c['total_cost'] for c in costs]
-    platform_fees = [c['platform_fee'] for c in costs]
-    consumption_costs = [c['consumption_cost'] for c in costs]
-    queries_list = [c['queries'] for c in costs]
-    cost_per_query_list = [c['cost_per_query'] for c in costs]
+    years_list = [f"Year {year}" for year in costs.year]
     
     # Stacked bar chart for multi-year costs
-    fig_multiyear = go.Figure()
-    
-    fig_multiyear.add_trace(go.Bar(
-        name='Platform Fee',
-        x=years_list,
-        y=platform_fees,
-        marker_color='#667eea',
-        text=[format_number(v, prefix='$') for v in platform_fees],
-        textposition='inside'
-    ))
-    
-    fig_multiyear.add_trace(go.Bar(
-        name='Consumption',
-        x=years_list,
-        y=consumption_costs,
-        marker_color='#764ba2',
-        text=[format_number(v, prefix='$') for v in consumption_costs],
-        textposition='inside'
-    ))
-    
-    fig_multiyear.add_trace(go.Scatter(
-        name='Query Volume',
-        x=years_list,
-        y=queries_list,
-        mode='lines+markers+text',
-        line=dict(color='#28a745', width=3),
-        marker=dict(size=10),
-        text=[format_number(v) for v in queries_list],
-        textposition='top center',
-        yaxis='y2'
-    ))
-    
-    fig_multiyear.update_layout(
-        title=f"{projection_years}-Year Cost and Volume Projection (Growth: {growth_rate*100:.0f}%/year)",
-        barmode='stack',
-        height=500,
-        yaxis=dict(title="Annual Cost ($)"),
-        yaxis2=dict(title="Query Volume", overlaying='y', side='right'),
-        hovermode='x unified',
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
-    
+    fig_multiyear = graph['multiyear_chart']
     st.plotly_chart(fig_multiyear, use_container_width=True)
     
     # Cost per query trend
-    fig_cpq = go.Figure()
-    
-    fig_cpq.add_trace(go.Scatter(
-        x=years_list,
-        y=cost_per_query_list,
-        mode='lines+markers+text',
-        line=dict(color='#dc3545', width=3),
-        marker=dict(size=12),
-        text=[format_number(v, decimals=4, prefix='$') for v in cost_per_query_list],
-        textposition='top center',
-        fill='tozeroy',
-        fillcolor='rgba(220, 53, 69, 0.1)'
-    ))
-    
-    fig_cpq.update_layout(
-        title="Cost per Query Trend",
-        height=400,
-        yaxis_title="Cost per Query ($)",
-        xaxis_title="Year",
-        hovermode='x unified'
-    )
-    
+    fig_cpq = graph['cost_per_query_chart']
     st.plotly_chart(fig_cpq, use_container_width=True)
     
     # Multi-year summary table
     st.markdown("### 📋 Multi-Year Summary Table")
     
-    summary_df = pd.DataFrame({
-        'Year': years_list,
-        'Query Volume': [format_number(c['queries']) for c in costs],
-        'Credits Needed': [format_number(c['credits_needed']) for c in costs],
-        'Platform Fee': [format_number(c['platform_fee'], prefix='$') for c in costs],
-        'Consumption': [format_number(c['consumption_cost'], prefix='$') for c in costs],
-        'Total Cost': [format_number(c['total_cost'], prefix='$') for c in costs],
-        'Cost/Query': [format_number(c['cost_per_query'], decimals=4, prefix='$') for c in costs],
-        'Monthly Avg': [format_number(c['monthly_cost'], prefix='$') for c in costs]
-    })
+    summary_df = graph['summary_table']
     
     st.dataframe(summary_df, use_container_width=True, hide_index=True)
     
     # TCO summary
-    total_tco = sum([c['total_cost'] for c in costs])
-    total_queries = sum([c['queries'] for c in costs])
-    avg_cost_per_query = total_tco / total_queries
+    tco = graph['tco']
+    total_tco = tco['total_cost']
+    total_queries = tco['queries']
+    avg_cost_per_query = tco['cost_per_query']
     
     col1, col2, col3 = st.columns(3)
     
@@ -607,153 +894,604 @@ if projection_years > 1:
             format_number(avg_cost_per_query, decimals=4, prefix='$')
         )
 
-# Deployment Comparison
-st.markdown("## ⚖️ Deployment Model Comparison")
+    # Volume uncertainty (Monte Carlo)
+    st.markdown("### 🎲 Volume Uncertainty Simulation")
 
-st.markdown("""
-    <div class="insight-box">
-    <strong>💡 Key Decision:</strong> Deployment model significantly impacts your cost per query due to different query efficiency ratios.
-    </div>
-""", unsafe_allow_html=True)
+    if st.checkbox("Simulate volume and growth uncertainty", help="Draw Year 1 volume and yearly growth from distributions and show P10/P50/P90 bands"):
+        with st.form("simulation_settings"):
+            col1, col2, col3 = st.columns(3)
 
-# Calculate costs for both deployment models
-customer_vpc_costs = calculate_costs(
-    annual_queries, platform_fee, credit_cost, 
-    DEPLOYMENT_MODELS['Customer VPC']['queries_per_credit'],
-    1, 0
-)[0]
+            with col1:
+                volume_distribution = st.selectbox("Volume Distribution", options=VOLUME_DISTRIBUTIONS)
+                volume_spread = st.slider(
+                    "Volume Uncertainty (%)",
+                    min_value=0,
+                    max_value=100,
+                    value=25,
+                    help="Lognormal: sigma of log-volume. Others: spread around the estimate."
+                ) / 100
 
-uniphore_vpc_costs = calculate_costs(
-    annual_queries, platform_fee, credit_cost,
-    DEPLOYMENT_MODELS['Uniphore VPC']['queries_per_credit'],
-    1, 0
-)[0]
+            with col2:
+                growth_distribution = st.selectbox("Growth Distribution", options=GROWTH_DISTRIBUTIONS, index=1)
+                growth_spread = st.slider(
+                    "Growth Uncertainty (± pts)",
+                    min_value=0,
+                    max_value=25,
+                    value=5,
+                    help="Spread of each year's growth rate around the selected growth rate (around each step of the growth curve)"
+                ) / 100
 
-col1, col2 = st.columns(2)
+            with col3:
+                trials = st.select_slider(
+                    "Trials",
+                    options=[10000, 50000, 100000, 250000, 500000],
+                    value=100000
+                )
 
-with col1:
-    winner_class = "comparison-winner" if customer_vpc_costs['total_cost'] < uniphore_vpc_costs['total_cost'] else ""
-    st.markdown(f"""
-        <div class="metric-card {winner_class}">
-        <h3>🏢 Customer VPC</h3>
-        <p style="font-size: 14px; color: #666;">{DEPLOYMENT_MODELS['Customer VPC']['description']}</p>
-        <p style="font-size: 32px; font-weight: bold; color: #007bff; margin: 10px 0;">
-        {format_number(customer_vpc_costs['total_cost'], prefix='$')}
-        </p>
-        <p style="font-size: 14px;">Annual Cost</p>
-        <hr>
-        <table style="width:100%; text-align: left;">
-        <tr><td>Queries/Credit:</td><td style="text-align: right;"><strong>400</strong></td></tr>
-        <tr><td>Credits Needed:</td><td style="text-align: right;">{format_number(customer_vpc_costs['credits_needed'])}</td></tr>
-        <tr><td>Consumption:</td><td style="text-align: right;">{format_number(customer_vpc_costs['consumption_cost'], prefix='$')}</td></tr>
-        <tr><td>Cost/Query:</td><td style="text-align: right;">{format_number(customer_vpc_costs['cost_per_query'], decimals=4, prefix='$')}</td></tr>
-        </table>
-        <hr>
-        <p style="font-size: 12px; color: #28a745;"><strong>✓</strong> {', '.join(DEPLOYMENT_MODELS['Customer VPC']['benefits'])}</p>
-        <p style="font-size: 12px; color: #856404;"><strong>⚠</strong> {', '.join(DEPLOYMENT_MODELS['Customer VPC']['considerations'])}</p>
-        </div>
-    """, unsafe_allow_html=True)
+            st.form_submit_button("Apply")
 
-with col2:
-    winner_class = "comparison-winner" if uniphore_vpc_costs['total_cost'] < customer_vpc_costs['total_cost'] else ""
-    st.markdown(f"""
-        <div class="metric-card {winner_class}">
-        <h3>☁️ Uniphore VPC</h3>
-        <p style="font-size: 14px; color: #666;">{DEPLOYMENT_MODELS['Uniphore VPC']['description']}</p>
-        <p style="font-size: 32px; font-weight: bold; color: #007bff; margin: 10px 0;">
-        {format_number(uniphore_vpc_costs['total_cost'], prefix='$')}
-        </p>
-        <p style="font-size: 14px;">Annual Cost</p>
-        <hr>
-        <table style="width:100%; text-align: left;">
-        <tr><td>Queries/Credit:</td><td style="text-align: right;"><strong>100</strong></td></tr>
-        <tr><td>Credits Needed:</td><td style="text-align: right;">{format_number(uniphore_vpc_costs['credits_needed'])}</td></tr>
-        <tr><td>Consumption:</td><td style="text-align: right;">{format_number(uniphore_vpc_costs['consumption_cost'], prefix='$')}</td></tr>
-        <tr><td>Cost/Query:</td><td style="text-align: right;">{format_number(uniphore_vpc_costs['cost_per_query'], decimals=4, prefix='$')}</td></tr>
-        </table>
-        <hr>
-        <p style="font-size: 12px; color: #28a745;"><strong>✓</strong> {', '.join(DEPLOYMENT_MODELS['Uniphore VPC']['benefits'])}</p>
-        <p style="font-size: 12px; color: #856404;"><strong>⚠</strong> {', '.join(DEPLOYMENT_MODELS['Uniphore VPC']['considerations'])}</p>
+        simulation = cached_simulation(
+            annual_queries, platform_fee, credit_cost, queries_per_credit,
+            projection_years, growth_rate,
+            trials=trials,
+            volume_distribution=volume_distribution,
+            volume_spread=volume_spread,
+            growth_distribution=growth_distribution,
+            growth_spread=growth_spread,
+            seed=0,
+            credit_schedule=credit_schedule,
+            growth_curve=growth_curve,
+            credit_rounding=credit_rounding if exact_cents else None
+        )
+
+        fan_charts = [
+            ('total_cost', "Annual Cost Range", "Annual Cost ($)", 0),
+            ('tco', "Cumulative TCO Range", "TCO ($)", 0),
+            ('cost_per_query', "Cost per Query Range", "Cost per Query ($)", 4),
+        ]
+
+        for col, (key, title, yaxis_title, decimals) in zip(st.columns(3), fan_charts):
+            fig_fan = cached_fan_chart(years_list, simulation[key], title, yaxis_title, decimals)
+
+            with col:
+                st.plotly_chart(fig_fan, use_container_width=True)
+
+        final_year = projection_years - 1
+        st.markdown(f"""
+            <div class="insight-box">
+            <strong>📊 {projection_years}-Year TCO Range:</strong>
+            P10 {format_number(simulation['tco'][0][final_year], prefix='$')} ·
+            P50 {format_number(simulation['tco'][1][final_year], prefix='$')} ·
+            P90 {format_number(simulation['tco'][2][final_year], prefix='$')}<br>
+            <small>{format_number(trials)} trials</small>
+            </div>
+        """, unsafe_allow_html=True)
+
+    # Prepaid credit commitment
+    st.markdown("### 📝 Credit Commitment Optimizer")
+
+    if st.checkbox("Find the cheapest prepaid credit commitment", help="Compare prepaid contracts (discount, overage and rollover terms) with pay-as-you-go over a range of volume forecasts"):
+        with st.form("commitment_settings"):
+            col1, col2, col3 = st.columns(3)
+
+            with col1:
+                commitment_volume_spread = st.slider(
+                    "Forecast Uncertainty (%)",
+                    min_value=0,
+                    max_value=100,
+                    value=25,
+                    key="commitment_volume_spread",
+                    help="Sigma of log Year 1 volume; 0 optimizes for the point forecast"
+                ) / 100
+
+            with col2:
+                commitment_growth_spread = st.slider(
+                    "Growth Uncertainty (± pts)",
+                    min_value=0,
+                    max_value=25,
+                    value=5,
+                    key="commitment_growth_spread"
+                ) / 100
+
+            with col3:
+                commitment_trials = st.select_slider(
+                    "Forecast Scenarios",
+                    options=[1000, 5000, 10000, 20000],
+                    value=5000
+                )
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                contracts_df = st.data_editor(
+                    pd.DataFrame({
+                        'contract': list(COMMITMENT_TERMS),
+                        'overage_premium': [contract['overage_premium'] * 100 for contract in COMMITMENT_TERMS.values()],
+                        'rollover': [contract['rollover'] * 100 for contract in COMMITMENT_TERMS.values()],
+                    }),
+                    column_config={
+                        'contract': st.column_config.TextColumn("Contract"),
+                        'overage_premium': st.column_config.NumberColumn("Overage Premium (%)", min_value=0.0, format="%.0f%%"),
+                        'rollover': st.column_config.NumberColumn("Rollover (%)", min_value=0.0, max_value=100.0, format="%.0f%%", help="Share of unused committed credits carried into the next year"),
+                    },
+                    num_rows="dynamic",
+                    hide_index=True,
+                    key="commitment_contracts"
+                )
+
+            with col2:
+                discount_bands_df = st.data_editor(
+                    pd.DataFrame([
+                        {'contract': name, 'from_credits': minimum, 'discount': discount * 100}
+                        for name, contract in COMMITMENT_TERMS.items() for minimum, discount in contract['discounts']
+                    ]),
+                    column_config={
+                        'contract': st.column_config.TextColumn("Contract"),
+                        'from_credits': st.column_config.NumberColumn("From (credits/yr)", min_value=0, step=100),
+                        'discount': st.column_config.NumberColumn("Prepay Discount (%)", min_value=0.0, max_value=99.0, format="%.0f%%"),
+                    },
+                    num_rows="dynamic",
+                    hide_index=True,
+                    key="commitment_discount_bands"
+                )
+
+            st.form_submit_button("Apply")
+
+        discount_bands_df = discount_bands_df.dropna()
+        commitment_terms = {
+            row.contract: {
+                'discounts': [
+                    (band.from_credits, band.discount / 100)
+                    for band in discount_bands_df[discount_bands_df['contract'] == row.contract].sort_values('from_credits').itertuples()
+                ],
+                'overage_premium': row.overage_premium / 100,
+                'rollover': row.rollover / 100,
+            }
+            for row in contracts_df.dropna().itertuples()
+        }
+        try:
+            validate_commitment_terms(commitment_terms)
+        except ValueError as error:
+            st.error(f"{error}. Using the standard contracts.")
+            commitment_terms = COMMITMENT_TERMS
+
+        usage = cached_volume_paths(
+            annual_queries, projection_years, growth_rate,
+            trials=commitment_trials,
+            volume_spread=commitment_volume_spread,
+            growth_spread=commitment_growth_spread,
+            seed=0,
+            growth_curve=growth_curve
+        ) / queries_per_credit
+        commitment = cached_commitment(usage, credit_cost, platform_fee, commitment_terms, credit_schedule=credit_schedule)
+        best = commitment['best']
+
+        fig_commitment = cached_commitment_chart(
+            commitment['curves'], best, commitment['payg']['expected_cost'], projection_years
+        )
+        st.plotly_chart(fig_commitment, use_container_width=True)
+
+        st.dataframe(pd.DataFrame({
+            'Contract': [option['terms'] for option in commitment['options']] + ['Pay-as-you-go'],
+            'Credits/Year': [format_number(option['commitment']) for option in commitment['options']] + ['-'],
+            'Prepaid $/Credit': [format_number(option['prepaid_rate'], decimals=2, prefix='$') for option in commitment['options']] + ['-'],
+            'Overage $/Credit': [format_number(option['overage_rate'], decimals=2, prefix='$') for option in commitment['options']] + ['Price book' if credit_schedule else format_number(credit_cost, decimals=2, prefix='$')],
+            'Rollover': [f"{option['rollover']:.0%}" for option in commitment['options']] + ['-'],
+            f'Expected {projection_years}-Year TCO': [format_number(option['expected_cost'], prefix='$') for option in commitment['options']] + [format_number(commitment['payg']['expected_cost'], prefix='$')],
+            'P90 TCO': [format_number(option['p90_cost'], prefix='$') for option in commitment['options']] + [format_number(commitment['payg']['p90_cost'], prefix='$')],
+        }), use_container_width=True, hide_index=True)
+
+        if best['savings'] > 0:
+            commitment_text = (f"Commit to {format_number(best['commitment'])} credits/year on {best['terms']} terms "
+                               f"to save {format_number(best['savings'], prefix='$')} expected over {projection_years} years")
+        else:
+            commitment_text = "Pay-as-you-go is cheapest for this forecast"
+        st.markdown(f"""
+            <div class="insight-box">
+            <strong>💡 Recommendation:</strong> {commitment_text}<br>
+            <small>{len(commitment_terms)} contract types, {'credit price book' if credit_schedule else 'list price ' + format_number(credit_cost, decimals=2, prefix='$') + '/credit'}, {format_number(commitment_trials)} forecast scenarios</small>
+            </div>
+        """, unsafe_allow_html=True)
+elif report_view == 'Multi-Year Projection':
+    st.info("Set the projection period above 1 year to see the multi-year projection.")
+
+# Monthly timeline
+profiler.section("Monthly Timeline")
+if report_view == 'Monthly Timeline':
+    st.markdown("## 📆 Monthly Timeline")
+    st.caption("The build ramp, run steady state and growth for every month of the projection; tiered credit prices apply to each year's credits, spread over its months")
+
+    compound_monthly = st.checkbox("Compound growth monthly", help="Off: volume steps up once a year, matching the annual projection")
+
+    if estimation_method == 'Build & Run Phases':
+        timeline_volume = dict(
+            run_queries_per_month=run_queries_per_month,
+            build_months=build_months,
+            build_queries_per_month=build_queries_per_month
+        )
+    else:
+        timeline_volume = dict(run_queries_per_month=annual_queries / 12)
+
+    timeline = cached_monthly_timeline(
+        platform_fee=platform_fee,
+        credit_cost=credit_cost,
+        queries_per_credit=queries_per_credit,
+        years=projection_years,
+        growth_rate=growth_rate,
+        compound_monthly=compound_monthly,
+        growth_curve=growth_curve,
+        credit_schedule=credit_schedule,
+        credit_rounding=credit_rounding if exact_cents else None,
+        **timeline_volume
+    )
+
+    fig_monthly = cached_monthly_chart(
+        timeline['month'],
+        timeline['platform_fee'][0],
+        timeline['consumption_cost'][0],
+        timeline['queries'][0],
+        timeline_volume.get('build_months', 0)
+    )
+    st.plotly_chart(fig_monthly, use_container_width=True)
+
+    monthly_costs = batch_table(aggregate_monthly_to_yearly(timeline))
+    st.dataframe(cached_summary_table(monthly_costs), use_container_width=True, hide_index=True)
+
+    if estimation_method == 'Build & Run Phases':
+        st.caption("After the build phase every month runs at the run rate, so Year 2+ volumes can differ from the annual projection, which grows the Year 1 total.")
+
+# Actual usage from query logs
+NO_SERVER_LOG = "None (upload instead)"
+
+profiler.section("Usage Burn-down")
+if report_view == 'Usage Burn-down':
+    st.markdown("## 📉 Usage Burn-down")
+    st.caption("Stream a production query log, count queries and credits per month and deployment, and track the credit balance against this projection")
+
+    col1, col2 = st.columns(2)
+
+    # Only logs in the configured directory can be read from the server, never an arbitrary path
+    with col1:
+        if USAGE_LOG_DIR:
+            usage_log_name = st.selectbox(
+                "Query log on the server",
+                options=[NO_SERVER_LOG] + list_usage_logs(),
+                help=f"Logs in {USAGE_LOG_DIR}: CSV or JSONL, optionally .gz / .bz2, with timestamp, deployment and optional credits columns. Read as a stream, so multi-GB logs are fine."
+            )
+        else:
+            usage_log_name = NO_SERVER_LOG
+            st.caption("Set PRICING_USAGE_LOG_DIR on the server to read large query logs from a directory there.")
+
+    with col2:
+        usage_log_upload = st.file_uploader("Or upload a query log", type=['csv', 'jsonl', 'gz', 'bz2'])
+
+    usage = None
+    try:
+        if usage_log_upload is not None:
+            usage = cached_usage_bytes(usage_log_upload.getvalue(), usage_log_upload.name)
+        elif usage_log_name != NO_SERVER_LOG:
+            usage_log_file = usage_log_path(usage_log_name)
+            usage = cached_usage_file(usage_log_file, os.path.getmtime(usage_log_file))
+    except (OSError, ValueError, KeyError) as error:
+        st.error(f"Could not read the query log: {error}")
+
+    if usage is not None and not usage['month']:
+        st.warning("The query log has no timestamped lines.")
+    elif usage is not None:
+        fitted_rows = fitted_queries_per_credit(usage)
+        fitted = {row['deployment']: row['fitted'] for row in fitted_rows if row['fitted']}
+        if fitted != st.session_state.get('fitted_queries_per_credit', {}):
+            # The sidebar offers the fitted ratio, so render it again with the new values
+            st.session_state.fitted_queries_per_credit = fitted
+            st.rerun()
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            usage_start = st.selectbox(
+                "Projection Start Month",
+                options=usage['month'],
+                help="Month the contract (Year 1 of the projection) starts"
+            )
+
+        with col2:
+            credit_balance = st.number_input(
+                "Credit Balance at Start",
+                min_value=0,
+                value=int(round(costs.total('credits_needed'))),
+                step=1000,
+                help="Credits purchased for the projection period; defaults to every projected credit"
+            )
+
+        with col3:
+            burn_rate_months = st.slider("Burn Rate Window (months)", min_value=1, max_value=12, value=3)
+
+        burn = cached_burn_down(costs, usage, usage_start, credit_balance, burn_rate_months=burn_rate_months)
+
+        fig_burn_down = cached_burn_down_chart(
+            burn['month'], burn['projected_balance'], burn['actual_balance'], burn['burn_rate'], burn['exhaustion_month']
+        )
+        st.plotly_chart(fig_burn_down, use_container_width=True)
+
+        col1, col2, col3 = st.columns(3)
+
+        with col1:
+            st.metric("Log Lines", format_number(usage['lines']))
+            if usage['skipped']:
+                st.caption(f"{format_number(usage['skipped'])} lines without a usable timestamp skipped")
+
+        with col2:
+            st.metric("Burn Rate", f"{format_number(burn['burn_rate'])} credits/mo")
+
+        with col3:
+            st.metric("Projected Exhaustion", burn['exhaustion_month'] or "Not burning")
+
+        st.dataframe(pd.DataFrame({
+            'Deployment': [row['deployment'] or '(none)' for row in fitted_rows],
+            'Queries': [format_number(row['queries']) for row in fitted_rows],
+            'Credits Billed': [format_number(row['credits']) if row['credited_queries'] else '-' for row in fitted_rows],
+            'Fitted Queries/Credit': [format_number(row['fitted'], decimals=1) if row['fitted'] else '-' for row in fitted_rows],
+            'Configured Queries/Credit': [format_number(row['configured']) if row['configured'] else '-' for row in fitted_rows],
+        }), use_container_width=True, hide_index=True)
+
+        if burn['unmatched']:
+            st.caption(f"Not counted toward credits (no queries/credit ratio): {', '.join(d or '(none)' for d in burn['unmatched'])}")
+
+# Sensitivity analysis
+profiler.section("Sensitivity Analysis")
+if report_view == 'Sensitivity Analysis':
+    st.markdown("## 🔬 Sensitivity Analysis")
+    st.caption("Sweep two inputs over a grid and rank every input by its impact on TCO, with the projection's credit pricing, growth curve and rounding")
+
+    sensitivity_inputs = {
+        'platform_fee': platform_fee,
+        'credit_cost': credit_cost,
+        'queries_per_credit': queries_per_credit,
+        'annual_queries': annual_queries,
+        'growth_rate': growth_rate,
+    }
+    sensitivity_pricing = {
+        'credit_schedule': credit_schedule,
+        'growth_curve': growth_curve,
+        'credit_rounding': credit_rounding if exact_cents else None,
+    }
+    parameter_by_label = {label: name for name, label in sensitivity_parameters(credit_schedule, growth_curve).items()}
+    parameter_labels = list(parameter_by_label)
+
+    with st.form("sensitivity_settings"):
+        col1, col2, col3, col4 = st.columns(4)
+
+        with col1:
+            x_label = st.selectbox(
+                "X Axis",
+                options=parameter_labels,
+                index=parameter_labels.index(SENSITIVITY_PARAMETERS['annual_queries'])
+            )
+
+        with col2:
+            y_label = st.selectbox(
+                "Y Axis",
+                options=[label for label in parameter_labels if label != x_label]
+            )
+
+        with col3:
+            sweep_spread = st.slider(
+                "Sweep Range (± %)",
+                min_value=10,
+                max_value=90,
+                value=50,
+                help="Range around the current value of each swept input"
+            ) / 100
+
+        with col4:
+            grid_points = st.select_slider("Grid Resolution", options=[50, 100, 200, 400], value=200)
+
+        metric_label = st.radio(
+            "Heatmap Metric",
+            options=[f"{projection_years}-Year TCO", "Avg Cost per Query"],
+            horizontal=True
+        )
+
+        st.form_submit_button("Apply")
+    sensitivity_metric = 'tco' if metric_label.endswith('TCO') else 'cost_per_query'
+    x_parameter = parameter_by_label[x_label]
+    y_parameter = parameter_by_label[y_label]
+
+    x_values = sweep_values(x_parameter, sensitivity_inputs[x_parameter], sweep_spread, grid_points)
+    y_values = sweep_values(y_parameter, sensitivity_inputs[y_parameter], sweep_spread, grid_points)
+    grid = cached_sensitivity_grid(sensitivity_inputs, x_parameter, x_values, y_parameter, y_values, projection_years,
+                                   **sensitivity_pricing)
+
+    fig_heatmap = cached_sensitivity_heatmap(
+        x_values, y_values, grid[sensitivity_metric],
+        x_label, y_label,
+        f"{metric_label} by {x_label} and {y_label}",
+        sensitivity_inputs[x_parameter], sensitivity_inputs[y_parameter],
+        0 if sensitivity_metric == 'tco' else 4
+    )
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+
+    tornado_swing = st.slider(
+        "Tornado Swing (± %)",
+        min_value=5,
+        max_value=50,
+        value=20,
+        help="Each input is moved up and down by this much, one at a time"
+    ) / 100
+
+    tornado_bars = cached_tornado_analysis(sensitivity_inputs, projection_years, tornado_swing, **sensitivity_pricing)
+    fig_tornado = cached_tornado_chart(tornado_bars, tornado_swing)
+    st.plotly_chart(fig_tornado, use_container_width=True)
+
+# Deployment Comparison
+profiler.section("Deployment Comparison")
+# Year 1 costs of every deployment model in one batch (the exports use them in every section)
+comparison = graph['comparison']
+comparison_summary = graph['comparison_summary']
+comparison_costs = comparison_summary['comparison_costs']
+cheaper_option = comparison_summary['cheaper_option']
+runner_up = comparison_summary['runner_up']
+cost_difference = comparison_summary['cost_difference']
+cost_difference_pct = comparison_summary['cost_difference_pct']
+
+if report_view == 'Deployment Comparison':
+    st.markdown("## ⚖️ Deployment Model Comparison")
+
+    st.markdown("""
+        <div class="insight-box">
+        <strong>💡 Key Decision:</strong> Deployment model significantly impacts your cost per query due to different query efficiency ratios.
         </div>
     """, unsafe_allow_html=True)
 
-# Comparison metrics
-cost_difference = abs(customer_vpc_costs['total_cost'] - uniphore_vpc_costs['total_cost'])
-cost_difference_pct = (cost_difference / max(customer_vpc_costs['total_cost'], uniphore_vpc_costs['total_cost'])) * 100
-cheaper_option = "Customer VPC" if customer_vpc_costs['total_cost'] < uniphore_vpc_costs['total_cost'] else "Uniphore VPC"
-
-st.markdown(f"""
-    <div class="insight-box">
-    <strong>📊 Comparison Summary:</strong><br>
-    • <strong>{cheaper_option}</strong> is {format_number(cost_difference_pct, decimals=1)}% cheaper ({format_number(cost_difference, prefix='$')} savings)<br>
-    • Customer VPC offers {DEPLOYMENT_MODELS['Customer VPC']['queries_per_credit'] / DEPLOYMENT_MODELS['Uniphore VPC']['queries_per_credit']:.0f}x better query efficiency<br>
-    • Break-even analysis: At {format_number(annual_queries)} queries/year, efficiency drives total cost
-    </div>
-""", unsafe_allow_html=True)
+    # One card per model, up to three per row
+    cards_per_row = min(len(comparison_costs), 3)
+    model_names = list(comparison_costs)
+    for row_start in range(0, len(model_names), cards_per_row):
+        for col, name in zip(st.columns(cards_per_row), model_names[row_start:row_start + cards_per_row]):
+            model = DEPLOYMENT_MODELS[name]
+            model_costs = comparison_costs[name]
+            winner_class = "comparison-winner" if name == cheaper_option and len(model_names) > 1 else ""
+            with col:
+                st.markdown(f"""
+                    <div class="metric-card {winner_class}">
+                    <h3>{model['icon']} {name}</h3>
+                    <p style="font-size: 14px; color: #666;">{model['description']}</p>
+                    <p style="font-size: 32px; font-weight: bold; color: #007bff; margin: 10px 0;">
+                    {format_number(model_costs['total_cost'], prefix='$')}
+                    </p>
+                    <p style="font-size: 14px;">Annual Cost</p>
+                    <hr>
+                    <table style="width:100%; text-align: left;">
+                    <tr><td>Queries/Credit:</td><td style="text-align: right;"><strong>{format_number(deployment_terms[name]['queries_per_credit'])}</strong></td></tr>
+                    <tr><td>Platform Fee:</td><td style="text-align: right;">{format_number(model_costs['platform_fee'], prefix='$')}</td></tr>
+                    <tr><td>$/Credit:</td><td style="text-align: right;">{format_number(model_costs['effective_credit_cost'], decimals=2, prefix='$')}</td></tr>
+                    <tr><td>Credits Needed:</td><td style="text-align: right;">{format_number(model_costs['credits_needed'])}</td></tr>
+                    <tr><td>Consumption:</td><td style="text-align: right;">{format_number(model_costs['consumption_cost'], prefix='$')}</td></tr>
+                    <tr><td>Cost/Query:</td><td style="text-align: right;">{format_number(model_costs['cost_per_query'], decimals=4, prefix='$')}</td></tr>
+                    </table>
+                    <hr>
+                    <p style="font-size: 12px; color: #28a745;"><strong>✓</strong> {', '.join(model['benefits'])}</p>
+                    <p style="font-size: 12px; color: #856404;"><strong>⚠</strong> {', '.join(model['considerations'])}</p>
+                    </div>
+                """, unsafe_allow_html=True)
 
-# Side-by-side comparison chart
-comparison_data = {
-    'Deployment': ['Customer VPC', 'Uniphore VPC'],
-    'Platform Fee': [customer_vpc_costs['platform_fee'], uniphore_vpc_costs['platform_fee']],
-    'Consumption': [customer_vpc_costs['consumption_cost'], uniphore_vpc_costs['consumption_cost']],
-    'Total': [customer_vpc_costs['total_cost'], uniphore_vpc_costs['total_cost']]
-}
+    if len(model_names) > 1:
+        # Break-even volume of the two cheapest models at their current pricing
+        most_efficient, least_efficient = comparison['most_efficient'][0], comparison['most_efficient'][-1]
+        efficiency_ratio = (comparison_costs[least_efficient]['consumption_cost'] / comparison_costs[least_efficient]['queries']) / \
+            (comparison_costs[most_efficient]['consumption_cost'] / comparison_costs[most_efficient]['queries'])
+        # Year 1 at the comparison's credit pricing, like the costs above
+        break_even = float(break_even_volume(deployment_terms[cheaper_option], deployment_terms[runner_up],
+                                             credit_schedule=credit_schedule))
+        if math.isnan(break_even):
+            break_even_text = f"{cheaper_option} is cheaper than {runner_up} at every volume with this pricing"
+        else:
+            break_even_text = f"{cheaper_option} and {runner_up} costs cross at {format_number(break_even)} queries/year"
 
-fig_comparison = go.Figure()
-
-fig_comparison.add_trace(go.Bar(
-    name='Platform Fee',
-    x=comparison_data['Deployment'],
-    y=comparison_data['Platform Fee'],
-    marker_color='#667eea',
-    text=[format_number(v, prefix='$') for v in comparison_data['Platform Fee']],
-    textposition='inside'
-))
-
-fig_comparison.add_trace(go.Bar(
-    name='Consumption',
-    x=comparison_data['Deployment'],
-    y=comparison_data['Consumption'],
-    marker_color='#764ba2',
-    text=[format_number(v, prefix='$') for v in comparison_data['Consumption']],
-    textposition='inside'
-))
-
-fig_comparison.update_layout(
-    title="Deployment Cost Comparison",
-    barmode='stack',
-    height=400,
-    yaxis_title="Annual Cost ($)",
-    showlegend=True
-)
+        st.markdown(f"""
+            <div class="insight-box">
+            <strong>📊 Comparison Summary:</strong><br>
+            • <strong>{cheaper_option}</strong> is {format_number(cost_difference_pct, decimals=1)}% cheaper than {runner_up} ({format_number(cost_difference, prefix='$')} savings)<br>
+            • {most_efficient} offers {efficiency_ratio:.3g}x better query efficiency than {least_efficient} (consumption cost per query)<br>
+            • Break-even analysis: {break_even_text}
+            </div>
+        """, unsafe_allow_html=True)
+
+        # Ranking by Year 1 cost, with the efficiency rank alongside
+        st.markdown("### 🏆 Deployment Ranking")
+        st.dataframe(
+            {
+                'Rank': list(range(1, len(model_names) + 1)),
+                'Deployment Model': comparison['cheapest'],
+                'Annual Cost': [format_number(comparison_costs[name]['total_cost'], prefix='$') for name in comparison['cheapest']],
+                'Cost/Query': [format_number(comparison_costs[name]['cost_per_query'], decimals=4, prefix='$') for name in comparison['cheapest']],
+                'Consumption/Query': [format_number(comparison_costs[name]['consumption_cost'] / comparison_costs[name]['queries'], decimals=4, prefix='$') for name in comparison['cheapest']],
+                'Efficiency Rank': [comparison['most_efficient'].index(name) + 1 for name in comparison['cheapest']],
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+
+    # Side-by-side comparison chart
+    fig_comparison = graph['comparison_chart']
+
+    st.plotly_chart(fig_comparison, use_container_width=True)
+
+    # Break-even analysis with per-model pricing
+    if st.checkbox("Break-even analysis with per-model pricing", help="Give each deployment model its own platform fee and credit price and find where their costs cross"):
+        break_even_models = {}
+
+        for col, (name, model) in zip(st.columns(len(DEPLOYMENT_MODELS)), deployment_terms.items()):
+            with col:
+                st.markdown(f"**{name}** ({model['queries_per_credit']} queries/credit)")
+                # Registry and goal-seek prices can fall outside the sidebar's input range
+                break_even_models[name] = {
+                    'platform_fee': st.number_input(
+                        "Annual Platform Fee ($)",
+                        min_value=0,
+                        max_value=max(1000000, math.ceil(model['platform_fee'])),
+                        value=int(model['platform_fee']),
+                        step=10000,
+                        format="%d",
+                        key=f"break_even_fee_{name}"
+                    ),
+                    'credit_cost': st.number_input(
+                        "Cost per Credit ($)",
+                        min_value=min(0.01, float(model['credit_cost'])),
+                        max_value=max(100.0, float(model['credit_cost'])),
+                        value=float(model['credit_cost']),
+                        step=1.0,
+                        format="%.2f",
+                        disabled=credit_schedule is not None,
+                        help="Set by the credit price book" if credit_schedule else None,
+                        key=f"break_even_credit_{name}"
+                    ),
+                    'queries_per_credit': model['queries_per_credit'],
+                }
+
+        break_even_pricing = {'credit_schedule': credit_schedule, 'growth_curve': growth_curve}
+        break_even_rows = cached_break_even_table(break_even_models, annual_queries, projection_years, growth_rate,
+                                                  **break_even_pricing)
+
+        def format_break_even(value, decimals=0, prefix='', suffix=''):
+            return '—' if math.isnan(value) else format_number(value, decimals=decimals, prefix=prefix, suffix=suffix)
+
+        st.dataframe(
+            {
+                'Models': [f"{row['model_a']} vs {row['model_b']}" for row in break_even_rows],
+                'Cheaper Now': [row['cheaper_now'] for row in break_even_rows],
+                f'Break-even Volume ({projection_years}-Year TCO)': [format_break_even(row['volume'], suffix=' queries/yr') for row in break_even_rows],
+                'Break-even Credit Price': [format_break_even(row['credit_cost'], decimals=2, prefix='$') for row in break_even_rows],
+                'Annual Cost Crossover': [format_break_even(row['annual_year'], decimals=1, prefix='Year ') for row in break_even_rows],
+                'TCO Crossover': [format_break_even(row['tco_year'], decimals=1, suffix=' years') for row in break_even_rows],
+            },
+            use_container_width=True,
+            hide_index=True
+        )
+
+        crossovers = [row for row in break_even_rows if not math.isnan(row['volume'])]
+        max_volume = max([annual_queries * 3] + [row['volume'] * 1.5 for row in crossovers])
+        volumes = [max_volume * i / 200 for i in range(201)]
+        curves = cached_tco_by_volume(break_even_models, volumes, projection_years, growth_rate, **break_even_pricing)
+        crossover_points = cached_tco_by_volume(
+            break_even_models, [row['volume'] for row in crossovers], projection_years, growth_rate, **break_even_pricing
+        )
+        crossover_markers = [
+            {**row, 'tco': crossover_points[row['model_a']][i]} for i, row in enumerate(crossovers)
+        ]
 
-st.plotly_chart(fig_comparison, use_container_width=True)
+        fig_break_even = cached_break_even_chart(volumes, curves, crossover_markers, annual_queries, projection_years)
+        st.plotly_chart(fig_break_even, use_container_width=True)
 
 # Export functionality
+profiler.section("Export")
 st.markdown("## 📥 Export Cost Analysis")
 
-col1, col2 = st.columns(2)
+col1, col2, col3 = st.columns(3)
 
 with col1:
     # Prepare CSV export
-    export_data = []
-    for c in costs:
-        export_data.append({
-            'Year': c['year'],
-            'Query Volume': c['queries'],
-            'Queries per Credit': queries_per_credit,
-            'Credits Needed': c['credits_needed'],
-            'Credit Cost': credit_cost,
-            'Consumption Cost': c['consumption_cost'],
-            'Platform Fee': c['platform_fee'],
-            'Total Annual Cost': c['total_cost'],
-            'Cost per Query': c['cost_per_query'],
-            'Monthly Cost': c['monthly_cost'],
-            'Deployment Model': deployment_model
-        })
-    
-    export_df = pd.DataFrame(export_data)
-    csv = export_df.to_csv(index=False)
+    csv = graph['cost_csv']
     
     st.download_button(
         label="📊 Download Cost Analysis (CSV)",
@@ -763,37 +1501,19 @@ with col1:
     )
 
 with col2:
+    # Typed columns for BI tools
+    parquet = graph['cost_parquet']
+
+    st.download_button(
+        label="🗄️ Download Cost Analysis (Parquet)",
+        data=parquet,
+        file_name=f"ai_platform_pricing_{datetime.now().strftime('%Y%m%d')}.parquet",
+        mime=EXPORT_FORMATS['parquet']['mime']
+    )
+
+with col3:
     # Executive summary
-    exec_summary = f"""
-AI PLATFORM - PRICING SUMMARY
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-
-CONFIGURATION
-Platform Fee: {format_number(platform_fee, prefix='$')}
-Credit Cost: ${credit_cost} per credit
-Deployment Model: {deployment_model}
-Queries per Credit: {queries_per_credit}
-
-YEAR 1 SUMMARY
-Annual Query Volume: {format_number(year1['queries'])}
-Credits Required: {format_number(year1['credits_needed'])}
-Consumption Cost: {format_number(year1['consumption_cost'], prefix='$')}
-Total Annual Cost: {format_number(year1['total_cost'], prefix='$')}
-Cost per Query: {format_number(year1['cost_per_query'], decimals=4, prefix='$')}
-Monthly Cost: {format_number(year1['monthly_cost'], prefix='$')}
-
-{projection_years}-YEAR PROJECTION
-Total Cost of Ownership: {format_number(total_tco, prefix='$')}
-Total Queries: {format_number(total_queries)}
-Average Cost per Query: {format_number(avg_cost_per_query, decimals=4, prefix='$')}
-Annual Growth Rate: {growth_rate*100:.0f}%
-
-DEPLOYMENT COMPARISON
-Customer VPC: {format_number(customer_vpc_costs['total_cost'], prefix='$')} ({format_number(customer_vpc_costs['cost_per_query'], decimals=4, prefix='$')}/query)
-Uniphore VPC: {format_number(uniphore_vpc_costs['total_cost'], prefix='$')} ({format_number(uniphore_vpc_costs['cost_per_query'], decimals=4, prefix='$')}/query)
-Difference: {format_number(cost_difference, prefix='$')} ({format_number(cost_difference_pct, decimals=1)}%)
-Recommendation: {cheaper_option} for this volume
-"""
+    exec_summary = graph['executive_summary']
     
     st.download_button(
         label="📄 Download Executive Summary",
@@ -802,6 +1522,88 @@ Recommendation: {cheaper_option} for this volume
         mime="text/plain"
     )
 
+# Saved quotes
+profiler.section("Saved Quotes")
+st.markdown("## 💾 Saved Quotes")
+
+quote_inputs = {
+    'annual_queries': annual_queries,
+    'platform_fee': platform_fee,
+    'credit_cost': credit_cost,
+    'queries_per_credit': queries_per_credit,
+    'years': projection_years,
+    'growth_rate': growth_rate,
+    'credit_schedule': credit_schedule,
+}
+if growth_curve is not None:
+    quote_inputs['growth_curve'] = growth_curve
+if exact_cents:
+    quote_inputs['credit_rounding'] = credit_rounding
+
+col1, col2 = st.columns([3, 1])
+
+with col1:
+    quote_customer = st.text_input("Customer", placeholder="Customer name for this quote")
+
+with col2:
+    st.markdown("<br>", unsafe_allow_html=True)
+    if st.button("💾 Save Quote", disabled=not quote_customer.strip()):
+        quote_id = scenario_store.save_quote(quote_customer, deployment_model, quote_inputs, costs)
+        st.success(f"Saved quote #{quote_id} for {quote_customer.strip()}")
+
+# Identical scenarios are stored once; show who already has a quote for this one
+same_quotes = scenario_store.list_quotes(limit=5, inputs_hash=quote_hash(deployment_model, quote_inputs))
+if same_quotes:
+    st.caption("These inputs are already quoted for: " + ", ".join(
+        f"{quote['customer']} (#{quote['id']}, {datetime.fromtimestamp(quote['saved_at']):%Y-%m-%d})" for quote in same_quotes
+    ))
+
+if st.checkbox("Browse saved quotes", help="Filter and page through saved quotes; only the page shown is read from the store"):
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        filter_customer = st.text_input("Customer starts with")
+
+    with col2:
+        filter_model = st.selectbox("Deployment", options=['All'] + list(DEPLOYMENT_MODELS))
+
+    with col3:
+        filter_days = st.selectbox("Saved in the last", options=['Any time', '7 days', '30 days', '90 days', '365 days'])
+
+    quote_filters = {
+        'customer': filter_customer,
+        'deployment_model': None if filter_model == 'All' else filter_model,
+        'since': None if filter_days == 'Any time' else datetime.now().timestamp() - int(filter_days.split()[0]) * 86400,
+    }
+    quote_count = scenario_store.count_quotes(**quote_filters)
+    page_size = 25
+    page = st.number_input(
+        f"Page (of {max(1, math.ceil(quote_count / page_size))})",
+        min_value=1,
+        max_value=max(1, math.ceil(quote_count / page_size)),
+        value=1
+    )
+    quotes = scenario_store.list_quotes(limit=page_size, offset=(page - 1) * page_size, **quote_filters)
+
+    st.dataframe(pd.DataFrame({
+        'Quote': [f"#{quote['id']}" for quote in quotes],
+        'Customer': [quote['customer'] for quote in quotes],
+        'Deployment': [quote['deployment_model'] for quote in quotes],
+        'Saved': [f"{datetime.fromtimestamp(quote['saved_at']):%Y-%m-%d %H:%M}" for quote in quotes],
+        'Year 1 Queries': [format_number(quote['annual_queries']) for quote in quotes],
+        'Years': [quote['years'] for quote in quotes],
+        'TCO': [format_number(quote['total_cost'], prefix='$') for quote in quotes],
+    }), use_container_width=True, hide_index=True)
+    st.caption(f"{format_number(quote_count)} matching quotes")
+
+    if quotes:
+        quote_labels = {f"#{quote['id']} {quote['customer']}": quote['id'] for quote in quotes}
+        selected_quote = scenario_store.load_quote(quote_labels[st.selectbox("Show quote", options=list(quote_labels))])
+        if selected_quote:
+            st.dataframe(cached_summary_table(selected_quote['costs']), use_container_width=True, hide_index=True)
+            st.caption("Inputs: " + ", ".join(f"{name} = {value}" for name, value in selected_quote['inputs'].items()
+                                              if value is not None))
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -811,3 +1613,49 @@ st.markdown("""
     Uniphore Business AI Cloud
     </div>
 """, unsafe_allow_html=True)
+
+# Render profile panel
+if profiler.enabled:
+    profile = profiler.finish()
+    profile_cprofile = profile.pop('cprofile')
+    if 'profile_history' not in st.session_state:
+        st.session_state.profile_history = []
+    st.session_state.profile_history = (st.session_state.profile_history + [profile])[-PROFILE_HISTORY:]
+
+    with st.sidebar:
+        st.markdown("---")
+        with st.expander("⏱️ Render Profile", expanded=True):
+            st.metric("Last Rerun", format_number(profile['total_s'] * 1000, decimals=1, suffix=' ms'))
+            st.dataframe(
+                {
+                    'Section': [name for name, _ in profile['sections']],
+                    'ms': [round(seconds * 1000, 1) for _, seconds in profile['sections']],
+                    '%': [round(seconds / profile['total_s'] * 100, 1) for _, seconds in profile['sections']],
+                },
+                use_container_width=True,
+                hide_index=True
+            )
+            if profile['calls']:
+                st.markdown("**Pricing calls**")
+                st.dataframe(
+                    {
+                        'Section': [section for section, _, _ in profile['calls']],
+                        'Call': [name for _, name, _ in profile['calls']],
+                        'ms': [round(seconds * 1000, 2) for _, _, seconds in profile['calls']],
+                    },
+                    use_container_width=True,
+                    hide_index=True
+                )
+            st.caption("Recomputed nodes: " + (", ".join(graph.recomputed) or "none"))
+            st.markdown(f"**Last {len(st.session_state.profile_history)} reruns**")
+            st.dataframe(history_table(st.session_state.profile_history), use_container_width=True, hide_index=True)
+
+            st.checkbox("cProfile every rerun", key='profile_cprofile', help="Takes effect from the next rerun; slows reruns while on")
+            if profile_cprofile:
+                st.code(profile_cprofile['report'], language=None)
+                st.download_button(
+                    label="Download cProfile (.prof)",
+                    data=profile_cprofile['dump'],
+                    file_name=f"rerun_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prof",
+                    mime="application/octet-stream"
+                )
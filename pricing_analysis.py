@@ -0,0 +1,954 @@
+"""Scenario analysis on top of the pricing engine.
+
+Vectorized analyses (Monte Carlo volume uncertainty, sensitivity sweeps) that
+evaluate the calculate_costs model over many inputs at once. Like
+pricing_engine, this module has no UI dependencies and imports NumPy lazily.
+"""
+
+# Volume distributions: spread is relative to annual_queries (0.25 = 25%)
+VOLUME_DISTRIBUTIONS = ['Lognormal', 'Normal', 'Uniform', 'Triangular']
+
+# Growth distributions: spread is in absolute growth-rate points (0.05 = ±5%)
+GROWTH_DISTRIBUTIONS = ['Fixed', 'Normal', 'Uniform', 'Triangular']
+
+SIMULATION_PERCENTILES = [10, 50, 90]
+
+def _draw(rng, distribution, center, spread, size):
+    """Draw samples around center from one of the supported distributions"""
+    import numpy as np
+
+    if distribution == 'Fixed' or spread == 0:
+        return np.full(size, center, dtype=np.float64)
+    if distribution == 'Lognormal':
+        return center * rng.lognormal(0.0, spread, size)
+    if distribution == 'Normal':
+        return rng.normal(center, spread, size)
+    if distribution == 'Uniform':
+        return rng.uniform(center - spread, center + spread, size)
+    if distribution == 'Triangular':
+        return rng.triangular(center - spread, center, center + spread, size)
+    raise ValueError(f"Unknown distribution: {distribution}")
+
+def simulate_volume_paths(annual_queries, years=3, growth_rate=0, trials=100000,
+                          volume_distribution='Lognormal', volume_spread=0.25,
+                          growth_distribution='Normal', growth_spread=0.05, seed=None, growth_curve=None):
+    """(trial x year) query volumes under volume and growth uncertainty.
+
+    Year 1 volume is drawn once per trial (volume_spread is relative to
+    annual_queries); growth is drawn independently for every trial and year
+    (growth_spread is in growth-rate points). With a growth_curve, each
+    year's step along the curve is scaled by (1 + drawn growth) / (1 + growth_rate),
+    so the draws scatter volume around the curve instead of compounding.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+
+    # Lognormal spread is sigma of log-volume; the others are a fraction of annual_queries
+    if volume_distribution == 'Lognormal':
+        volumes = _draw(rng, volume_distribution, annual_queries, volume_spread, trials)
+    else:
+        volumes = _draw(rng, volume_distribution, annual_queries, volume_spread * annual_queries, trials)
+    # Negative draws from symmetric distributions mean "almost no usage", not negative usage
+    volumes = np.maximum(volumes, 1.0)
+
+    growth = _draw(rng, growth_distribution, growth_rate, growth_spread, (trials, max(years - 1, 0)))
+    growth = np.maximum(growth, -0.99)
+    factors = np.ones((trials, years))
+    if years > 1:
+        if growth_curve is None:
+            factors[:, 1:] = np.cumprod(1 + growth, axis=1)
+        else:
+            from pricing_engine import growth_factor, validate_growth_curve
+
+            validate_growth_curve(growth_curve)
+            curve = np.array([growth_factor(growth_rate, elapsed, growth_curve) for elapsed in range(years)])
+            factors = curve * factors
+            factors[:, 1:] *= np.cumprod((1 + growth) / (1 + growth_rate), axis=1)
+
+    return volumes[:, None] * factors
+
+def simulate_costs(annual_queries, platform_fee, credit_cost, queries_per_credit, years=3, growth_rate=0,
+                   trials=100000, volume_distribution='Lognormal', volume_spread=0.25,
+                   growth_distribution='Normal', growth_spread=0.05, seed=None,
+                   credit_schedule=None, growth_curve=None, credit_rounding=None):
+    """Monte Carlo projection of calculate_costs under volume and growth uncertainty.
+
+    Volumes come from simulate_volume_paths. Each simulated year is priced
+    like the projection: with the credit_schedule's tiers when given, and in
+    exact cents with credit_rounding (see calculate_costs_cents; volumes and
+    queries_per_credit rounded to whole queries). Returns 'year',
+    'percentiles' and a (percentile x year) array for each of 'total_cost',
+    'tco' (cumulative total cost through that year) and 'cost_per_query'.
+    """
+    import numpy as np
+
+    queries = simulate_volume_paths(annual_queries, years, growth_rate, trials, volume_distribution,
+                                    volume_spread, growth_distribution, growth_spread, seed, growth_curve)
+    if credit_rounding:
+        from pricing_engine import calculate_costs_cents_batch
+
+        # Every trial-year is a one-year scenario at its simulated volume
+        result = calculate_costs_cents_batch(queries.reshape(-1), platform_fee, credit_cost,
+                                             np.rint(queries_per_credit), 1, credit_schedule=credit_schedule,
+                                             credit_rounding=credit_rounding)
+        total_cost = result['cents']['total_cost'].reshape(queries.shape) / 100
+        queries = result['queries'].reshape(queries.shape)
+    elif credit_schedule:
+        from pricing_engine import tiered_consumption_cost_batch
+
+        total_cost = platform_fee + tiered_consumption_cost_batch(queries / queries_per_credit, credit_schedule)
+    else:
+        total_cost = platform_fee + queries / queries_per_credit * credit_cost
+    # A custom curve can take a year to zero volume, where cost per query is undefined
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cost_per_query = np.where(queries > 0, total_cost / queries, np.nan)
+    tco = np.cumsum(total_cost, axis=1)
+
+    return {
+        'year': np.arange(1, years + 1),
+        'percentiles': SIMULATION_PERCENTILES,
+        'trials': trials,
+        'total_cost': np.percentile(total_cost, SIMULATION_PERCENTILES, axis=0),
+        'tco': np.percentile(tco, SIMULATION_PERCENTILES, axis=0),
+        'cost_per_query': np.percentile(cost_per_query, SIMULATION_PERCENTILES, axis=0),
+    }
+
+# Inputs that can be swept in sensitivity analysis, with display labels
+SENSITIVITY_PARAMETERS = {
+    'platform_fee': 'Platform Fee ($)',
+    'credit_cost': 'Cost per Credit ($)',
+    'queries_per_credit': 'Queries per Credit',
+    'annual_queries': 'Annual Queries',
+    'growth_rate': 'Growth Rate',
+}
+
+def sensitivity_parameters(credit_schedule=None, growth_curve=None):
+    """The SENSITIVITY_PARAMETERS the pricing depends on.
+
+    A credit schedule sets the credit price and a custom growth curve the
+    growth, so credit_cost / growth_rate are left out when those are used.
+    """
+    ignored = set()
+    if credit_schedule:
+        ignored.add('credit_cost')
+    if growth_curve and growth_curve.get('type') == 'custom':
+        ignored.add('growth_rate')
+    return {name: label for name, label in SENSITIVITY_PARAMETERS.items() if name not in ignored}
+
+def projection_totals(annual_queries, platform_fee, credit_cost, queries_per_credit, years=3, growth_rate=0,
+                      credit_schedule=None, growth_curve=None, credit_rounding=None):
+    """TCO and total queries over the projection, broadcasting over array inputs.
+
+    Same model as summing calculate_costs over its years, without the
+    per-year rows: any input may be a NumPy array of any shape. Compound
+    growth at flat prices is summed in closed form; a credit_schedule or
+    growth_curve prices the broadcast inputs with calculate_costs_batch, and
+    credit_rounding with calculate_costs_cents_batch (queries_per_credit
+    rounded to whole queries, as exact pricing needs).
+    """
+    import numpy as np
+
+    if not (credit_schedule or growth_curve or credit_rounding):
+        growth = np.asarray(growth_rate, dtype=np.float64)
+        volume_factor = sum((1 + growth) ** (year - 1) for year in range(1, years + 1))
+        total_queries = np.asarray(annual_queries, dtype=np.float64) * volume_factor
+        tco = years * np.asarray(platform_fee, dtype=np.float64) + total_queries / queries_per_credit * credit_cost
+        return tco, total_queries
+
+    from pricing_engine import calculate_costs_batch, calculate_costs_cents_batch
+
+    arrays = np.broadcast_arrays(*[np.asarray(value, dtype=np.float64) for value in
+                                   (annual_queries, platform_fee, credit_cost, queries_per_credit, growth_rate)])
+    shape = arrays[0].shape
+    volume, fee, price, ratio, growth = (array.reshape(-1) for array in arrays)
+    if credit_rounding:
+        result = calculate_costs_cents_batch(volume, fee, price, np.rint(ratio), years, growth,
+                                             credit_schedule=credit_schedule, credit_rounding=credit_rounding,
+                                             growth_curve=growth_curve)
+        tco = result['cents']['total_cost'].sum(axis=1) / 100
+    else:
+        result = calculate_costs_batch(volume, fee, price, ratio, years, growth,
+                                       credit_schedule=credit_schedule, growth_curve=growth_curve)
+        tco = result['total_cost'].sum(axis=1)
+    return tco.reshape(shape), result['queries'].sum(axis=1).reshape(shape)
+
+def sweep_values(parameter, base_value, spread, points):
+    """Evenly spaced values within ±spread (fraction) of base_value.
+
+    A zero growth rate sweeps 0..spread instead, so the axis is not empty.
+    """
+    import numpy as np
+
+    if parameter == 'growth_rate' and base_value == 0:
+        return np.linspace(0, spread, points)
+    return np.linspace(base_value * (1 - spread), base_value * (1 + spread), points)
+
+def sensitivity_grid(inputs, x_parameter, x_values, y_parameter, y_values, years=3, credit_schedule=None,
+                     growth_curve=None, credit_rounding=None):
+    """Evaluate the cost model over a 2-D grid of two inputs in one vectorized pass.
+
+    inputs holds the current value of every SENSITIVITY_PARAMETERS key; the
+    swept pair is replaced by the grid axes. The pricing options are as in
+    projection_totals. Returns 'tco' and 'cost_per_query' (TCO / total
+    queries) as (len(y_values) x len(x_values)) arrays.
+    """
+    import numpy as np
+
+    if x_parameter == y_parameter:
+        raise ValueError("Sweep two different parameters")
+
+    grid = dict(inputs)
+    grid[x_parameter] = np.asarray(x_values, dtype=np.float64)[None, :]
+    grid[y_parameter] = np.asarray(y_values, dtype=np.float64)[:, None]
+    tco, total_queries = projection_totals(years=years, credit_schedule=credit_schedule, growth_curve=growth_curve,
+                                           credit_rounding=credit_rounding, **grid)
+    shape = (len(y_values), len(x_values))
+    return {
+        'tco': np.broadcast_to(tco, shape),
+        'cost_per_query': np.broadcast_to(tco / total_queries, shape),
+    }
+
+def tornado_analysis(inputs, years=3, swing=0.2, credit_schedule=None, growth_curve=None, credit_rounding=None):
+    """One-at-a-time ±swing (fraction) sensitivity of projection TCO.
+
+    Returns one dict per parameter the pricing uses (sensitivity_parameters)
+    with its low/high input values and the resulting TCO, sorted by the size
+    of the TCO swing (largest first). The pricing options are as in
+    projection_totals.
+    """
+    import numpy as np
+
+    labels = sensitivity_parameters(credit_schedule, growth_curve)
+    parameters = list(labels)
+    # Row 0 is the base case, then a low and a high row per parameter
+    scenarios = {name: np.full(1 + 2 * len(parameters), float(inputs[name])) for name in SENSITIVITY_PARAMETERS}
+    for i, name in enumerate(parameters):
+        scenarios[name][1 + 2 * i] *= 1 - swing
+        scenarios[name][2 + 2 * i] *= 1 + swing
+    tco, _ = projection_totals(years=years, credit_schedule=credit_schedule, growth_curve=growth_curve,
+                               credit_rounding=credit_rounding, **scenarios)
+
+    bars = []
+    for i, name in enumerate(parameters):
+        bars.append({
+            'parameter': name,
+            'label': labels[name],
+            'low_value': scenarios[name][1 + 2 * i],
+            'high_value': scenarios[name][2 + 2 * i],
+            'low_tco': tco[1 + 2 * i],
+            'high_tco': tco[2 + 2 * i],
+            'base_tco': tco[0],
+        })
+    bars.sort(key=lambda bar: abs(bar['high_tco'] - bar['low_tco']), reverse=True)
+    return bars
+
+def horizon_volume_factor(years, growth_rate, growth_curve=None):
+    """Total queries over the projection as a multiple of Year 1 volume.
+
+    Closed form of sum((1 + g) ** (year - 1)) that also accepts fractional
+    years, so break-even horizons can be solved continuously. A growth_curve
+    sums its factors over whole years.
+    """
+    import numpy as np
+
+    if growth_curve is not None:
+        return sum(_curve_factors(growth_rate, elapsed, growth_curve) for elapsed in range(int(years)))
+    years = np.asarray(years, dtype=np.float64)
+    growth = np.asarray(growth_rate, dtype=np.float64)
+    safe_growth = np.where(growth == 0, 1.0, growth)
+    return np.where(growth == 0, years, ((1 + growth) ** years - 1) / safe_growth)
+
+def _curve_factors(growth_rate, elapsed, growth_curve):
+    """pricing_engine.growth_factor over arrays of growth rates and elapsed years"""
+    import numpy as np
+
+    from pricing_engine import growth_factor
+
+    return np.vectorize(lambda growth, time: growth_factor(growth, time, growth_curve),
+                        otypes=[np.float64])(growth_rate, elapsed)
+
+def _model_terms(model):
+    """Platform fee and cost per query of a model dict (values may be arrays)"""
+    import numpy as np
+
+    fee = np.asarray(model['platform_fee'], dtype=np.float64)
+    rate = np.asarray(model['credit_cost'], dtype=np.float64) / np.asarray(model['queries_per_credit'], dtype=np.float64)
+    return fee, rate
+
+def _annual_cost(model, year_queries, credit_schedule=None):
+    """Annual cost of a model dict at a year's volume, priced per credit_schedule when given"""
+    import numpy as np
+
+    from pricing_engine import tiered_consumption_cost_batch
+
+    if not credit_schedule:
+        fee, rate = _model_terms(model)
+        return fee + year_queries * rate
+    credits = year_queries / np.asarray(model['queries_per_credit'], dtype=np.float64)
+    return np.asarray(model['platform_fee'], dtype=np.float64) + tiered_consumption_cost_batch(credits, credit_schedule)
+
+def _projection_tco(model, annual_queries, years, growth_rate, credit_schedule=None, growth_curve=None):
+    """Projection TCO of a model dict from its Year 1 volume (closed form at flat prices)"""
+    import numpy as np
+
+    volume = np.asarray(annual_queries, dtype=np.float64)
+    if not credit_schedule:
+        fee, rate = _model_terms(model)
+        return np.asarray(years, dtype=np.float64) * fee + volume * horizon_volume_factor(years, growth_rate, growth_curve) * rate
+    # Tiers apply to each year's credits, so the years are priced one at a time
+    return sum(_annual_cost(model, volume * _curve_factors(growth_rate, elapsed, growth_curve), credit_schedule)
+               for elapsed in range(int(years)))
+
+def _first_crossing(gap, grid, shape):
+    """First value past grid[0] at which gap(values) changes sign, per element.
+
+    Finds the first grid interval over which the sign differs from its sign at
+    grid[0] and bisects it; NaN where it never does on the grid.
+    """
+    import numpy as np
+
+    start = np.sign(gap(np.full(shape, float(grid[0]))))
+    low = np.full(shape, float(grid[0]))
+    high = low.copy()
+    found = np.zeros(shape, dtype=bool)
+    for previous, point in zip(grid[:-1], grid[1:]):
+        flipped = ~found & (start != 0) & (np.sign(gap(np.full(shape, float(point)))) != start)
+        low, high = np.where(flipped, float(previous), low), np.where(flipped, float(point), high)
+        found |= flipped
+        if found.all():
+            break
+    low, high, _, _ = _flip_bracket(lambda value: np.sign(gap(value)) == start, low, high, True)
+    return np.where(found, (low + high) / 2, np.nan)
+
+def _positive_or_nan(values):
+    """Keep strictly positive finite solutions, NaN elsewhere (no crossover)"""
+    import numpy as np
+
+    return np.where(np.isfinite(values) & (values > 0), values, np.nan)
+
+def _broadcast_shape(*models, **values):
+    """Shape the model dicts' terms and other inputs broadcast to"""
+    import numpy as np
+
+    terms = [np.asarray(model[key]) for model in models for key in ('platform_fee', 'credit_cost', 'queries_per_credit')]
+    return np.broadcast(*terms, *[np.asarray(value) for value in values.values()]).shape
+
+# Year 1 volumes scanned for a tiered break-even, 10 per decade up to 1e15 queries
+BREAK_EVEN_VOLUMES = [10 ** (exponent / 10) for exponent in range(151)]
+
+def break_even_volume(model_a, model_b, years=1, growth_rate=0, credit_schedule=None, growth_curve=None):
+    """Year 1 volume at which two models have the same projection TCO.
+
+    Models are dicts with 'platform_fee', 'credit_cost' and
+    'queries_per_credit'; any value (and years / growth_rate) may be an
+    array to solve many customers at once. NaN where the cost lines never
+    cross at a positive volume. A growth_curve shapes the volume; under a
+    credit_schedule (which sets the credit price for both models) the TCO is
+    no longer linear in volume, so the lowest crossover is found by scanning
+    BREAK_EVEN_VOLUMES and bisecting, and years must be a whole number.
+    """
+    import numpy as np
+
+    if credit_schedule:
+        def tco_gap(volume):
+            return (_projection_tco(model_a, volume, years, growth_rate, credit_schedule, growth_curve)
+                    - _projection_tco(model_b, volume, years, growth_rate, credit_schedule, growth_curve))
+
+        return _first_crossing(tco_gap, BREAK_EVEN_VOLUMES, _broadcast_shape(model_a, model_b, growth=growth_rate))
+
+    fee_a, rate_a = _model_terms(model_a)
+    fee_b, rate_b = _model_terms(model_b)
+    factor = horizon_volume_factor(years, growth_rate, growth_curve)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume = np.asarray(years, dtype=np.float64) * (fee_b - fee_a) / (factor * (rate_a - rate_b))
+    return _positive_or_nan(volume)
+
+def break_even_credit_cost(model_a, model_b, annual_queries, years=1, growth_rate=0, credit_schedule=None,
+                           growth_curve=None):
+    """Shared credit price at which two models have the same projection TCO.
+
+    Both models are priced at the same credit cost (their own
+    'credit_cost' is ignored). NaN where no positive price equalizes them,
+    and everywhere under a credit_schedule, which sets the price itself.
+    """
+    import numpy as np
+
+    fee_a, _ = _model_terms(model_a)
+    fee_b, _ = _model_terms(model_b)
+    efficiency_gap = 1 / np.asarray(model_a['queries_per_credit'], dtype=np.float64) - \
+        1 / np.asarray(model_b['queries_per_credit'], dtype=np.float64)
+    total_queries = np.asarray(annual_queries, dtype=np.float64) * horizon_volume_factor(years, growth_rate, growth_curve)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        credit_cost = np.asarray(years, dtype=np.float64) * (fee_b - fee_a) / (total_queries * efficiency_gap)
+    if credit_schedule:
+        return np.full(np.shape(credit_cost), np.nan)
+    return _positive_or_nan(credit_cost)
+
+def break_even_annual_year(model_a, model_b, annual_queries, growth_rate, credit_schedule=None, growth_curve=None,
+                           max_years=10):
+    """Projection year in which two models' annual costs are equal (closed form).
+
+    Solves fee_a + V (1 + g) ** (t - 1) rate_a = fee_b + V (1 + g) ** (t - 1) rate_b
+    for t >= 1. NaN without growth or where the annual costs never cross.
+    With a credit_schedule or growth_curve the annual costs are priced at
+    the curve's volume for each t and the first crossing within max_years
+    is bisected.
+    """
+    import numpy as np
+
+    if credit_schedule or growth_curve is not None:
+        volume = np.asarray(annual_queries, dtype=np.float64)
+
+        def annual_gap(year):
+            year_queries = volume * _curve_factors(growth_rate, year - 1, growth_curve)
+            return _annual_cost(model_a, year_queries, credit_schedule) - _annual_cost(model_b, year_queries, credit_schedule)
+
+        shape = _broadcast_shape(model_a, model_b, volume=volume, growth=growth_rate)
+        return _first_crossing(annual_gap, list(range(1, max_years + 1)), shape)
+
+    fee_a, rate_a = _model_terms(model_a)
+    fee_b, rate_b = _model_terms(model_b)
+    growth = np.asarray(growth_rate, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        volume_ratio = (fee_b - fee_a) / (np.asarray(annual_queries, dtype=np.float64) * (rate_a - rate_b))
+        year = 1 + np.log(volume_ratio) / np.log1p(growth)
+    return np.where(np.isfinite(year) & (year >= 1), year, np.nan)
+
+def break_even_tco_year(model_a, model_b, annual_queries, growth_rate, max_years=10, iterations=60,
+                        credit_schedule=None, growth_curve=None):
+    """Horizon (in years, fractional) at which two models' cumulative TCO is equal.
+
+    No closed form once growth is involved, so this bisects
+    years * fee_gap + V * horizon_volume_factor(years, g) * rate_gap = 0 on
+    (0, max_years] for all inputs at once. NaN where TCO does not cross.
+    With a credit_schedule or growth_curve, TCO is summed over whole
+    projection years and runs linearly through each year, so the crossing
+    is interpolated within the year it happens in.
+    """
+    import numpy as np
+
+    if credit_schedule or growth_curve is not None:
+        volume = np.asarray(annual_queries, dtype=np.float64)
+        annual_gap = np.stack(np.broadcast_arrays(*[
+            _annual_cost(model_a, volume * _curve_factors(growth_rate, elapsed, growth_curve), credit_schedule)
+            - _annual_cost(model_b, volume * _curve_factors(growth_rate, elapsed, growth_curve), credit_schedule)
+            for elapsed in range(max_years)
+        ]), axis=-1)
+        tco_gap = np.cumsum(annual_gap, axis=-1)
+        start = np.sign(annual_gap[..., :1])
+        crossed = (start != 0) & (np.sign(tco_gap) != start)
+        year = np.argmax(crossed, axis=-1)[..., None]
+        before = np.take_along_axis(np.concatenate([np.zeros_like(tco_gap[..., :1]), tco_gap[..., :-1]], axis=-1), year, axis=-1)
+        after = np.take_along_axis(tco_gap, year, axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            horizon = (year + before / (before - after))[..., 0]
+        return np.where(crossed.any(axis=-1), horizon, np.nan)
+
+    fee_a, rate_a = _model_terms(model_a)
+    fee_b, rate_b = _model_terms(model_b)
+    fee_gap, rate_gap = fee_a - fee_b, rate_a - rate_b
+    volume = np.asarray(annual_queries, dtype=np.float64)
+
+    def tco_gap(years):
+        return years * fee_gap + volume * horizon_volume_factor(years, growth_rate) * rate_gap
+
+    # Start just past zero: the gap is zero at years=0 for every input
+    low = np.full(np.broadcast(fee_gap, rate_gap, volume, np.asarray(growth_rate)).shape, 1e-6)
+    high = np.full_like(low, float(max_years))
+    low_sign = np.sign(tco_gap(low))
+    crosses = low_sign * np.sign(tco_gap(high)) < 0
+    for _ in range(iterations):
+        middle = (low + high) / 2
+        same_side = np.sign(tco_gap(middle)) == low_sign
+        low = np.where(same_side, middle, low)
+        high = np.where(same_side, high, middle)
+    return np.where(crosses, (low + high) / 2, np.nan)
+
+def cheapest_model(models, annual_queries, years=1, growth_rate=0, credit_schedule=None, growth_curve=None):
+    """Index into models of the lowest projection TCO, per customer.
+
+    models is a list of model dicts; inputs broadcast, so a whole book of
+    customers is ranked in one pass.
+    """
+    import numpy as np
+
+    tco = np.stack(np.broadcast_arrays(*[
+        _projection_tco(model, annual_queries, years, growth_rate, credit_schedule, growth_curve) for model in models
+    ]))
+    return np.argmin(tco, axis=0)
+
+def break_even_table(models, annual_queries, years=1, growth_rate=0, max_years=10, credit_schedule=None,
+                     growth_curve=None):
+    """Every pairwise crossover between named models at the current inputs.
+
+    models maps name -> model dict. Returns one dict per pair with the
+    break-even volume, shared credit price, annual-cost year and TCO horizon
+    (NaN where there is no crossover) and which model is cheaper now, all
+    priced with the credit_schedule and growth_curve.
+    """
+    pricing = {'credit_schedule': credit_schedule, 'growth_curve': growth_curve}
+    names = list(models)
+    rows = []
+    for i, name_a in enumerate(names):
+        for name_b in names[i + 1:]:
+            model_a, model_b = models[name_a], models[name_b]
+            cheaper = cheapest_model([model_a, model_b], annual_queries, years, growth_rate, **pricing)
+            rows.append({
+                'model_a': name_a,
+                'model_b': name_b,
+                'cheaper_now': (name_a, name_b)[int(cheaper)],
+                'volume': float(break_even_volume(model_a, model_b, years, growth_rate, **pricing)),
+                'credit_cost': float(break_even_credit_cost(model_a, model_b, annual_queries, years, growth_rate, **pricing)),
+                'annual_year': float(break_even_annual_year(model_a, model_b, annual_queries, growth_rate,
+                                                            max_years=max_years, **pricing)),
+                'tco_year': float(break_even_tco_year(model_a, model_b, annual_queries, growth_rate, max_years,
+                                                      **pricing)),
+            })
+    return rows
+
+def compare_deployments(models, annual_queries, years=1, growth_rate=0, credit_schedule=None, credit_rounding=None):
+    """Price every named model in one batch and rank them.
+
+    models maps name -> model dict (see pricing_engine.deployment_pricing).
+    Returns 'costs' (name -> CostTable), 'cheapest' (names by projection TCO,
+    lowest first) and 'most_efficient' (names by consumption cost per query,
+    i.e. what each extra query costs, lowest first); ties keep registry order.
+    credit_rounding prices in exact cents, as calculate_costs_cents_batch.
+    """
+    import numpy as np
+
+    from pricing_engine import batch_table, calculate_costs_batch, calculate_costs_cents_batch
+
+    names = list(models)
+    terms = {key: np.array([models[name][key] for name in names], dtype=np.float64)
+             for key in ('platform_fee', 'credit_cost', 'queries_per_credit')}
+    if credit_rounding:
+        result = calculate_costs_cents_batch(annual_queries, **terms, years=years, growth_rate=growth_rate,
+                                             credit_schedule=credit_schedule, credit_rounding=credit_rounding)
+    else:
+        result = calculate_costs_batch(annual_queries, **terms, years=years, growth_rate=growth_rate,
+                                       credit_schedule=credit_schedule)
+
+    tco = np.nansum(result['total_cost'], axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        per_query = np.nansum(result['consumption_cost'], axis=1) / np.nansum(result['queries'], axis=1)
+    return {
+        'costs': {name: batch_table(result, i) for i, name in enumerate(names)},
+        'cheapest': [names[i] for i in np.argsort(tco, kind='stable')],
+        'most_efficient': [names[i] for i in np.argsort(per_query, kind='stable')],
+    }
+
+def tco_by_volume(models, volumes, years=1, growth_rate=0, credit_schedule=None, growth_curve=None):
+    """Projection TCO of each named model over an array of Year 1 volumes"""
+    import numpy as np
+
+    volumes = np.asarray(volumes, dtype=np.float64)
+    return {name: _projection_tco(model, volumes, years, growth_rate, credit_schedule, growth_curve)
+            for name, model in models.items()}
+
+# Goal-seek targets and the inputs that can be solved for, with display labels
+GOAL_METRICS = {
+    'total_cost': 'Year 1 Total Cost ($)',
+    'tco': 'Projection TCO ($)',
+    'cost_per_query': 'Average Cost per Query ($)',
+}
+
+GOAL_VARIABLES = {
+    'annual_queries': 'Annual Queries',
+    'credit_cost': 'Cost per Credit ($)',
+    'platform_fee': 'Platform Fee ($)',
+}
+
+def _goal_metric(metric, result):
+    """GOAL_METRICS value per scenario of a calculate_costs_batch result"""
+    import numpy as np
+
+    if metric == 'total_cost':
+        return result['total_cost'][:, 0]
+    tco = np.nansum(result['total_cost'], axis=1)
+    if metric == 'tco':
+        return tco
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return tco / np.nansum(result['queries'], axis=1)
+
+def _flip_bracket(test, low, high, grow_while, iterations=60):
+    """Bisect each [low, high] down to where the boolean array test(value) flips.
+
+    An infinite high is first grown from max(2 * low, 1) while test stays
+    grow_while at both ends (up to 4 ** 40 ~ 1e24). Returns the final (low, high) and test at the starting
+    low and high; where those agree there is no flip and the bracket has
+    closed up on high.
+    """
+    import numpy as np
+
+    inside_low = test(low)
+    open_ended = np.isinf(high)
+    high = np.where(open_ended, np.maximum(2 * low, 1.0), high)
+    inside_high = test(high)
+    for _ in range(40):
+        growing = open_ended & (inside_low == grow_while) & (inside_high == grow_while)
+        if not growing.any():
+            break
+        high = np.where(growing, high * 4, high)
+        inside_high = test(high)
+    for _ in range(iterations):
+        if np.all(high - low <= 1e-12 * high):
+            break
+        middle = (low + high) / 2
+        same = test(middle) == inside_low
+        low, high = np.where(same, middle, low), np.where(same, high, middle)
+    return low, high, inside_low, inside_high
+
+def _all_units_volume(costs, metric, target, arrays, growth_curve, credit_schedule, falling, whole, iterations):
+    """goal_seek's volume under all-units tiers, solved one stretch of volumes at a time.
+
+    All-units cost drops where a year's credits reach the next tier, so it
+    isn't monotone in volume. Credits only grow with volume, so the volume at
+    which each year passes each tier limit is a plain bisection on the engine
+    (its own rounding included); between consecutive ones every year keeps its
+    rate and the metric is monotone. Each stretch is bisected on its own and
+    the largest (smallest, for a falling metric) volume meeting the target
+    wins. whole keeps volumes to whole queries inside their stretch.
+    """
+    import numpy as np
+
+    n = len(target)
+    limits = [float(tier['up_to']) for tier in credit_schedule['tiers'] if tier.get('up_to') is not None]
+    max_years = int(arrays['years'].max())
+    per_scenario = len(limits) * max_years
+
+    def repeated(copies):
+        trial_arrays = {name: np.repeat(value, copies) for name, value in arrays.items()}
+        if growth_curve is None or isinstance(growth_curve, dict):
+            return trial_arrays, growth_curve
+        return trial_arrays, [curve for curve in growth_curve for _ in range(copies)]
+
+    # Volume at which each (scenario, year, limit) switches tier; inf if it never does
+    switch_arrays, switch_curve = repeated(per_scenario)
+    rows = np.arange(n * per_scenario)
+    year = np.tile(np.repeat(np.arange(max_years), len(limits)), n)
+    limit = np.tile(limits * max_years, n)
+
+    def past_limit(value):
+        credits = costs(value, switch_arrays, switch_curve)['credits_needed'][rows, year]
+        return credits > limit
+
+    # Years past a scenario's horizon never switch (an empty [0, 0] bracket)
+    horizon = np.where(year < switch_arrays['years'], np.inf, 0.0)
+    before, after, _, switches = _flip_bracket(past_limit, np.zeros(n * per_scenario), horizon, False, iterations)
+    before, after = np.where(switches, before, np.inf), np.where(switches, after, np.inf)
+    order = np.argsort(after.reshape(n, per_scenario), axis=1)
+    after = np.take_along_axis(after.reshape(n, per_scenario), order, axis=1)
+    before = np.take_along_axis(before.reshape(n, per_scenario), order, axis=1)
+
+    # Stretch j runs from the j-th switch (0 for the first) to just before the next one
+    starts = np.concatenate([np.zeros((n, 1)), after], axis=1).reshape(-1)
+    ends = np.concatenate([before, np.full((n, 1), np.inf)], axis=1).reshape(-1)
+    valid = np.isfinite(starts) & (starts <= ends)
+    starts, ends = np.where(valid, starts, 0.0), np.where(valid, ends, 0.0)
+
+    stretch_arrays, stretch_curve = repeated(per_scenario + 1)
+    stretch_target = np.repeat(target, per_scenario + 1)
+    low, high, inside_low, inside_high = _flip_bracket(
+        lambda value: _goal_metric(metric, costs(value, stretch_arrays, stretch_curve)) <= stretch_target,
+        starts, ends, not falling, iterations)
+    if falling:
+        solved = np.where(inside_low, starts, high)
+        reached = valid & inside_high
+        if whole:
+            solved = np.ceil(solved)
+            reached &= solved <= ends
+        return np.fmin.reduce(np.where(reached, solved, np.nan).reshape(n, -1), axis=1)
+    solved = np.where(inside_low != inside_high, low, high)
+    reached = valid & inside_low & ((inside_low != inside_high) | np.isfinite(ends))
+    if whole:
+        solved = np.floor(solved)
+        reached &= solved >= starts
+    return np.fmax.reduce(np.where(reached, solved, np.nan).reshape(n, -1), axis=1)
+
+def goal_seek(target, metric='total_cost', solve_for='annual_queries', annual_queries=None, platform_fee=None,
+              credit_cost=None, queries_per_credit=None, years=1, growth_rate=0, credit_schedule=None,
+              growth_curve=None, credit_rounding=None, iterations=60):
+    """Value of solve_for at which metric reaches target, for arrays of targets and inputs.
+
+    metric is a GOAL_METRICS key (the cost per query is averaged over the
+    projection: TCO / total queries) and solve_for a GOAL_VARIABLES key,
+    whose own input is ignored. Flat pricing is linear in every unknown, so
+    it is solved in closed form for any growth curve; credit schedules and
+    exact cents (credit_rounding) are bisected on the batch engine for every
+    target at once. All-units tiers make cost drop where a year's credits
+    reach a cheaper tier, so volume is then solved between those points (see
+    _all_units_volume). Cost targets give the largest value that stays within
+    the target, cost per query targets the smallest volume that reaches it
+    (assuming it falls with volume, as it does unless graduated rates rise).
+    NaN where no positive value (non-negative platform fee) reaches the target.
+    """
+    import numpy as np
+
+    from pricing_engine import calculate_costs_batch, calculate_costs_cents_batch
+
+    if metric not in GOAL_METRICS:
+        raise ValueError(f"Unknown goal metric: {metric}")
+    if solve_for not in GOAL_VARIABLES:
+        raise ValueError(f"Unknown goal variable: {solve_for}")
+    if solve_for == 'credit_cost' and credit_schedule:
+        raise ValueError("The credit schedule sets the credit price; solve for volume or platform fee instead")
+
+    inputs = {'annual_queries': annual_queries, 'platform_fee': platform_fee, 'credit_cost': credit_cost,
+              'queries_per_credit': queries_per_credit}
+    inputs[solve_for] = 0.0
+    if credit_schedule and inputs['credit_cost'] is None:
+        inputs['credit_cost'] = 0.0
+    missing = [name for name, value in inputs.items() if value is None]
+    if missing:
+        raise ValueError(f"goal_seek needs {', '.join(missing)}")
+    names = ['target'] + list(inputs) + ['years', 'growth_rate']
+    arrays = dict(zip(names, np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(value, dtype=np.float64))
+          for value in [target] + list(inputs.values()) + [years, growth_rate]]
+    )))
+    target = arrays.pop('target')
+    volume, fee, price, ratio, years = (arrays[name] for name in
+                                        ('annual_queries', 'platform_fee', 'credit_cost', 'queries_per_credit', 'years'))
+
+    if not credit_schedule and not credit_rounding:
+        # Growth factors of a unit volume: Year 1 and summed over each scenario's horizon
+        queries = calculate_costs_batch(1.0, 0.0, 0.0, 1.0, years, arrays['growth_rate'],
+                                        growth_curve=growth_curve)['queries']
+        first_factor, total_factor = queries[:, 0], np.nansum(queries, axis=1)
+        fee_years, factor = (1.0, first_factor) if metric == 'total_cost' else (years, total_factor)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if metric == 'cost_per_query' and solve_for == 'annual_queries':
+                solved = years * fee / (total_factor * (target - price / ratio))
+            else:
+                budget = target * volume * total_factor if metric == 'cost_per_query' else target
+                if solve_for == 'annual_queries':
+                    solved = (budget - fee_years * fee) * ratio / (factor * price)
+                elif solve_for == 'credit_cost':
+                    solved = (budget - fee_years * fee) * ratio / (volume * factor)
+                else:
+                    solved = (budget - volume * factor * price / ratio) / fee_years
+    else:
+        def costs(value, trial_arrays=arrays, curve=growth_curve):
+            trial = dict(trial_arrays, **{solve_for: value})
+            if credit_rounding:
+                return calculate_costs_cents_batch(**trial, credit_schedule=credit_schedule,
+                                                   credit_rounding=credit_rounding, growth_curve=curve)
+            return calculate_costs_batch(**trial, credit_schedule=credit_schedule, growth_curve=curve)
+
+        # Cost falls with volume only for the cost per query; every other pair rises
+        falling = metric == 'cost_per_query' and solve_for == 'annual_queries'
+        if solve_for == 'annual_queries' and credit_schedule and credit_schedule.get('mode') == 'all_units':
+            solved = _all_units_volume(costs, metric, target, arrays, growth_curve, credit_schedule,
+                                       falling, bool(credit_rounding), iterations)
+        else:
+            low = np.zeros_like(target)
+            low, high, inside_low, inside_high = _flip_bracket(
+                lambda value: _goal_metric(metric, costs(value)) <= target, low, np.full_like(target, np.inf),
+                not falling, iterations)
+            if falling:
+                solved = np.where(~inside_low & inside_high, high, np.nan)
+            else:
+                solved = np.where(inside_low & ~inside_high, low, np.nan)
+        if credit_rounding and solve_for == 'annual_queries':
+            # Exact pricing bills whole queries
+            solved = np.ceil(solved) if falling else np.floor(solved)
+
+    if solve_for == 'platform_fee':
+        return np.where(np.isfinite(solved) & (solved >= 0), solved, np.nan)
+    return _positive_or_nan(solved)
+
+# Prepaid credit contract terms offered alongside pay-as-you-go:
+#   discounts       - (minimum yearly commitment in credits, prepay discount off list), by commitment size
+#   overage_premium - credits used beyond the commitment cost list * (1 + premium)
+#   rollover        - share of a year's unused committed credits usable in the next year (then expired)
+COMMITMENT_TERMS = {
+    'Use It or Lose It': {
+        'discounts': [(0, 0.15), (1000, 0.20), (5000, 0.25)],
+        'overage_premium': 0.10,
+        'rollover': 0.0,
+    },
+    'Partial Rollover': {
+        'discounts': [(0, 0.10), (1000, 0.15), (5000, 0.20)],
+        'overage_premium': 0.10,
+        'rollover': 0.5,
+    },
+    'Full Rollover': {
+        'discounts': [(0, 0.05), (1000, 0.10), (5000, 0.15)],
+        'overage_premium': 0.0,
+        'rollover': 1.0,
+    },
+}
+
+def validate_commitment_terms(terms):
+    """Check contract terms shaped like COMMITMENT_TERMS; ValueError on a bad one"""
+    if not terms:
+        raise ValueError("Add at least one contract")
+    for name, contract in terms.items():
+        if not name:
+            raise ValueError("Every contract needs a name")
+        discounts = contract.get('discounts')
+        if not discounts:
+            raise ValueError(f"{name} needs at least one discount band")
+        if any(not minimum >= 0 or not 0 <= discount < 1 for minimum, discount in discounts):
+            raise ValueError(f"{name}: discount bands need a non-negative start and a discount from 0% to under 100%")
+        if not contract.get('overage_premium', 0) >= 0:
+            raise ValueError(f"{name}: the overage premium can't be negative")
+        if not 0 <= contract.get('rollover', 0) <= 1:
+            raise ValueError(f"{name}: rollover must be between 0% and 100%")
+
+# Contract x scenario cells evaluated per block, to bound memory
+COMMITMENT_BLOCK_CELLS = 4000000
+
+def commitment_prices(commitments, credit_cost, discounts):
+    """Prepaid price per credit for each yearly commitment, from its discount band"""
+    import numpy as np
+
+    minimums = np.array([minimum for minimum, _ in discounts], dtype=np.float64)
+    rates = np.array([discount for _, discount in discounts], dtype=np.float64)
+    band = np.searchsorted(minimums, np.asarray(commitments, dtype=np.float64), side='right') - 1
+    return credit_cost * (1 - np.where(band >= 0, rates[np.maximum(band, 0)], 0.0))
+
+def evaluate_commitments(usage, commitments, prepaid_price, overage_price, rollover, overage_scale=None):
+    """Multi-year credit spend of every contract under every usage scenario.
+
+    usage is (scenario x year) credits consumed. The other arguments are one
+    value (or array of values) per contract: yearly committed credits, prepaid
+    price per committed credit, price per overage credit and rollover share.
+    overage_scale, (scenario x year), scales the overage price in each year
+    (a price book's rate for that year's usage). Rolled-over credits are used
+    first and expire after one year. Returns a (contract x scenario) array;
+    the years are a short loop, everything else is vectorized over contracts
+    and scenarios.
+    """
+    import numpy as np
+
+    usage = np.asarray(usage, dtype=np.float64)
+    commitments, prepaid_price, overage_price, rollover = [
+        np.asarray(v, dtype=np.float64).reshape(-1, 1)
+        for v in np.broadcast_arrays(commitments, prepaid_price, overage_price, rollover)
+    ]
+    scenarios, years = usage.shape
+    spend = np.empty((len(commitments), scenarios))
+    block = max(1, COMMITMENT_BLOCK_CELLS // max(scenarios, 1))
+
+    for start in range(0, len(commitments), block):
+        rows = slice(start, start + block)
+        commit = commitments[rows]
+        overage = np.zeros((len(commit), scenarios))
+        carried = np.zeros_like(overage)
+        for year in range(years):
+            remaining = usage[None, :, year] - np.minimum(carried, usage[None, :, year])
+            from_commitment = np.minimum(commit, remaining)
+            if overage_scale is None:
+                overage += remaining - from_commitment
+            else:
+                overage += (remaining - from_commitment) * overage_scale[None, :, year]
+            carried = rollover[rows] * (commit - from_commitment)
+        spend[rows] = years * commit * prepaid_price[rows] + overage * overage_price[rows]
+    return spend
+
+def _commitment_grid(low, high, points, breakpoints=()):
+    """Whole-credit commitment levels spanning [low, high], plus discount band edges inside it"""
+    import numpy as np
+
+    levels = np.concatenate([np.linspace(low, high, points), [b for b in breakpoints if low <= b <= high]])
+    return np.unique(np.round(levels))
+
+def optimize_commitment(usage, credit_cost, platform_fee=0, terms=None, grid_points=48, refine_rounds=4,
+                        credit_schedule=None):
+    """Cheapest prepaid contract for a set of usage scenarios, against pay-as-you-go.
+
+    usage is (scenario x year) credits (one row for a point forecast). For
+    each contract in terms (default COMMITMENT_TERMS) yearly commitment
+    levels are searched on a coarse grid that includes the discount band
+    edges, then refined refine_rounds times around the best level, every
+    round evaluating all contracts and scenarios in one vectorized pass.
+    Costs are expected (mean) multi-year totals including the platform fee.
+    With a credit_schedule, pay-as-you-go prices each year's credits with it,
+    committed credits are discounted from its average price at the committed
+    level and overage pays its average price at the year's usage plus the
+    premium ('overage_rate' is then the expected one).
+    Returns 'payg', 'best', 'options' (best level per contract, cheapest
+    first) and 'curves' (expected cost versus commitment per contract).
+    """
+    import numpy as np
+
+    from pricing_engine import tiered_consumption_cost_batch
+
+    terms = COMMITMENT_TERMS if terms is None else terms
+    usage = np.atleast_2d(np.asarray(usage, dtype=np.float64))
+    years = usage.shape[1]
+    fee_total = years * platform_fee
+    high = float(usage.max()) if usage.size else 0.0
+
+    # Overage pays overage_price (times overage_scale for the year) plus the contract's premium
+    if credit_schedule:
+        yearly_cost = tiered_consumption_cost_batch(usage, credit_schedule)
+        payg = fee_total + yearly_cost.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            overage_scale = np.where(usage > 0, yearly_cost / usage, 0.0)
+        overage_price = 1.0
+        expected_overage_price = float(overage_scale.mean()) if usage.size else 0.0
+
+        def list_price(levels):
+            # Average price book rate for committing that many credits a year
+            levels = np.maximum(np.asarray(levels, dtype=np.float64), 1.0)
+            return tiered_consumption_cost_batch(levels, credit_schedule) / levels
+    else:
+        payg = fee_total + usage.sum(axis=1) * credit_cost
+        overage_scale = None
+        overage_price = expected_overage_price = credit_cost
+
+        def list_price(levels):
+            return credit_cost
+
+    names = list(terms)
+    levels = {name: _commitment_grid(0, high, grid_points, [m for m, _ in terms[name]['discounts']]) for name in names}
+    curves = {name: {} for name in names}
+    for round_number in range(refine_rounds + 1):
+        counts = [len(levels[name]) for name in names]
+        commitments = np.concatenate([levels[name] for name in names])
+        prepaid = np.concatenate([commitment_prices(levels[name], list_price(levels[name]), terms[name]['discounts'])
+                                  for name in names])
+        overage = np.repeat([overage_price * (1 + terms[name]['overage_premium']) for name in names], counts)
+        rollover = np.repeat([terms[name]['rollover'] for name in names], counts)
+        expected = fee_total + evaluate_commitments(usage, commitments, prepaid, overage, rollover,
+                                                    overage_scale).mean(axis=1)
+
+        for name, chunk_levels, chunk_costs in zip(names, np.split(commitments, np.cumsum(counts)[:-1]),
+                                                   np.split(expected, np.cumsum(counts)[:-1])):
+            curves[name].update(zip(chunk_levels.tolist(), chunk_costs.tolist()))
+            # Zoom in on the neighbours of the best level seen so far
+            points = np.array(sorted(curves[name]))
+            best = int(np.argmin([curves[name][level] for level in points]))
+            low, high_level = points[max(best - 1, 0)], points[min(best + 1, len(points) - 1)]
+            levels[name] = _commitment_grid(low, high_level, grid_points)
+
+    options = []
+    for name in names:
+        commitment = min(curves[name], key=curves[name].get)
+        prepaid = float(commitment_prices(commitment, list_price(commitment), terms[name]['discounts']))
+        overage_rate = overage_price * (1 + terms[name]['overage_premium'])
+        spend = fee_total + evaluate_commitments(usage, commitment, prepaid, overage_rate, terms[name]['rollover'],
+                                                 overage_scale)[0]
+        options.append({
+            'terms': name,
+            'commitment': commitment,
+            'prepaid_rate': prepaid,
+            'overage_rate': expected_overage_price * (1 + terms[name]['overage_premium']),
+            'rollover': terms[name]['rollover'],
+            'expected_cost': float(spend.mean()),
+            'p90_cost': float(np.percentile(spend, 90)),
+            'savings': float(payg.mean() - spend.mean()),
+        })
+    options.sort(key=lambda option: option['expected_cost'])
+
+    return {
+        'payg': {'expected_cost': float(payg.mean()), 'p90_cost': float(np.percentile(payg, 90))},
+        'best': options[0] if options else None,
+        'options': options,
+        'curves': {name: {'commitment': np.array(sorted(curve)), 'expected_cost': np.array([curve[c] for c in sorted(curve)])}
+                   for name, curve in curves.items()},
+    }
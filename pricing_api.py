@@ -0,0 +1,512 @@
+"""Local JSON pricing service for CRM / CPQ integrations.
+
+A small asyncio HTTP/1.1 server (standard library only) in front of
+pricing_engine, with keep-alive connections, an LRU response cache keyed on
+the request body, and latency / throughput metrics.
+
+    python pricing_api.py --port 8502
+
+Endpoints (JSON in, JSON out):
+
+    GET  /health           liveness check
+    GET  /metrics          request counts, latency percentiles, cache hit rate
+    GET  /v1/models        DEPLOYMENT_MODELS and SIZE_TEMPLATES
+    POST /v1/costs         multi-year costs for one scenario
+    POST /v1/costs/batch   {"scenarios": [...]} priced in one vectorized call
+    POST /v1/compare       Year 1 costs for every deployment model, ranked
+    POST /v1/estimate      annual queries from build / run phases
+    POST /v1/goal-seek     volume, credit price or platform fee that meets a cost target
+
+A scenario gives its volume as annual_queries, size_template, or the
+build_months / build_queries_per_month / run_months / run_queries_per_month
+phases, and may set deployment_model, queries_per_credit, platform_fee,
+credit_cost, years, growth_rate (0.15 = 15%), growth_curve and credit_schedule. Missing
+prices fall back to the deployment model's own prices in the registry, then
+(like every other missing value) to DEFAULTS.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import OrderedDict, deque
+
+from pricing_analysis import GOAL_METRICS, GOAL_VARIABLES, compare_deployments, goal_seek
+from pricing_engine import (
+    COST_METRICS,
+    DEPLOYMENT_MODELS,
+    SIZE_TEMPLATES,
+    calculate_costs,
+    calculate_costs_batch,
+    deployment_pricing,
+    estimate_queries_from_phases,
+    growth_factor,
+    tiered_consumption_cost,
+    validate_growth_curve,
+)
+
+DEFAULTS = {
+    'platform_fee': 150000,
+    'credit_cost': 5,
+    'deployment_model': next(iter(DEPLOYMENT_MODELS)),
+    'years': 3,
+    'growth_rate': 0.15,
+}
+
+PHASE_FIELDS = ['build_months', 'build_queries_per_month', 'run_months', 'run_queries_per_month']
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+class RequestError(ValueError):
+    """A request cannot be served; status is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def _number(payload, name, default=None):
+    """Numeric field from a request payload"""
+    value = payload.get(name, default)
+    if value is None:
+        raise RequestError(f"missing {name}")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RequestError(f"{name} must be a number")
+    if not math.isfinite(value):
+        raise RequestError(f"{name} must be a finite number")
+    return value
+
+def _reject_constant(name):
+    """json.loads hook for NaN / Infinity, which are not JSON"""
+    raise RequestError(f"invalid JSON: {name} is not a number")
+
+def _finite_float(text):
+    """json.loads hook that rejects numbers too large for a float (1e999)"""
+    value = float(text)
+    if not math.isfinite(value):
+        raise RequestError(f"invalid JSON: {text} is out of range")
+    return value
+
+def resolve_volume(payload):
+    """Year 1 query volume from annual_queries, size_template or build / run phases"""
+    if payload.get('annual_queries') is not None:
+        volume = _number(payload, 'annual_queries')
+    elif payload.get('size_template') is not None:
+        template = SIZE_TEMPLATES.get(payload['size_template'])
+        if template is None:
+            raise RequestError(f"unknown size_template {payload['size_template']!r}")
+        volume = template['annual_queries']
+    elif all(payload.get(name) is not None for name in PHASE_FIELDS):
+        volume = estimate_queries_from_phases(*[_number(payload, name) for name in PHASE_FIELDS])
+    else:
+        raise RequestError("missing volume: give annual_queries, size_template or the build / run phases")
+    if volume <= 0:
+        raise RequestError("query volume must be positive")
+    return volume
+
+def resolve_scenario(payload, defaults=DEFAULTS):
+    """Turn a request payload into calculate_costs keyword arguments"""
+    if not isinstance(payload, dict):
+        raise RequestError("scenario must be a JSON object")
+
+    deployment_model = payload.get('deployment_model', defaults['deployment_model'])
+    model = DEPLOYMENT_MODELS.get(deployment_model, {})
+    if payload.get('queries_per_credit') is not None:
+        queries_per_credit = _number(payload, 'queries_per_credit')
+    elif deployment_model in DEPLOYMENT_MODELS:
+        queries_per_credit = DEPLOYMENT_MODELS[deployment_model]['queries_per_credit']
+    else:
+        raise RequestError(f"unknown deployment_model {deployment_model!r}")
+    if queries_per_credit <= 0:
+        raise RequestError("queries_per_credit must be positive")
+
+    years = _number(payload, 'years', defaults['years'])
+    if years != int(years) or not 1 <= years <= 50:
+        raise RequestError("years must be a whole number from 1 to 50")
+
+    credit_schedule = payload.get('credit_schedule')
+    if credit_schedule is not None:
+        try:
+            tiered_consumption_cost(0, credit_schedule)
+        except KeyError as error:
+            raise RequestError(f"invalid credit_schedule: missing {error.args[0]}")
+        except (ValueError, TypeError, AttributeError) as error:
+            raise RequestError(f"invalid credit_schedule: {error}")
+
+    growth_rate = _number(payload, 'growth_rate', defaults['growth_rate'])
+    growth_curve = payload.get('growth_curve')
+    if growth_curve is not None:
+        if not isinstance(growth_curve, dict):
+            raise RequestError("growth_curve must be a JSON object")
+        try:
+            validate_growth_curve(growth_curve)
+            growth_factor(growth_rate, 1, growth_curve)
+        except (ValueError, TypeError) as error:
+            raise RequestError(f"invalid growth_curve: {error}")
+
+    return {
+        'annual_queries': resolve_volume(payload),
+        'platform_fee': _number(payload, 'platform_fee', model.get('platform_fee', defaults['platform_fee'])),
+        'credit_cost': _number(payload, 'credit_cost', model.get('credit_cost', defaults['credit_cost'])),
+        'queries_per_credit': queries_per_credit,
+        'years': int(years),
+        'growth_rate': growth_rate,
+        'credit_schedule': credit_schedule,
+        'growth_curve': growth_curve,
+    }
+
+def _quote(inputs, costs):
+    """Response body for one priced scenario"""
+    return {
+        'inputs': inputs,
+        'costs': costs,
+        'tco': sum(c['total_cost'] for c in costs),
+        'total_queries': sum(c['queries'] for c in costs),
+    }
+
+def price_scenario(payload):
+    """POST /v1/costs"""
+    inputs = resolve_scenario(payload)
+    return _quote(inputs, calculate_costs(**inputs).rows())
+
+def price_batch(payload):
+    """POST /v1/costs/batch: every scenario in one calculate_costs_batch call
+
+    Scenarios sharing a credit_schedule are priced together, so a batch with a
+    single price book is one vectorized call. Scenarios with equal growth
+    curves share one curve, so its volume factors are computed once.
+    """
+    scenarios = payload.get('scenarios') if isinstance(payload, dict) else None
+    if not isinstance(scenarios, list) or not scenarios:
+        raise RequestError("scenarios must be a non-empty list")
+    defaults = dict(DEFAULTS, **{k: v for k, v in payload.items() if k in DEFAULTS})
+
+    resolved = []
+    for i, scenario in enumerate(scenarios):
+        try:
+            resolved.append(resolve_scenario(scenario, defaults))
+        except RequestError as error:
+            raise RequestError(f"scenario {i}: {error}")
+
+    curves = {}
+    for inputs in resolved:
+        if inputs['growth_curve'] is not None:
+            key = json.dumps(inputs['growth_curve'], sort_keys=True)
+            inputs['growth_curve'] = curves.setdefault(key, inputs['growth_curve'])
+
+    groups = {}
+    for i, inputs in enumerate(resolved):
+        schedule = inputs['credit_schedule']
+        key = None if schedule is None else json.dumps(schedule, sort_keys=True)
+        groups.setdefault(key, []).append(i)
+
+    results = [None] * len(resolved)
+    for indices in groups.values():
+        batch = calculate_costs_batch(
+            *[[resolved[i][name] for i in indices] for name in
+              ('annual_queries', 'platform_fee', 'credit_cost', 'queries_per_credit', 'years', 'growth_rate')],
+            credit_schedule=resolved[indices[0]]['credit_schedule'],
+            growth_curve=[resolved[i]['growth_curve'] for i in indices]
+        )
+        # One tolist() per metric instead of a float() per cell
+        year = batch['year'].tolist()
+        columns = {key: batch[key].tolist() for key in COST_METRICS}
+        for row, i in enumerate(indices):
+            costs = []
+            for y in range(resolved[i]['years']):
+                cost = {'year': year[y]}
+                for key in COST_METRICS:
+                    cost[key] = columns[key][row][y]
+                costs.append(cost)
+            results[i] = _quote(resolved[i], costs)
+    return {'results': results}
+
+def compare_models(payload):
+    """POST /v1/compare: Year 1 costs per deployment model, as on the page.
+
+    Every model is priced at its own registry prices unless the request sets
+    platform_fee / credit_cost, in one vectorized call. 'cheapest' ranks the
+    models by cost and 'most_efficient' by consumption cost per query;
+    cost_difference is the saving of the cheapest over the next cheapest.
+    """
+    inputs = resolve_scenario(dict(payload, deployment_model=DEFAULTS['deployment_model'],
+                                   queries_per_credit=None))
+    prices = {key: inputs[key] for key in ('platform_fee', 'credit_cost') if payload.get(key) is not None}
+    terms = {name: dict(model, **prices)
+             for name, model in deployment_pricing(DEFAULTS['platform_fee'], DEFAULTS['credit_cost']).items()}
+    comparison = compare_deployments(terms, inputs['annual_queries'], credit_schedule=inputs['credit_schedule'])
+    models = {name: costs[0] for name, costs in comparison['costs'].items()}
+    ranked = comparison['cheapest']
+    cheapest, runner_up = models[ranked[0]], models[ranked[min(1, len(ranked) - 1)]]
+    difference = runner_up['total_cost'] - cheapest['total_cost']
+    return {
+        'annual_queries': inputs['annual_queries'],
+        'models': models,
+        'cheapest': ranked,
+        'most_efficient': comparison['most_efficient'],
+        'cheaper_option': ranked[0],
+        'cost_difference': difference,
+        'cost_difference_pct': difference / runner_up['total_cost'] * 100,
+    }
+
+def estimate_volume(payload):
+    """POST /v1/estimate"""
+    if not isinstance(payload, dict) or not all(payload.get(name) is not None for name in PHASE_FIELDS):
+        raise RequestError(f"give {', '.join(PHASE_FIELDS)}")
+    return {'annual_queries': estimate_queries_from_phases(*[_number(payload, name) for name in PHASE_FIELDS])}
+
+def seek_goal(payload):
+    """POST /v1/goal-seek: solve_for value that brings metric to target (or each of targets)
+
+    The rest of the payload is a scenario; the input being solved for may be
+    left out. Unreachable targets give null.
+    """
+    if not isinstance(payload, dict):
+        raise RequestError("scenario must be a JSON object")
+    metric = payload.get('metric', 'total_cost')
+    solve_for = payload.get('solve_for', 'annual_queries')
+    if metric not in GOAL_METRICS:
+        raise RequestError(f"unknown metric {metric!r}")
+    if solve_for not in GOAL_VARIABLES:
+        raise RequestError(f"unknown solve_for {solve_for!r}")
+    targets = payload.get('targets')
+    if targets is None:
+        targets = [_number(payload, 'target')]
+    elif not isinstance(targets, list) or not targets or \
+            not all(isinstance(t, (int, float)) and not isinstance(t, bool) for t in targets):
+        raise RequestError("targets must be a non-empty list of numbers")
+
+    scenario = dict(payload)
+    if solve_for == 'annual_queries':
+        # Placeholder so the volume check passes; goal_seek ignores it
+        scenario = dict(scenario, annual_queries=1)
+    inputs = resolve_scenario(scenario)
+    try:
+        solutions = goal_seek(targets, metric, solve_for, inputs['annual_queries'], inputs['platform_fee'],
+                              inputs['credit_cost'], inputs['queries_per_credit'], inputs['years'],
+                              inputs['growth_rate'], inputs['credit_schedule'], inputs['growth_curve'])
+    except ValueError as error:
+        raise RequestError(str(error))
+    del inputs[solve_for]
+    return {
+        'metric': metric,
+        'solve_for': solve_for,
+        'inputs': inputs,
+        'targets': targets,
+        'solutions': [None if value != value else value for value in solutions.tolist()],
+    }
+
+POST_ROUTES = {
+    '/v1/costs': price_scenario,
+    '/v1/costs/batch': price_batch,
+    '/v1/compare': compare_models,
+    '/v1/estimate': estimate_volume,
+    '/v1/goal-seek': seek_goal,
+}
+
+# Batches at or above this many scenarios are priced on a worker thread so a
+# bulk payload doesn't stall the other connections
+EXECUTOR_MIN_SCENARIOS = 1000
+
+class ResponseCache:
+    """LRU cache of encoded response bodies keyed on route and request body"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        body = self.entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body):
+        if self.max_entries <= 0:
+            return
+        self.entries[key] = body
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+class Metrics:
+    """Request counters and a rolling window of latencies per route"""
+
+    def __init__(self, window=10000):
+        self.started = time.perf_counter()
+        self.window = window
+        self.routes = {}
+        self.statuses = {}
+
+    def record(self, route, status, seconds):
+        stats = self.routes.get(route)
+        if stats is None:
+            stats = self.routes[route] = {'count': 0, 'latencies': deque(maxlen=self.window)}
+        stats['count'] += 1
+        stats['latencies'].append(seconds)
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def snapshot(self, cache):
+        uptime = time.perf_counter() - self.started
+        total = sum(stats['count'] for stats in self.routes.values())
+        routes = {}
+        for route, stats in self.routes.items():
+            latencies = sorted(stats['latencies'])
+            routes[route] = {'count': stats['count']}
+            for p in (50, 90, 99):
+                routes[route][f'p{p}_ms'] = latencies[min(len(latencies) - 1, len(latencies) * p // 100)] * 1000
+        lookups = cache.hits + cache.misses
+        return {
+            'uptime_s': uptime,
+            'requests': total,
+            'requests_per_s': total / uptime if uptime else 0.0,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'routes': routes,
+            'cache': {'entries': len(cache.entries), 'hits': cache.hits, 'misses': cache.misses,
+                      'hit_rate': cache.hits / lookups if lookups else 0.0},
+        }
+
+class PricingServer:
+    """Keep-alive HTTP/1.1 JSON server over POST_ROUTES"""
+
+    def __init__(self, cache_size=10000, max_body=10 * 1024 * 1024):
+        self.cache = ResponseCache(cache_size)
+        self.metrics = Metrics()
+        self.max_body = max_body
+
+    async def handle(self, method, path, body):
+        """Return (status, encoded JSON body) for one request"""
+        if method == 'GET':
+            if path == '/health':
+                return 200, b'{"status":"ok"}'
+            if path == '/metrics':
+                return 200, json.dumps(self.metrics.snapshot(self.cache)).encode()
+            if path == '/v1/models':
+                return 200, json.dumps({'deployment_models': DEPLOYMENT_MODELS,
+                                        'size_templates': SIZE_TEMPLATES,
+                                        'defaults': DEFAULTS, 'metrics': COST_METRICS}).encode()
+            if path in POST_ROUTES:
+                raise RequestError(f"use POST for {path}", 405)
+            raise RequestError(f"no route {path}", 404)
+        if method != 'POST':
+            raise RequestError(f"method {method} not allowed", 405)
+
+        route = POST_ROUTES.get(path)
+        if route is None:
+            raise RequestError(f"no route {path}", 404)
+        try:
+            payload = json.loads(body or b'{}', parse_constant=_reject_constant, parse_float=_finite_float)
+        except RequestError:
+            raise
+        except ValueError as error:
+            raise RequestError(f"invalid JSON: {error}")
+        if not isinstance(payload, dict):
+            raise RequestError("request body must be a JSON object")
+
+        # Canonical form, so key order and whitespace don't defeat the cache
+        key = path + json.dumps(payload, sort_keys=True, separators=(',', ':'))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return 200, cached
+
+        scenarios = payload.get('scenarios')
+        if route is price_batch and isinstance(scenarios, list) and len(scenarios) >= EXECUTOR_MIN_SCENARIOS:
+            result = await asyncio.get_running_loop().run_in_executor(None, route, payload)
+        else:
+            result = route(payload)
+        encoded = json.dumps(result).encode()
+        self.cache.put(key, encoded)
+        return 200, encoded
+
+    async def serve_connection(self, reader, writer):
+        """Answer requests on one connection until the client closes it"""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                started = time.perf_counter()
+                lines = head.decode('latin-1').split('\r\n')
+                try:
+                    method, target, version = lines[0].split(' ')
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                path = target.split('?', 1)[0]
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+
+                try:
+                    try:
+                        length = int(headers.get('content-length') or 0)
+                    except ValueError:
+                        length = -1
+                    if length < 0:
+                        keep_alive = False
+                        raise RequestError("invalid Content-Length", 400)
+                    if length > self.max_body:
+                        keep_alive = False
+                        raise RequestError(f"body over {self.max_body} bytes", 413)
+                    body = await reader.readexactly(length) if length else b''
+                    status, payload = await self.handle(method, path, body)
+                except RequestError as error:
+                    status, payload = error.status, json.dumps({'error': str(error)}).encode()
+                except asyncio.IncompleteReadError:
+                    return
+                except Exception as error:
+                    status, payload = 500, json.dumps({'error': repr(error)}).encode()
+
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + payload
+                )
+                await writer.drain()
+                self.metrics.record(path if path in POST_ROUTES or status != 404 else '(unknown)',
+                                    status, time.perf_counter() - started)
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def serve(self, host, port, ready=None):
+        """Listen until cancelled; ready (an asyncio.Event) is set once bound"""
+        server = await asyncio.start_server(self.serve_connection, host, port, backlog=1024)
+        async with server:
+            if ready is not None:
+                ready.set()
+            await server.serve_forever()
+
+def build_parser():
+    """Command-line options"""
+    parser = argparse.ArgumentParser(description="Serve the pricing engine as a local JSON API.")
+    parser.add_argument('--host', default='127.0.0.1', help="interface to bind (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8502, help="port to listen on (default: 8502)")
+    parser.add_argument('--cache-size', type=int, default=10000,
+                        help="cached responses kept, LRU (default: 10000, 0 disables)")
+    parser.add_argument('--max-body', type=int, default=10 * 1024 * 1024,
+                        help="largest request body accepted, bytes (default: 10 MiB)")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    server = PricingServer(cache_size=args.cache_size, max_body=args.max_body)
+    print(f"pricing API listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,431 @@
+"""Benchmark suite for the pricing engine, page reruns, charts and exports.
+
+Times each case at several input scales, prints a table, and optionally saves
+the results as a baseline or compares them against one:
+
+    python pricing_benchmarks.py                              # run and print
+    python pricing_benchmarks.py --save benchmark_baseline.json
+    python pricing_benchmarks.py --compare benchmark_baseline.json --threshold 0.2
+
+--compare exits with status 1 when any case's median is slower than the
+baseline by more than --threshold (a fraction), or when importing
+pricing_engine exceeds its import-time budget. Run baseline and comparison on
+the same machine; absolute timings don't travel.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(REPO_DIR, 'consumption_pricing_calculator.py')
+
+# Scenario / value counts per scale
+SCALES = {
+    'small': 1000,
+    'medium': 100000,
+    'large': 1000000,
+}
+
+GROUPS = ['import', 'engine', 'format', 'charts', 'exports', 'page']
+
+# Import-time budget for pricing_engine, seconds (see the pricing_engine docstring)
+IMPORT_BUDGET_SECONDS = 0.050
+
+BASE_INPUTS = {
+    'annual_queries': 200000,
+    'platform_fee': 150000,
+    'credit_cost': 5,
+    'queries_per_credit': 400,
+    'years': 3,
+    'growth_rate': 0.15,
+}
+
+CREDIT_SCHEDULE = {
+    'mode': 'graduated',
+    'tiers': [{'up_to': 500, 'credit_cost': 5}, {'up_to': 2500, 'credit_cost': 4.5},
+              {'up_to': None, 'credit_cost': 4}],
+}
+
+# Adoption shapes mixed across a book for the growth-curve batch case
+GROWTH_CURVE_MIX = [
+    None,
+    {'type': 'linear'},
+    {'type': 'logistic', 'saturation': 4},
+    {'type': 'custom', 'factors': [0.25, 1, 1.5, 1.75, 2]},
+]
+
+def measure(func, repeat=5, min_time=0.2):
+    """Per-call timings of func: repeat rounds, each looping until min_time"""
+    func()  # warm-up: imports, caches, allocator
+    started = time.perf_counter()
+    func()
+    once = time.perf_counter() - started
+    loops = max(1, int(min_time / once)) if once < min_time else 1
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            func()
+        timings.append((time.perf_counter() - started) / loops)
+    return timings
+
+def measure_reported(func, repeat=5):
+    """Timings func returns itself (seconds per call), after a warm-up call"""
+    func()
+    return [func() for _ in range(repeat)]
+
+def import_time():
+    """Cumulative import time of pricing_engine in a fresh interpreter, seconds"""
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import pricing_engine'],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True
+    ).stderr
+    for line in reversed(output.splitlines()):
+        if line.rstrip().endswith('| pricing_engine'):
+            return int(line.split('|')[1]) / 1e6
+    raise RuntimeError("pricing_engine not found in -X importtime output")
+
+def _batch_inputs(n):
+    """Deterministic arrays of n scenarios around BASE_INPUTS"""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    return {
+        'annual_queries': rng.uniform(1e4, 1e7, n),
+        'platform_fee': rng.uniform(5e4, 3e5, n),
+        'credit_cost': rng.uniform(1, 10, n),
+        'queries_per_credit': rng.choice([100.0, 400.0], n),
+        'years': rng.integers(1, 6, n),
+        'growth_rate': rng.choice([0.0, 0.1, 0.15, 0.25, 0.5], n),
+    }
+
+def engine_cases(n):
+    """calculate_costs scalar and batch, flat, tiered and with mixed growth curves"""
+    import numpy as np
+
+    from pricing_engine import calculate_costs, calculate_costs_batch
+
+    batch = _batch_inputs(n)
+    curves = np.empty(len(GROWTH_CURVE_MIX), dtype=object)
+    curves[:] = GROWTH_CURVE_MIX
+    growth_curves = curves[np.random.default_rng(1).integers(0, len(GROWTH_CURVE_MIX), n)]
+    scalar_calls = min(n, 10000)
+    scalar = [{key: values[i].item() for key, values in batch.items()} for i in range(scalar_calls)]
+
+    def scalar_loop():
+        for inputs in scalar:
+            calculate_costs(**inputs)
+
+    return {
+        f'calculate_costs x{scalar_calls}': scalar_loop,
+        f'calculate_costs_batch n={n}': lambda: calculate_costs_batch(**batch),
+        f'calculate_costs_batch tiered n={n}': lambda: calculate_costs_batch(**batch, credit_schedule=CREDIT_SCHEDULE),
+        f'calculate_costs_batch growth curves n={n}': lambda: calculate_costs_batch(**batch, growth_curve=growth_curves),
+    }
+
+def format_cases(n):
+    """format_number over a large column of values"""
+    import numpy as np
+
+    from pricing_engine import format_number
+
+    values = np.random.default_rng(0).uniform(0, 1e7, n).tolist()
+    return {
+        f'format_number n={n}': lambda: [format_number(v, prefix='$') for v in values],
+        f'format_number decimals=4 n={n}': lambda: [format_number(v, decimals=4, prefix='$') for v in values],
+    }
+
+def _page_costs(years):
+    """calculate_costs rows as the page builds them"""
+    from pricing_engine import calculate_costs
+
+    return calculate_costs(**dict(BASE_INPUTS, years=years))
+
+def chart_cases(n):
+    """Plotly figure construction; n sets the point count of the array-backed charts"""
+    from pricing_analysis import tco_by_volume
+    from pricing_charts import (
+        build_break_even_chart,
+        build_comparison_chart,
+        build_cost_per_query_chart,
+        build_cost_pie,
+        build_monthly_chart,
+        build_multiyear_chart,
+    )
+    from pricing_engine import calculate_costs, deployment_pricing, monthly_timeline
+
+    costs = _page_costs(5)
+    models = deployment_pricing(150000, 5)
+    comparison = [calculate_costs(200000, model['platform_fee'], model['credit_cost'], model['queries_per_credit'],
+                                  years=1)[0]
+                  for model in models.values()]
+    points = min(n, 100000)
+    volumes = [1e4 + i * 1e7 / points for i in range(points)]
+    curves = tco_by_volume(models, volumes, 3, 0.15)
+    timeline = monthly_timeline(20000, 150000, 5, 400, years=5, growth_rate=0.15, build_months=3,
+                                build_queries_per_month=40000)
+
+    return {
+        'build_cost_pie': lambda: build_cost_pie(costs[0], 'Customer VPC'),
+        'build_multiyear_chart': lambda: build_multiyear_chart(costs, 0.15),
+        'build_cost_per_query_chart': lambda: build_cost_per_query_chart(costs),
+        'build_comparison_chart': lambda: build_comparison_chart(list(models), comparison),
+        'build_monthly_chart 60 months': lambda: build_monthly_chart(
+            timeline['month'].tolist(), timeline['platform_fee'][0].tolist(),
+            timeline['consumption_cost'][0].tolist(), timeline['queries'][0].tolist(), 3),
+        f'build_break_even_chart points={points}': lambda: build_break_even_chart(
+            volumes, curves, [], 200000, 3),
+    }
+
+def export_cases(n):
+    """Summary table, CSV / Parquet and executive summary; n sets the CSV / Parquet row count"""
+    from pricing_engine import CostTable, calculate_costs, deployment_pricing
+    from pricing_exports import build_cost_csv, build_cost_parquet, build_executive_summary, build_summary_table
+
+    costs = _page_costs(5)
+    rows = min(n, 100000)
+    many_costs = CostTable(**{name: (column * (rows // len(costs) + 1))[:rows]
+                              for name, column in costs.columns().items()})
+    comparison = {name: calculate_costs(200000, model['platform_fee'], model['credit_cost'],
+                                        model['queries_per_credit'], years=1)[0]
+                  for name, model in deployment_pricing(150000, 5).items()}
+    totals = sorted(model_costs['total_cost'] for model_costs in comparison.values())
+    difference = totals[-1] - totals[0]
+
+    return {
+        'build_summary_table 5 years': lambda: build_summary_table(costs),
+        'build_cost_csv 5 years': lambda: build_cost_csv(costs, 400, 5, 'Customer VPC'),
+        f'build_cost_csv rows={rows}': lambda: build_cost_csv(many_costs, 400, 5, 'Customer VPC'),
+        f'build_cost_parquet rows={rows}': lambda: build_cost_parquet(many_costs, 400, 5, 'Customer VPC'),
+        'build_executive_summary': lambda: build_executive_summary(
+            '2026-01-01 00:00', 150000, 5, 'Customer VPC', 400, costs, 0.15, comparison,
+            difference, difference / totals[-1] * 100, 'Customer VPC'),
+    }
+
+def page_cases(n):
+    """Headless runs of the Streamlit page through its testing harness.
+
+    AppTest only notices a finished run on its next 100 ms poll, so each case
+    returns the seconds its measured script runs took, from the script
+    runner's own start and stop events, rather than being timed from outside.
+    """
+    import logging
+    from unittest import mock
+
+    import streamlit as st
+    from streamlit.runtime.scriptrunner import ScriptRunnerEvent
+    from streamlit.testing.v1 import AppTest, app_test
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner
+
+    # AppTest logs a "No runtime found" line for every cached function
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+    stopped = (ScriptRunnerEvent.SCRIPT_STOPPED_WITH_SUCCESS, ScriptRunnerEvent.SCRIPT_STOPPED_WITH_COMPILE_ERROR,
+               ScriptRunnerEvent.SCRIPT_STOPPED_FOR_RERUN)
+    run_seconds = []
+
+    class TimedScriptRunner(LocalScriptRunner):
+        """AppTest's script runner, recording how long each script run takes"""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.on_event.connect(self.time_run, weak=False)
+
+        def time_run(self, sender, event, **kwargs):
+            if event == ScriptRunnerEvent.SCRIPT_STARTED:
+                self.started = time.perf_counter()
+            elif event in stopped:
+                run_seconds.append(time.perf_counter() - self.started)
+
+    def timed_run(at):
+        """Rerun at; seconds the script took"""
+        run_seconds.clear()
+        with mock.patch.object(app_test, 'LocalScriptRunner', TimedScriptRunner):
+            at.run()
+        return sum(run_seconds)
+
+    def cold_run():
+        st.cache_data.clear()
+        st.cache_resource.clear()
+        return timed_run(AppTest.from_file(APP_PATH, default_timeout=120))
+
+    def warm_run():
+        return timed_run(AppTest.from_file(APP_PATH, default_timeout=120))
+
+    def all_sections_run():
+        # Every report view, each with all of its optional sections switched on
+        at = AppTest.from_file(APP_PATH, default_timeout=120).run()
+        seconds = 0.0
+        for view in at.radio(key='report_view').options:
+            at.radio(key='report_view').set_value(view).run()
+            for checkbox in at.checkbox:
+                if checkbox.label != "Customize queries/credit ratio" and not checkbox.value:
+                    checkbox.check()
+            seconds += timed_run(at)
+        return seconds
+
+    return {
+        'page run, cold caches': cold_run,
+        'page run, warm caches': warm_run,
+        'page run, every view with all optional sections': all_sections_run,
+    }
+
+CASE_BUILDERS = {
+    'engine': engine_cases,
+    'format': format_cases,
+    'charts': chart_cases,
+    'exports': export_cases,
+    'page': page_cases,
+}
+
+def run_benchmarks(groups, scales, repeat=5, progress=None):
+    """Run every case of groups at scales; returns {case key: result dict}"""
+    results = {}
+    if 'import' in groups:
+        timings = [import_time() for _ in range(repeat)]
+        results['import/pricing_engine'] = {
+            'group': 'import', 'scale': None, 'n': None, 'repeat': repeat,
+            'min_s': min(timings), 'median_s': statistics.median(timings),
+            'budget_s': IMPORT_BUDGET_SECONDS,
+        }
+
+    for group in groups:
+        if group == 'import':
+            continue
+        for scale in scales:
+            n = SCALES[scale]
+            for name, func in CASE_BUILDERS[group](n).items():
+                # Case names carry their size, so cases that don't scale run once
+                key = f"{group}/{name}"
+                if key in results:
+                    continue
+                if progress:
+                    progress(key)
+                timings = measure_reported(func, repeat) if group == 'page' else measure(func, repeat=repeat)
+                results[key] = {
+                    'group': group, 'scale': scale, 'n': n, 'repeat': repeat,
+                    'min_s': min(timings), 'median_s': statistics.median(timings),
+                }
+    return results
+
+def environment():
+    """Versions and machine details saved alongside results"""
+    versions = {'python': platform.python_version()}
+    for module in ('numpy', 'pandas', 'plotly', 'streamlit', 'pyarrow'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'versions': versions,
+    }
+
+def compare_results(current, baseline, threshold):
+    """Rows of (key, baseline median, current median, change, status)"""
+    rows = []
+    for key, result in current.items():
+        status = 'ok'
+        previous = baseline.get(key)
+        change = None
+        if previous is None:
+            status = 'new'
+        else:
+            change = result['median_s'] / previous['median_s'] - 1
+            if change > threshold:
+                status = 'REGRESSION'
+            elif change < -threshold:
+                status = 'faster'
+        if result.get('budget_s') is not None and result['median_s'] > result['budget_s']:
+            status = 'OVER BUDGET'
+        rows.append((key, previous['median_s'] if previous else None, result['median_s'], change, status))
+    return rows
+
+def _format_seconds(seconds):
+    if seconds is None:
+        return '-'
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+def print_results(results, comparison=None):
+    """Plain-text results table, with the baseline columns when comparing"""
+    width = max(len(key) for key in results)
+    if comparison is None:
+        print(f"{'case':<{width}}  {'median':>10}  {'min':>10}")
+        for key, result in results.items():
+            print(f"{key:<{width}}  {_format_seconds(result['median_s']):>10}  {_format_seconds(result['min_s']):>10}")
+        return
+    print(f"{'case':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}  status")
+    for key, previous, median, change, status in comparison:
+        change_text = '-' if change is None else f"{change * 100:+.1f}%"
+        print(f"{key:<{width}}  {_format_seconds(previous):>10}  {_format_seconds(median):>10}  "
+              f"{change_text:>8}  {status}")
+
+def build_parser():
+    """Command-line options"""
+    parser = argparse.ArgumentParser(description="Benchmark the pricing engine, page reruns, charts and exports.")
+    parser.add_argument('--groups', default=','.join(GROUPS),
+                        help=f"comma-separated groups to run (default: all of {','.join(GROUPS)})")
+    parser.add_argument('--scales', default='small,medium',
+                        help=f"comma-separated scales from {','.join(SCALES)} (default: small,medium)")
+    parser.add_argument('--repeat', type=int, default=5, help="timing rounds per case (default: 5)")
+    parser.add_argument('--save', metavar='FILE', help="write results to a JSON baseline file")
+    parser.add_argument('--compare', metavar='FILE', help="compare against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="slowdown fraction flagged as a regression (default: 0.2 = 20%%)")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    groups = [g for g in args.groups.split(',') if g]
+    scales = [s for s in args.scales.split(',') if s]
+    for group in groups:
+        if group not in GROUPS:
+            parser.error(f"unknown group {group!r}")
+    for scale in scales:
+        if scale not in SCALES:
+            parser.error(f"unknown scale {scale!r}")
+
+    results = run_benchmarks(groups, scales, args.repeat,
+                             progress=lambda key: print(f"running {key}", file=sys.stderr))
+
+    if args.save:
+        with open(args.save, 'w') as baseline_file:
+            json.dump({'environment': environment(), 'threshold': args.threshold, 'results': results},
+                      baseline_file, indent=2)
+        print(f"saved {len(results)} results to {args.save}", file=sys.stderr)
+
+    if not args.compare:
+        print_results(results)
+        over_budget = [key for key, r in results.items() if r.get('budget_s') and r['median_s'] > r['budget_s']]
+        return 1 if over_budget else 0
+
+    with open(args.compare) as baseline_file:
+        baseline = json.load(baseline_file)['results']
+    comparison = compare_results(results, baseline, args.threshold)
+    print_results(results, comparison)
+    failed = [row for row in comparison if row[4] in ('REGRESSION', 'OVER BUDGET')]
+    if failed:
+        print(f"\n{len(failed)} case(s) regressed beyond {args.threshold * 100:.0f}% or over budget", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
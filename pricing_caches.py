@@ -0,0 +1,93 @@
+"""Streamlit caches shared by every session of the pricing calculator page.
+
+Memoized per input set and shared by every session on this server, so
+identical scenarios are computed once, and bounded with LRU eviction. Figures
+use cache_resource (returned as-is; unpickling a Plotly figure costs more than
+building it), everything else cache_data (returned as a copy).
+
+The wrappers live here rather than in the page script so they are built once
+per server process: wrapping a function hashes its source code, about 1 ms a
+function, which the page would otherwise pay on every rerun.
+"""
+
+import streamlit as st
+
+from pricing_analysis import (
+    break_even_table,
+    compare_deployments,
+    goal_seek,
+    optimize_commitment,
+    sensitivity_grid,
+    simulate_costs,
+    simulate_volume_paths,
+    tco_by_volume,
+    tornado_analysis,
+)
+from pricing_charts import (
+    build_break_even_chart,
+    build_burn_down_chart,
+    build_commitment_chart,
+    build_comparison_chart,
+    build_cost_per_query_chart,
+    build_cost_pie,
+    build_fan_chart,
+    build_monthly_chart,
+    build_multiyear_chart,
+    build_sensitivity_heatmap,
+    build_tornado_chart,
+)
+from pricing_engine import (
+    calculate_costs,
+    calculate_costs_cents,
+    monthly_timeline,
+)
+from pricing_exports import (
+    build_cost_csv,
+    build_cost_parquet,
+    build_executive_summary,
+    build_summary_table,
+)
+from pricing_store import ScenarioStore
+from pricing_usage import (
+    aggregate_usage_bytes,
+    aggregate_usage_file,
+    burn_down,
+)
+
+CACHE_MAX_ENTRIES = 512
+CACHE_TTL_SECONDS = 3600
+
+cached_costs = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(calculate_costs)
+cached_costs_cents = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(calculate_costs_cents)
+cached_monthly_timeline = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(monthly_timeline)
+cached_simulation = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(simulate_costs)
+cached_volume_paths = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(simulate_volume_paths)
+cached_commitment = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(optimize_commitment)
+cached_usage_file = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Reading query log...")(aggregate_usage_file)
+cached_usage_bytes = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner="Reading query log...")(aggregate_usage_bytes)
+cached_burn_down = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(burn_down)
+cached_sensitivity_grid = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(sensitivity_grid)
+cached_tornado_analysis = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(tornado_analysis)
+cached_break_even_table = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(break_even_table)
+cached_comparison = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(compare_deployments)
+cached_goal_seek = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(goal_seek)
+cached_tco_by_volume = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(tco_by_volume)
+cached_summary_table = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_summary_table)
+cached_cost_csv = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_cost_csv)
+cached_cost_parquet = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_cost_parquet)
+cached_executive_summary = st.cache_data(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_executive_summary)
+
+cached_cost_pie = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_cost_pie)
+cached_multiyear_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_multiyear_chart)
+cached_cost_per_query_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_cost_per_query_chart)
+cached_fan_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_fan_chart)
+cached_comparison_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_comparison_chart)
+cached_sensitivity_heatmap = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_sensitivity_heatmap)
+cached_tornado_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_tornado_chart)
+cached_break_even_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_break_even_chart)
+cached_commitment_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_commitment_chart)
+cached_burn_down_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_burn_down_chart)
+cached_monthly_chart = st.cache_resource(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL_SECONDS, show_spinner=False)(build_monthly_chart)
+
+# One store per server, shared by every session (keyed on the database path)
+cached_store = st.cache_resource(show_spinner=False)(ScenarioStore)
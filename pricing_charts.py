@@ -0,0 +1,487 @@
+"""Plotly figure builders for the pricing calculator.
+
+Builders take computed results and return a new figure without making any
+Streamlit calls, so the page can cache figures per input set.
+"""
+
+import plotly.graph_objects as go
+
+from pricing_engine import describe_growth, format_number
+
+# Significant digits kept in figure data: enough for every hover format used
+# here (whole dollars up to $1B, four decimals on per-query costs) while
+# dropping float noise such as 230000.00000000003 from the payload
+FIGURE_DIGITS = 10
+
+# Trace properties that carry the plotted numbers
+FIGURE_DATA_PROPERTIES = ['x', 'y', 'z', 'values', 'base']
+
+def round_significant(values, digits=FIGURE_DIGITS):
+    """Float array rounded to digits significant digits (zeros, NaN and inf kept)"""
+    import numpy as np
+
+    values = np.asarray(values, dtype=float)
+    magnitude = np.abs(values)
+    rounding = np.isfinite(values) & (magnitude > 0)
+    exponent = np.zeros(values.shape, dtype=int)
+    exponent[rounding] = np.floor(np.log10(magnitude[rounding])).astype(int)
+    # Scale by an exact power of ten: multiply for decimals, divide for tens
+    decimals = np.clip(digits - 1 - exponent, -22, 22)
+    scale = np.power(10.0, np.abs(decimals))
+    with np.errstate(invalid='ignore', over='ignore'):
+        rounded = np.where(decimals >= 0, np.round(values * scale) / scale, np.round(values / scale) * scale)
+    return np.where(rounding, rounded, values)
+
+def compact_figure(fig, digits=FIGURE_DIGITS):
+    """Round the float data of every trace in place, shrinking the figure JSON; returns fig"""
+    import numpy as np
+
+    for trace in fig.data:
+        for prop in FIGURE_DATA_PROPERTIES:
+            if prop not in trace or trace[prop] is None:
+                continue
+            values = np.asarray(trace[prop])
+            if values.dtype.kind != 'f':
+                continue
+            values = round_significant(values, digits)
+            # Whole numbers serialize without the trailing '.0' as integers
+            if np.isfinite(values).all() and (np.abs(values) < 2 ** 53).all() and (values % 1 == 0).all():
+                values = values.astype(np.int64)
+            trace[prop] = values
+    return fig
+
+def build_cost_pie(year1, deployment_model):
+    """Platform fee vs consumption split for one year"""
+    fig_pie = go.Figure(data=[go.Pie(
+        labels=['Platform Fee', 'Consumption (Credits)'],
+        values=[year1['platform_fee'], year1['consumption_cost']],
+        marker=dict(colors=['#667eea', '#764ba2']),
+        textinfo='label+percent+value',
+        texttemplate='%{label}<br>$%{value:,.0f}<br>(%{percent})',
+        hovertemplate='%{label}<br>$%{value:,.0f}<br>%{percent}<extra></extra>'
+    )])
+
+    fig_pie.update_layout(
+        title=f"Cost Composition - {deployment_model}",
+        height=400
+    )
+
+    return compact_figure(fig_pie)
+
+def build_multiyear_chart(costs, growth_rate, growth_curve=None):
+    """Stacked platform/consumption bars with the query volume trend, from a CostTable"""
+    years_list = [f"Year {year}" for year in costs.year]
+    platform_fees = costs.platform_fee
+    consumption_costs = costs.consumption_cost
+    queries_list = costs.queries
+
+    fig_multiyear = go.Figure()
+
+    fig_multiyear.add_trace(go.Bar(
+        name='Platform Fee',
+        x=years_list,
+        y=platform_fees,
+        marker_color='#667eea',
+        text=[format_number(v, prefix='$') for v in platform_fees],
+        textposition='inside'
+    ))
+
+    fig_multiyear.add_trace(go.Bar(
+        name='Consumption',
+        x=years_list,
+        y=consumption_costs,
+        marker_color='#764ba2',
+        text=[format_number(v, prefix='$') for v in consumption_costs],
+        textposition='inside'
+    ))
+
+    fig_multiyear.add_trace(go.Scatter(
+        name='Query Volume',
+        x=years_list,
+        y=queries_list,
+        mode='lines+markers+text',
+        line=dict(color='#28a745', width=3),
+        marker=dict(size=10),
+        text=[format_number(v) for v in queries_list],
+        textposition='top center',
+        yaxis='y2'
+    ))
+
+    fig_multiyear.update_layout(
+        title=f"{len(costs)}-Year Cost and Volume Projection (Growth: {describe_growth(growth_rate, growth_curve)})",
+        barmode='stack',
+        height=500,
+        yaxis=dict(title="Annual Cost ($)"),
+        yaxis2=dict(title="Query Volume", overlaying='y', side='right'),
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return compact_figure(fig_multiyear)
+
+def build_cost_per_query_chart(costs):
+    """Cost per query trend over the projection, from a CostTable"""
+    years_list = [f"Year {year}" for year in costs.year]
+    cost_per_query_list = costs.cost_per_query
+
+    fig_cpq = go.Figure()
+
+    fig_cpq.add_trace(go.Scatter(
+        x=years_list,
+        y=cost_per_query_list,
+        mode='lines+markers+text',
+        line=dict(color='#dc3545', width=3),
+        marker=dict(size=12),
+        text=[format_number(v, decimals=4, prefix='$') for v in cost_per_query_list],
+        textposition='top center',
+        fill='tozeroy',
+        fillcolor='rgba(220, 53, 69, 0.1)'
+    ))
+
+    fig_cpq.update_layout(
+        title="Cost per Query Trend",
+        height=400,
+        yaxis_title="Cost per Query ($)",
+        xaxis_title="Year",
+        hovermode='x unified'
+    )
+
+    return compact_figure(fig_cpq)
+
+def build_fan_chart(years_list, bands, title, yaxis_title, decimals=0):
+    """P10-P90 band with the P50 line, from a (P10, P50, P90) x year array"""
+    p10, p50, p90 = bands
+
+    fig_fan = go.Figure()
+
+    fig_fan.add_trace(go.Scatter(
+        name='P90',
+        x=years_list,
+        y=p90,
+        mode='lines',
+        line=dict(color='rgba(118, 75, 162, 0.4)', width=1)
+    ))
+
+    fig_fan.add_trace(go.Scatter(
+        name='P10',
+        x=years_list,
+        y=p10,
+        mode='lines',
+        line=dict(color='rgba(118, 75, 162, 0.4)', width=1),
+        fill='tonexty',
+        fillcolor='rgba(118, 75, 162, 0.2)'
+    ))
+
+    fig_fan.add_trace(go.Scatter(
+        name='P50',
+        x=years_list,
+        y=p50,
+        mode='lines+markers',
+        line=dict(color='#764ba2', width=3),
+        text=[format_number(v, decimals=decimals, prefix='$') for v in p50],
+        hovertemplate='%{text}<extra>P50</extra>'
+    ))
+
+    fig_fan.update_layout(
+        title=title,
+        height=350,
+        yaxis_title=yaxis_title,
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return compact_figure(fig_fan)
+
+def build_comparison_chart(deployments, comparison_costs):
+    """Stacked platform/consumption bars per deployment model"""
+    platform_fees = [c['platform_fee'] for c in comparison_costs]
+    consumption_costs = [c['consumption_cost'] for c in comparison_costs]
+
+    fig_comparison = go.Figure()
+
+    fig_comparison.add_trace(go.Bar(
+        name='Platform Fee',
+        x=deployments,
+        y=platform_fees,
+        marker_color='#667eea',
+        text=[format_number(v, prefix='$') for v in platform_fees],
+        textposition='inside'
+    ))
+
+    fig_comparison.add_trace(go.Bar(
+        name='Consumption',
+        x=deployments,
+        y=consumption_costs,
+        marker_color='#764ba2',
+        text=[format_number(v, prefix='$') for v in consumption_costs],
+        textposition='inside'
+    ))
+
+    fig_comparison.update_layout(
+        title="Deployment Cost Comparison",
+        barmode='stack',
+        height=400,
+        yaxis_title="Annual Cost ($)",
+        showlegend=True
+    )
+
+    return compact_figure(fig_comparison)
+
+def build_sensitivity_heatmap(x_values, y_values, z_values, x_label, y_label, title, current_x, current_y, decimals=0):
+    """Heatmap of a swept metric with the current inputs marked"""
+    import numpy as np
+
+    fig_heatmap = go.Figure()
+
+    fig_heatmap.add_trace(go.Heatmap(
+        x=x_values,
+        y=y_values,
+        # Cells carry no more precision than the hover shows; the grid is most of the payload
+        z=np.round(np.asarray(z_values, dtype=float), decimals),
+        colorscale='Purples',
+        colorbar=dict(title='$'),
+        hovertemplate=f'{x_label}: %{{x:,.4g}}<br>{y_label}: %{{y:,.4g}}<br>$%{{z:,.{decimals}f}}<extra></extra>'
+    ))
+
+    fig_heatmap.add_trace(go.Scatter(
+        name='Current',
+        x=[current_x],
+        y=[current_y],
+        mode='markers',
+        marker=dict(symbol='x', size=14, color='#ffc107', line=dict(width=2, color='#000000')),
+        hovertemplate='Current inputs<extra></extra>'
+    ))
+
+    fig_heatmap.update_layout(
+        title=title,
+        height=500,
+        xaxis_title=x_label,
+        yaxis_title=y_label,
+        showlegend=False
+    )
+
+    return compact_figure(fig_heatmap)
+
+def build_tornado_chart(bars, swing):
+    """One-at-a-time TCO swings around the base case, largest on top"""
+    base_tco = bars[0]['base_tco']
+    labels = [bar['label'] for bar in reversed(bars)]
+    low_deltas = [bar['low_tco'] - base_tco for bar in reversed(bars)]
+    high_deltas = [bar['high_tco'] - base_tco for bar in reversed(bars)]
+
+    fig_tornado = go.Figure()
+
+    fig_tornado.add_trace(go.Bar(
+        name=f'-{swing*100:.0f}%',
+        y=labels,
+        x=low_deltas,
+        orientation='h',
+        marker_color='#667eea',
+        text=[format_number(v, prefix='$') for v in low_deltas],
+        textposition='auto'
+    ))
+
+    fig_tornado.add_trace(go.Bar(
+        name=f'+{swing*100:.0f}%',
+        y=labels,
+        x=high_deltas,
+        orientation='h',
+        marker_color='#764ba2',
+        text=[format_number(v, prefix='$') for v in high_deltas],
+        textposition='auto'
+    ))
+
+    fig_tornado.update_layout(
+        title=f"TCO Sensitivity (±{swing*100:.0f}% per input, base {format_number(base_tco, prefix='$')})",
+        barmode='overlay',
+        height=400,
+        xaxis_title="Change in TCO ($)",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return compact_figure(fig_tornado)
+
+def build_break_even_chart(volumes, curves, crossovers, current_volume, years):
+    """TCO-vs-volume line per deployment model with crossovers marked"""
+    colors = ['#667eea', '#764ba2', '#28a745', '#dc3545', '#fd7e14', '#17a2b8']
+
+    fig_break_even = go.Figure()
+
+    for i, (name, tco) in enumerate(curves.items()):
+        fig_break_even.add_trace(go.Scatter(
+            name=name,
+            x=volumes,
+            y=tco,
+            mode='lines',
+            line=dict(color=colors[i % len(colors)], width=3),
+            hovertemplate=f'{name}<br>%{{x:,.0f}} queries<br>$%{{y:,.0f}}<extra></extra>'
+        ))
+
+    if crossovers:
+        fig_break_even.add_trace(go.Scatter(
+            name='Break-even',
+            x=[c['volume'] for c in crossovers],
+            y=[c['tco'] for c in crossovers],
+            mode='markers+text',
+            marker=dict(symbol='diamond', size=14, color='#ffc107', line=dict(width=2, color='#000000')),
+            text=[format_number(c['volume']) for c in crossovers],
+            textposition='top center',
+            customdata=[f"{c['model_a']} = {c['model_b']}" for c in crossovers],
+            hovertemplate='%{customdata}<br>%{x:,.0f} queries<br>$%{y:,.0f}<extra></extra>'
+        ))
+
+    fig_break_even.add_vline(x=current_volume, line_dash='dash', line_color='#6c757d',
+                             annotation_text='Current volume')
+
+    fig_break_even.update_layout(
+        title=f"{years}-Year TCO by Year 1 Query Volume",
+        height=450,
+        xaxis_title="Year 1 Query Volume",
+        yaxis_title=f"{years}-Year TCO ($)",
+        hovermode='closest',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return compact_figure(fig_break_even)
+
+def build_commitment_chart(curves, best, payg_cost, years):
+    """Expected TCO versus yearly credit commitment per contract, with pay-as-you-go and the optimum"""
+    colors = ['#667eea', '#764ba2', '#28a745', '#dc3545', '#fd7e14', '#17a2b8']
+
+    fig_commitment = go.Figure()
+
+    for i, (name, curve) in enumerate(curves.items()):
+        fig_commitment.add_trace(go.Scatter(
+            name=name,
+            x=curve['commitment'],
+            y=curve['expected_cost'],
+            mode='lines',
+            line=dict(color=colors[i % len(colors)], width=3),
+            hovertemplate=f'{name}<br>%{{x:,.0f}} credits/yr<br>$%{{y:,.0f}}<extra></extra>'
+        ))
+
+    fig_commitment.add_hline(y=payg_cost, line_dash='dash', line_color='#6c757d',
+                             annotation_text='Pay-as-you-go')
+
+    if best:
+        fig_commitment.add_trace(go.Scatter(
+            name='Cheapest',
+            x=[best['commitment']],
+            y=[best['expected_cost']],
+            mode='markers+text',
+            marker=dict(symbol='diamond', size=14, color='#ffc107', line=dict(width=2, color='#000000')),
+            text=[f"{format_number(best['commitment'])} credits"],
+            textposition='top center',
+            hovertemplate=f"{best['terms']}<br>%{{x:,.0f}} credits/yr<br>$%{{y:,.0f}}<extra></extra>"
+        ))
+
+    fig_commitment.update_layout(
+        title=f"Expected {years}-Year TCO by Yearly Credit Commitment",
+        height=450,
+        xaxis_title="Committed Credits per Year",
+        yaxis_title=f"Expected {years}-Year TCO ($)",
+        hovermode='closest',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return compact_figure(fig_commitment)
+
+def build_monthly_chart(months, platform_fees, consumption_costs, queries, build_months=0):
+    """Monthly platform/consumption bars with query volume, build phase shaded"""
+    fig_monthly = go.Figure()
+
+    fig_monthly.add_trace(go.Bar(
+        name='Platform Fee',
+        x=months,
+        y=platform_fees,
+        marker_color='#667eea'
+    ))
+
+    fig_monthly.add_trace(go.Bar(
+        name='Consumption',
+        x=months,
+        y=consumption_costs,
+        marker_color='#764ba2'
+    ))
+
+    fig_monthly.add_trace(go.Scatter(
+        name='Query Volume',
+        x=months,
+        y=queries,
+        mode='lines',
+        line=dict(color='#28a745', width=3),
+        yaxis='y2'
+    ))
+
+    if build_months:
+        fig_monthly.add_vrect(x0=0.5, x1=build_months + 0.5, fillcolor='#e7f3ff', opacity=0.6,
+                              line_width=0, layer='below', annotation_text='Build', annotation_position='top left')
+
+    for year_start in range(13, len(months) + 1, 12):
+        fig_monthly.add_vline(x=year_start - 0.5, line_dash='dot', line_color='#adb5bd')
+
+    fig_monthly.update_layout(
+        title="Monthly Cost and Volume",
+        barmode='stack',
+        height=450,
+        xaxis_title="Month",
+        yaxis=dict(title="Monthly Cost ($)"),
+        yaxis2=dict(title="Query Volume", overlaying='y', side='right'),
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return compact_figure(fig_monthly)
+
+def build_burn_down_chart(months, projected_balance, actual_balance, burn_rate, exhaustion_month=None):
+    """Projected vs actual credit balance by month, with the burn-rate extrapolation"""
+    import numpy as np
+
+    fig_burn_down = go.Figure()
+
+    fig_burn_down.add_trace(go.Scatter(
+        name='Projected Balance',
+        x=months,
+        y=projected_balance,
+        mode='lines',
+        line=dict(color='#667eea', width=3, dash='dash'),
+        hovertemplate='%{x}<br>%{y:,.0f} credits<extra></extra>'
+    ))
+
+    fig_burn_down.add_trace(go.Scatter(
+        name='Actual Balance',
+        x=months,
+        y=actual_balance,
+        mode='lines+markers',
+        line=dict(color='#764ba2', width=3),
+        hovertemplate='%{x}<br>%{y:,.0f} credits<extra></extra>'
+    ))
+
+    # Continue from the last actual month at the recent burn rate
+    observed = np.flatnonzero(~np.isnan(actual_balance))
+    if observed.size and burn_rate > 0:
+        last = int(observed[-1])
+        steps = np.arange(len(months) - last)
+        fig_burn_down.add_trace(go.Scatter(
+            name='At Current Burn Rate',
+            x=months[last:],
+            y=np.maximum(actual_balance[last] - burn_rate * steps, 0),
+            mode='lines',
+            line=dict(color='#dc3545', width=2, dash='dot'),
+            hovertemplate='%{x}<br>%{y:,.0f} credits<extra></extra>'
+        ))
+
+    if exhaustion_month in months:
+        fig_burn_down.add_vline(x=months.index(exhaustion_month), line_dash='dash', line_color='#dc3545',
+                                annotation_text='Credits exhausted')
+
+    fig_burn_down.update_layout(
+        title="Credit Burn-down: Projected vs Actual",
+        height=450,
+        xaxis=dict(title="Month", type='category'),
+        yaxis_title="Remaining Credits",
+        hovermode='x unified',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+
+    return compact_figure(fig_burn_down)
@@ -0,0 +1,281 @@
+"""Headless bulk pricing for CSV / JSONL / Parquet / Arrow customer extracts.
+
+Streams the input in chunks, prices each chunk with calculate_costs_batch and
+appends the results to the output (one Parquet row group or Arrow record
+batch per chunk), so memory stays bounded by --chunk-size regardless of file
+size.
+
+    python pricing_cli.py crm_extract.csv -o quotes.csv
+    python pricing_cli.py crm_extract.csv -o quotes.parquet
+    python pricing_cli.py crm_extract.jsonl -o - --platform-fee 120000 > quotes.jsonl
+
+Each input record needs a volume, given by one of (first match wins):
+  annual_queries
+  size_template (Small / Medium / Large)
+  build_months, build_queries_per_month, run_months, run_queries_per_month
+and optionally deployment_model, queries_per_credit, platform_fee,
+credit_cost, growth_rate (fraction, 0.15 = 15%), growth_curve and years.
+Missing values fall back to the command-line defaults; missing prices first to
+the deployment model's own prices, where deployment_models.json sets them.
+--credit-schedule prices credits with a tiered price book instead (JSON, see
+pricing_engine.tiered_consumption_cost):
+
+    {"mode": "graduated", "tiers": [{"up_to": 500, "credit_cost": 5},
+                                    {"up_to": null, "credit_cost": 4}]}
+
+growth_curve names a volume curve: 'compound', 'linear', or one defined in the
+--growth-curves JSON file (see pricing_engine.GROWTH_CURVES):
+
+    {"slow_start": {"type": "logistic", "saturation": 4},
+     "pilot_then_rollout": {"type": "custom", "factors": [0.25, 1, 1.5]}}
+"""
+
+import argparse
+import json
+import sys
+
+from pricing_engine import (
+    COST_METRICS,
+    CREDIT_ROUNDING,
+    DEPLOYMENT_MODELS,
+    GROWTH_CURVES,
+    SIZE_TEMPLATES,
+    calculate_costs_batch,
+    calculate_costs_cents_batch,
+    deployment_pricing,
+    estimate_queries_from_phases,
+)
+from pricing_exports import EXPORT_FORMATS, ChunkedTableWriter
+
+PHASE_COLUMNS = ['build_months', 'build_queries_per_month', 'run_months', 'run_queries_per_month']
+
+class RecordError(ValueError):
+    """An input record cannot be priced"""
+
+def detect_format(path, explicit=None):
+    """Return the format name (EXPORT_FORMATS key) from an explicit choice or the file extension"""
+    if explicit:
+        return explicit
+    for fmt, spec in EXPORT_FORMATS.items():
+        if path.endswith(tuple(spec['extensions'])):
+            return fmt
+    return 'csv'
+
+def read_chunks(path, fmt, chunk_size):
+    """Yield DataFrame chunks of the input without loading the whole file"""
+    import pandas as pd
+
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+        return
+    if fmt == 'arrow':
+        import pyarrow as pa
+
+        # Memory-mapped: record batches are read in place, not copied into memory
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        for i in range(reader.num_record_batches):
+            frame = reader.get_batch(i).to_pandas()
+            for start in range(0, len(frame), chunk_size):
+                yield frame.iloc[start:start + chunk_size]
+        return
+
+    source = sys.stdin if path == '-' else path
+    if fmt == 'jsonl':
+        reader = pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        reader = pd.read_csv(source, chunksize=chunk_size)
+    with reader:
+        yield from reader
+
+def _column(chunk, name, default):
+    """Float column from the chunk, with missing values set to default"""
+    import numpy as np
+
+    if name not in chunk:
+        return np.full(len(chunk), default, dtype=np.float64)
+    values = chunk[name].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.where(np.isnan(values), default, values)
+
+def growth_curve_library(growth_curves=None):
+    """Growth curves by name: the curve types that need no settings, plus growth_curves"""
+    library = {'compound': None, 'linear': {'type': 'linear'}}
+    library.update(growth_curves or {})
+    return library
+
+def _growth_curves(chunk, defaults, first_line):
+    """Each record's growth curve, as one curve for the chunk or an array of one per record"""
+    import numpy as np
+    import pandas as pd
+
+    library = growth_curve_library(defaults.growth_curves)
+    if defaults.growth_curve not in library:
+        raise ValueError(f"unknown growth curve {defaults.growth_curve!r}")
+    if 'growth_curve' not in chunk:
+        return library[defaults.growth_curve]
+
+    # Records naming the same curve share one curve object (and factor table row)
+    codes, names = pd.factorize(chunk['growth_curve'].fillna(defaults.growth_curve).to_numpy(dtype=object))
+    known = np.array([name in library for name in names], dtype=bool)
+    bad = np.flatnonzero(~known[codes])
+    if bad.size:
+        raise RecordError(f"record {first_line + bad[0]}: unknown growth curve {names[codes[bad[0]]]!r}")
+    curves = np.empty(len(names), dtype=object)
+    curves[:] = [library[name] for name in names]
+    return curves[codes]
+
+def resolve_inputs(chunk, defaults, first_line):
+    """Turn a chunk of raw records into calculate_costs_batch inputs"""
+    import numpy as np
+    import pandas as pd
+
+    n = len(chunk)
+    annual_queries = _column(chunk, 'annual_queries', np.nan)
+
+    if 'size_template' in chunk:
+        template_queries = chunk['size_template'].map(
+            lambda name: SIZE_TEMPLATES[name]['annual_queries'] if name in SIZE_TEMPLATES else np.nan
+        ).to_numpy(dtype=np.float64)
+        annual_queries = np.where(np.isnan(annual_queries), template_queries, annual_queries)
+
+    if all(column in chunk for column in PHASE_COLUMNS):
+        phase_queries = estimate_queries_from_phases(*[_column(chunk, c, np.nan) for c in PHASE_COLUMNS])
+        annual_queries = np.where(np.isnan(annual_queries), phase_queries, annual_queries)
+
+    if 'deployment_model' in chunk:
+        models = chunk['deployment_model'].fillna(defaults.deployment_model)
+    else:
+        models = np.full(n, defaults.deployment_model, dtype=object)
+    # Look up each distinct model once and gather its terms back to the records
+    codes, names = pd.factorize(np.asarray(models, dtype=object))
+    terms_by_model = deployment_pricing(defaults.platform_fee, defaults.credit_cost)
+    model_terms = {
+        key: np.array([terms_by_model[name][key] if name in terms_by_model else default for name in names],
+                      dtype=np.float64)[codes]
+        for key, default in (('queries_per_credit', np.nan), ('platform_fee', defaults.platform_fee),
+                             ('credit_cost', defaults.credit_cost))
+    }
+    model_ratios = model_terms['queries_per_credit']
+    queries_per_credit = _column(chunk, 'queries_per_credit', np.nan)
+    queries_per_credit = np.where(np.isnan(queries_per_credit), model_ratios, queries_per_credit)
+
+    for label, values in (('volume', annual_queries), ('deployment model', queries_per_credit)):
+        bad = np.flatnonzero(np.isnan(values) | (values <= 0))
+        if bad.size:
+            raise RecordError(f"record {first_line + bad[0]}: missing or invalid {label}")
+
+    return {
+        'annual_queries': annual_queries,
+        'platform_fee': _column(chunk, 'platform_fee', model_terms['platform_fee']),
+        'credit_cost': _column(chunk, 'credit_cost', model_terms['credit_cost']),
+        'queries_per_credit': queries_per_credit,
+        'years': _column(chunk, 'years', defaults.years),
+        'growth_rate': _column(chunk, 'growth_rate', defaults.growth_rate),
+        'growth_curve': _growth_curves(chunk, defaults, first_line),
+    }, np.asarray(models, dtype=object)
+
+def price_inputs(inputs, defaults):
+    """calculate_costs_batch (or the exact-cents variant) over resolved inputs"""
+    if defaults.credit_rounding:
+        return calculate_costs_cents_batch(**inputs, credit_schedule=defaults.credit_schedule,
+                                           credit_rounding=defaults.credit_rounding)
+    return calculate_costs_batch(**inputs, credit_schedule=defaults.credit_schedule)
+
+def price_chunk(chunk, defaults, first_line):
+    """Price one chunk and return it as a long (record x year) DataFrame"""
+    import numpy as np
+    import pandas as pd
+
+    inputs, models = resolve_inputs(chunk, defaults, first_line)
+    result = price_inputs(inputs, defaults)
+
+    n, max_years = result['total_cost'].shape
+    in_horizon = ~np.isnan(result['total_cost']).reshape(-1)
+    if defaults.id_column in chunk:
+        ids = chunk[defaults.id_column].to_numpy()
+    else:
+        ids = np.arange(first_line, first_line + n)
+
+    columns = {
+        defaults.id_column: np.repeat(ids, max_years),
+        'deployment_model': np.repeat(models, max_years),
+        'queries_per_credit': np.repeat(inputs['queries_per_credit'], max_years),
+        'credit_cost': np.repeat(inputs['credit_cost'], max_years),
+        'year': np.tile(result['year'], n),
+    }
+    for key in COST_METRICS:
+        columns[key] = result[key].reshape(-1)
+    return pd.DataFrame(columns)[in_horizon]
+
+def run(args):
+    """Price every record of args.input and stream the results to args.output"""
+    in_fmt = detect_format(args.input, args.input_format)
+    out_fmt = detect_format(args.output, args.output_format)
+    out = sys.stdout.buffer if args.output == '-' else open(args.output, 'wb')
+    records = 0
+    try:
+        with ChunkedTableWriter(out, out_fmt) as writer:
+            for chunk in read_chunks(args.input, in_fmt, args.chunk_size):
+                writer.write(price_chunk(chunk, args, records + 1))
+                records += len(chunk)
+                if args.progress:
+                    print(f"priced {records:,} records", file=sys.stderr)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        else:
+            out.flush()
+    return records
+
+def build_parser():
+    """Command-line options"""
+    parser = argparse.ArgumentParser(description="Bulk-price customer records from CSV, JSONL, Parquet or Arrow.")
+    parser.add_argument('input', help="input file ('-' for stdin)")
+    parser.add_argument('-o', '--output', default='-', help="output file ('-' for stdout, the default)")
+    parser.add_argument('--input-format', choices=list(EXPORT_FORMATS), help="default: from file extension")
+    parser.add_argument('--output-format', choices=list(EXPORT_FORMATS), help="default: from file extension")
+    parser.add_argument('--chunk-size', type=int, default=50000, help="records per chunk (default: 50000)")
+    parser.add_argument('--id-column', default='customer_id', help="record identifier passed through to the output")
+    add_default_options(parser)
+    parser.add_argument('--progress', action='store_true', help="report progress on stderr")
+    return parser
+
+def add_default_options(parser):
+    """Per-record pricing defaults, shared with pricing_portfolio"""
+    parser.add_argument('--platform-fee', type=float, default=150000, help="default annual platform fee ($)")
+    parser.add_argument('--credit-cost', type=float, default=5, help="default cost per credit ($)")
+    parser.add_argument('--deployment-model', default=next(iter(DEPLOYMENT_MODELS)), choices=list(DEPLOYMENT_MODELS),
+                        help="default deployment model (default: the first in deployment_models.json)")
+    parser.add_argument('--years', type=int, default=3, help="default projection period (years)")
+    parser.add_argument('--growth-rate', type=float, default=0.15, help="default annual growth rate (0.15 = 15%%)")
+    parser.add_argument('--growth-curve', default='compound',
+                        help="default growth curve: compound, linear or a --growth-curves name (default: compound)")
+    parser.add_argument('--growth-curves', type=argparse.FileType('r'),
+                        help=f"JSON object of named growth curves (types: {', '.join(GROWTH_CURVES)})")
+    parser.add_argument('--credit-schedule', type=argparse.FileType('r'),
+                        help="JSON tiered credit price book (overrides credit_cost)")
+    parser.add_argument('--credit-rounding', choices=CREDIT_ROUNDING,
+                        help="price in exact integer cents, billing each year's credits with this rounding")
+
+def load_option_files(args):
+    """Replace the JSON file options (--credit-schedule, --growth-curves) with their contents"""
+    if args.credit_schedule:
+        with args.credit_schedule as schedule_file:
+            args.credit_schedule = json.load(schedule_file)
+    if args.growth_curves:
+        with args.growth_curves as curves_file:
+            args.growth_curves = json.load(curves_file)
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    load_option_files(args)
+    try:
+        run(args)
+    except (RecordError, ValueError) as error:
+        parser.exit(1, f"{parser.prog}: error: {error}\n")
+
+if __name__ == '__main__':
+    main()
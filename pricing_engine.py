@@ -0,0 +1,857 @@
+"""Pricing engine for the consumption pricing calculator.
+
+Pure pricing logic with no UI dependencies, so quote workers, batch jobs and
+services can import it without Streamlit, pandas or Plotly. Keep it that way:
+heavy libraries (NumPy, pandas) are only imported inside the functions that
+need them. Import-time budget: 50 ms (`python -X importtime -c "import
+pricing_engine"`).
+"""
+
+import json
+import os
+from bisect import bisect_left
+
+# Deployment model registry: a JSON object of model name -> settings, read from
+# deployment_models.json next to this module or the file named by
+# PRICING_DEPLOYMENT_MODELS. Every model needs queries_per_credit and may set
+# its own platform_fee and credit_cost (the quote's prices apply otherwise).
+DEPLOYMENT_MODELS_PATH = os.environ.get(
+    'PRICING_DEPLOYMENT_MODELS',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'deployment_models.json')
+)
+
+# Registry settings: numeric ones with their lower bound (and whether it is
+# allowed), then the display fields with their defaults
+DEPLOYMENT_MODEL_NUMBERS = {'queries_per_credit': (0, False), 'platform_fee': (0, True), 'credit_cost': (0, False)}
+DEPLOYMENT_MODEL_FIELDS = {'icon': '', 'description': '', 'benefits': [], 'considerations': []}
+
+def load_deployment_models(path=DEPLOYMENT_MODELS_PATH):
+    """Deployment model registry from a JSON file, validated (ValueError on a bad entry)"""
+    with open(path, encoding='utf-8') as registry_file:
+        registry = json.load(registry_file)
+    if not isinstance(registry, dict) or not registry:
+        raise ValueError(f"{path}: expected a JSON object of deployment models")
+
+    models = {}
+    for name, settings in registry.items():
+        if not isinstance(settings, dict):
+            raise ValueError(f"{path}: deployment model {name!r} must be a JSON object")
+        unknown = set(settings) - set(DEPLOYMENT_MODEL_NUMBERS) - set(DEPLOYMENT_MODEL_FIELDS)
+        if unknown:
+            raise ValueError(f"{path}: deployment model {name!r} has unknown settings {sorted(unknown)}")
+        if 'queries_per_credit' not in settings:
+            raise ValueError(f"{path}: deployment model {name!r} needs queries_per_credit")
+
+        model = {}
+        for key, (minimum, inclusive) in DEPLOYMENT_MODEL_NUMBERS.items():
+            if settings.get(key) is None:
+                continue
+            value = settings[key]
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or \
+                    not (value >= minimum if inclusive else value > minimum):
+                raise ValueError(f"{path}: deployment model {name!r} has an invalid {key}: {value!r}")
+            # 400.0 reads as 400, so the registry matches the page's whole-number inputs
+            model[key] = int(value) if isinstance(value, float) and value.is_integer() else value
+        for key, default in DEPLOYMENT_MODEL_FIELDS.items():
+            value = settings.get(key, default)
+            model[key] = list(value) if isinstance(default, list) else str(value)
+        models[name] = model
+    return models
+
+# Deployment models with queries per credit
+DEPLOYMENT_MODELS = load_deployment_models()
+
+def deployment_pricing(platform_fee, credit_cost, models=None):
+    """Pricing terms of each deployment model for a quote.
+
+    Returns name -> {'platform_fee', 'credit_cost', 'queries_per_credit'}
+    (the model dicts pricing_analysis takes), using a model's own prices
+    where the registry sets them and the quote's otherwise.
+    """
+    models = DEPLOYMENT_MODELS if models is None else models
+    return {
+        name: {
+            'platform_fee': model.get('platform_fee', platform_fee),
+            'credit_cost': model.get('credit_cost', credit_cost),
+            'queries_per_credit': model['queries_per_credit'],
+        }
+        for name, model in models.items()
+    }
+
+# Customer size templates
+SIZE_TEMPLATES = {
+    'Small': {
+        'annual_queries': 125000,
+        'description': 'Small team or pilot deployment',
+        'typical_profile': '10-25 users, single use case'
+    },
+    'Medium': {
+        'annual_queries': 200000,
+        'description': 'Department-level deployment',
+        'typical_profile': '25-100 users, 2-3 use cases'
+    },
+    'Large': {
+        'annual_queries': 300000,
+        'description': 'Enterprise-wide deployment',
+        'typical_profile': '100+ users, multiple use cases'
+    },
+    'Custom': {
+        'annual_queries': 0,
+        'description': 'Define your own volume',
+        'typical_profile': 'Customize based on your needs'
+    }
+}
+
+def format_number(value, decimals=0, prefix='', suffix=''):
+    """Format numbers with commas"""
+    if decimals == 0:
+        formatted = f"{value:,.0f}"
+    else:
+        formatted = f"{value:,.{decimals}f}"
+    return f"{prefix}{formatted}{suffix}"
+
+# Credit pricing modes for a credit_schedule:
+#   graduated  - each tier's rate applies to the credits within that tier
+#   all_units  - the rate of the tier reached applies to every credit
+#   committed  - the rate of the committed band applies to max(used, committed) credits
+CREDIT_PRICING_MODES = ['graduated', 'all_units', 'committed']
+
+# Credit pricing choices shown in the UI, with their schedule mode
+CREDIT_PRICING_OPTIONS = {
+    'Flat': None,
+    'Graduated Tiers': 'graduated',
+    'All-units Tiers': 'all_units',
+    'Committed Bands': 'committed',
+}
+
+def _tier_table(credit_schedule):
+    """Upper bounds, rates and prefix costs (cost of every credit below each tier)"""
+    tiers = credit_schedule['tiers']
+    if not tiers:
+        raise ValueError("Credit schedule needs at least one tier")
+    if credit_schedule.get('mode', 'graduated') not in CREDIT_PRICING_MODES:
+        raise ValueError(f"Unknown credit pricing mode: {credit_schedule['mode']}")
+
+    bounds = [float('inf') if tier.get('up_to') is None else float(tier['up_to']) for tier in tiers]
+    if bounds[-1] != float('inf') or any(low >= high for low, high in zip(bounds, bounds[1:])):
+        raise ValueError("Tier limits must increase and the last tier must be open-ended")
+
+    rates = [float(tier['credit_cost']) for tier in tiers]
+    prefix = [0.0]
+    for lower, upper, rate in zip([0.0] + bounds, bounds[:-1], rates):
+        prefix.append(prefix[-1] + (upper - lower) * rate)
+    return bounds, rates, prefix
+
+def tiered_consumption_cost(credits, credit_schedule):
+    """Consumption cost of a number of credits under a credit_schedule.
+
+    Tiers are {'up_to': credits or None, 'credit_cost': $} with the last tier
+    open-ended; the tier lookup is a bisect over the tier limits.
+    """
+    bounds, rates, prefix = _tier_table(credit_schedule)
+    mode = credit_schedule.get('mode', 'graduated')
+
+    if mode == 'committed':
+        committed = credit_schedule.get('committed_credits', 0)
+        return max(credits, committed) * rates[bisect_left(bounds, committed)]
+
+    tier = bisect_left(bounds, credits)
+    if mode == 'all_units':
+        return credits * rates[tier]
+    lower = bounds[tier - 1] if tier else 0.0
+    return prefix[tier] + (credits - lower) * rates[tier]
+
+def tiered_consumption_cost_batch(credits, credit_schedule):
+    """Vectorized tiered_consumption_cost over an array of credits (any shape)"""
+    import numpy as np
+
+    bounds, rates, prefix = (np.asarray(v, dtype=np.float64) for v in _tier_table(credit_schedule))
+    mode = credit_schedule.get('mode', 'graduated')
+    credits = np.asarray(credits, dtype=np.float64)
+
+    if mode == 'committed':
+        committed = credit_schedule.get('committed_credits', 0)
+        return np.maximum(credits, committed) * rates[np.searchsorted(bounds, committed)]
+
+    tier = np.searchsorted(bounds, credits)
+    if mode == 'all_units':
+        return credits * rates[tier]
+    lower = np.concatenate(([0.0], bounds[:-1]))[tier]
+    return prefix[tier] + (credits - lower) * rates[tier]
+
+# Volume growth curves for a growth_curve ({'type': ..., settings}). Each gives
+# a volume factor per projection year, driven by the scenario's growth_rate:
+#   compound  - (1 + growth_rate) ** (year - 1), the default (growth_curve None)
+#   linear    - 1 + growth_rate * (year - 1): a fixed increment every year
+#   logistic  - S-curve adoption levelling off at 'saturation' x the Year 1
+#               volume; growth_rate is the Year 1 -> Year 2 growth
+#   custom    - 'factors' multiplying the Year 1 volume, one per year from
+#               Year 1 (the last one holds beyond the list); growth_rate is ignored
+# Any curve may add 'seasonality', 12 monthly weights that shape
+# monthly_timeline without changing annual volumes.
+GROWTH_CURVES = ['compound', 'linear', 'logistic', 'custom']
+
+# Growth curve choices shown in the UI, with their curve type
+GROWTH_CURVE_OPTIONS = {
+    'Compound': 'compound',
+    'Linear Ramp': 'linear',
+    'S-curve (Logistic)': 'logistic',
+    'Custom Curve': 'custom',
+}
+
+def validate_growth_curve(growth_curve):
+    """Check a growth_curve's settings (None is compound growth); ValueError on a bad one"""
+    if growth_curve is None:
+        return
+    kind = growth_curve.get('type', 'compound')
+    if kind not in GROWTH_CURVES:
+        raise ValueError(f"Unknown growth curve: {kind}")
+    if kind == 'logistic' and not growth_curve.get('saturation', 0) > 1:
+        raise ValueError("Logistic growth needs a saturation above 1 (x Year 1 volume)")
+    if kind == 'custom':
+        factors = growth_curve.get('factors')
+        if not factors or any(not factor >= 0 for factor in factors):
+            raise ValueError("Custom growth needs one or more non-negative yearly factors")
+    seasonality = growth_curve.get('seasonality')
+    if seasonality is not None and (len(seasonality) != 12 or any(not weight >= 0 for weight in seasonality)
+                                    or not sum(seasonality) > 0):
+        raise ValueError("Seasonality needs 12 non-negative monthly weights")
+
+def growth_factor(growth_rate, elapsed, growth_curve=None):
+    """Volume factor elapsed years after Year 1 (elapsed = year - 1) under a growth curve"""
+    kind = 'compound' if growth_curve is None else growth_curve.get('type', 'compound')
+    if kind == 'compound':
+        return (1 + growth_rate) ** elapsed
+    if kind == 'linear':
+        return max(1 + growth_rate * elapsed, 0.0)
+    if kind == 'logistic':
+        saturation = growth_curve['saturation']
+        if not saturation > 1 + growth_rate > 0:
+            raise ValueError("Logistic saturation must be above 1 + growth rate")
+        # Year 1 = 1 and Year 2 = 1 + growth_rate on the way to saturation
+        decay = (saturation / (1 + growth_rate) - 1) / (saturation - 1)
+        return saturation / (1 + (saturation - 1) * decay ** elapsed)
+    factors = growth_curve['factors']
+    return factors[min(int(elapsed), len(factors) - 1)]
+
+def describe_growth(growth_rate, growth_curve=None):
+    """Short description of a scenario's growth for titles and summaries"""
+    kind = 'compound' if growth_curve is None else growth_curve.get('type', 'compound')
+    if kind == 'compound':
+        return f"{growth_rate*100:.0f}%/year"
+    if kind == 'linear':
+        return f"+{growth_rate*100:.0f}% of Year 1/year"
+    if kind == 'logistic':
+        return f"S-curve, {growth_rate*100:.0f}% in Year 2 toward {growth_curve['saturation']:g}x Year 1"
+    return "custom curve (" + ", ".join(f"{factor:g}x" for factor in growth_curve['factors']) + ")"
+
+def seasonal_weights(growth_curve):
+    """The curve's 12 monthly weights scaled to average 1, or None"""
+    seasonality = None if growth_curve is None else growth_curve.get('seasonality')
+    if seasonality is None:
+        return None
+    total = sum(seasonality)
+    return [12 * weight / total for weight in seasonality]
+
+# Per-year metrics produced by calculate_costs, in result order
+COST_METRICS = ['queries', 'credits_needed', 'platform_fee', 'consumption_cost',
+                'total_cost', 'cost_per_query', 'monthly_cost', 'effective_credit_cost']
+
+class CostTable:
+    """Per-year cost results stored by column rather than as one dict per year.
+
+    Each of 'year' and COST_METRICS is an attribute holding a list (from
+    calculate_costs) or a 1-D NumPy view into a calculate_costs_batch result
+    (from batch_table). Charts and exports read columns directly
+    (costs.total_cost); indexing or iterating still yields the per-year dicts
+    ({'year': 1, 'queries': ...}), built on demand. Tables from the exact
+    engine (calculate_costs_cents) also carry .cents, the integer-cents
+    columns of MONEY_METRICS; otherwise .cents is None.
+    """
+
+    COLUMNS = ['year'] + COST_METRICS
+    __slots__ = COLUMNS + ['cents']
+
+    def __init__(self, year, queries, credits_needed, platform_fee, consumption_cost, total_cost,
+                 cost_per_query, monthly_cost, effective_credit_cost, cents=None):
+        self.year = year
+        self.queries = queries
+        self.credits_needed = credits_needed
+        self.platform_fee = platform_fee
+        self.consumption_cost = consumption_cost
+        self.total_cost = total_cost
+        self.cost_per_query = cost_per_query
+        self.monthly_cost = monthly_cost
+        self.effective_credit_cost = effective_credit_cost
+        self.cents = cents
+
+    def __len__(self):
+        return len(self.year)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            cents = None if self.cents is None else {key: column[index] for key, column in self.cents.items()}
+            return CostTable(**{name: getattr(self, name)[index] for name in self.COLUMNS}, cents=cents)
+        row = {}
+        for name in self.COLUMNS:
+            value = getattr(self, name)[index]
+            row[name] = value.item() if hasattr(value, 'item') else value
+        return row
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        if isinstance(other, (CostTable, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"CostTable({len(self)} years)"
+
+    def __reduce__(self):
+        # Plain (class, columns) form: pickles, and lets st.cache_data hash it as an argument
+        return (CostTable, tuple(getattr(self, name) for name in self.__slots__))
+
+    def columns(self):
+        """Dict of column name to column, in result order"""
+        return {name: getattr(self, name) for name in self.COLUMNS}
+
+    def total(self, metric):
+        """Sum of a column over the years; summed in cents (exact) when the table has them"""
+        if self.cents is not None and metric in self.cents:
+            return int(sum(self.cents[metric])) / 100
+        return sum(getattr(self, metric))
+
+    def rows(self):
+        """The results as a list of per-year dicts (JSON-ready)"""
+        return list(self)
+
+    def to_frame(self):
+        """DataFrame with one column per metric; NumPy columns are not copied"""
+        import pandas as pd
+
+        return pd.DataFrame(self.columns(), copy=False)
+
+def calculate_costs(annual_queries, platform_fee, credit_cost, queries_per_credit, years=3, growth_rate=0,
+                    credit_schedule=None, growth_curve=None):
+    """Calculate comprehensive cost breakdown as a CostTable
+
+    With a credit_schedule, consumption is priced with tiered_consumption_cost
+    against each year's credits and credit_cost is ignored. growth_curve
+    (see GROWTH_CURVES) shapes the volume; the default is compound growth.
+    """
+    validate_growth_curve(growth_curve)
+    columns = {name: [] for name in CostTable.COLUMNS}
+    
+    for year in range(1, years + 1):
+        # Apply growth rate (compound inline: this loop is the scalar hot path)
+        if growth_curve is None:
+            year_queries = annual_queries * ((1 + growth_rate) ** (year - 1))
+        else:
+            year_queries = annual_queries * growth_factor(growth_rate, year - 1, growth_curve)
+        
+        # Credits needed
+        credits_needed = year_queries / queries_per_credit
+        
+        # Consumption cost
+        if credit_schedule:
+            consumption_cost = tiered_consumption_cost(credits_needed, credit_schedule)
+            effective_credit_cost = consumption_cost / credits_needed if credits_needed else 0.0
+        else:
+            consumption_cost = credits_needed * credit_cost
+            effective_credit_cost = credit_cost
+        
+        # Total annual cost
+        total_cost = platform_fee + consumption_cost
+        
+        # Derived metrics
+        cost_per_query = total_cost / year_queries
+        monthly_cost = total_cost / 12
+        
+        columns['year'].append(year)
+        columns['queries'].append(year_queries)
+        columns['credits_needed'].append(credits_needed)
+        columns['platform_fee'].append(platform_fee)
+        columns['consumption_cost'].append(consumption_cost)
+        columns['total_cost'].append(total_cost)
+        columns['cost_per_query'].append(cost_per_query)
+        columns['monthly_cost'].append(monthly_cost)
+        columns['effective_credit_cost'].append(effective_credit_cost)
+    
+    return CostTable(**columns)
+
+def estimate_queries_from_phases(build_months, build_queries_per_month, run_months, run_queries_per_month):
+    """Estimate annual queries from build and run phases"""
+    build_total = build_months * build_queries_per_month
+    run_total = run_months * run_queries_per_month
+    return build_total + run_total
+
+BATCH_INPUTS = ['annual_queries', 'platform_fee', 'credit_cost', 'queries_per_credit', 'years', 'growth_rate']
+
+def _curve_codes(growth_curve, n):
+    """Distinct growth curves and each scenario's index into them.
+
+    growth_curve is one curve (or None) for every scenario, or a sequence
+    with one per scenario; curves are told apart by identity, so scenarios
+    sharing a curve object share its factor table rows.
+    """
+    import numpy as np
+
+    if growth_curve is None or isinstance(growth_curve, dict):
+        validate_growth_curve(growth_curve)
+        return [growth_curve], np.zeros(n, dtype=np.int64)
+    per_scenario = list(growth_curve)
+    if len(per_scenario) != n:
+        raise ValueError(f"growth_curve has {len(per_scenario)} curves for {n} scenarios")
+    ids = np.fromiter((id(curve) for curve in per_scenario), dtype=np.uint64, count=n)
+    _, first, codes = np.unique(ids, return_index=True, return_inverse=True)
+    curves = [per_scenario[i] for i in first.tolist()]
+    for curve in curves:
+        validate_growth_curve(curve)
+    return curves, codes.reshape(-1)
+
+def _growth_factors(growth_rate, max_years, growth_curve=None, elapsed=None):
+    """growth_factor per scenario and year (or elapsed time), bit-identical to the scalar path.
+
+    NumPy's vectorized pow can differ from Python's by an ulp, so factors are
+    tabulated with Python floats once per distinct (curve, growth rate) pair
+    and gathered back to the scenarios: a book with a handful of adoption
+    shapes costs a handful of table rows, however many scenarios it has.
+    """
+    import numpy as np
+
+    growth_rate = np.asarray(growth_rate, dtype=np.float64).reshape(-1)
+    elapsed = list(range(max_years)) if elapsed is None else list(elapsed)
+    curves, curve_codes = _curve_codes(growth_curve, len(growth_rate))
+    rates, rate_codes = np.unique(growth_rate, return_inverse=True)
+    pairs, inverse = np.unique(curve_codes * len(rates) + rate_codes.reshape(-1), return_inverse=True)
+    rates = rates.tolist()
+    table = np.array([[growth_factor(rates[pair % len(rates)], t, curves[pair // len(rates)]) for t in elapsed]
+                      for pair in pairs.tolist()], dtype=np.float64).reshape(len(pairs), len(elapsed))
+    return table[inverse.reshape(-1)]
+
+def calculate_costs_batch(annual_queries, platform_fee=None, credit_cost=None, queries_per_credit=None,
+                          years=3, growth_rate=0, credit_schedule=None, growth_curve=None):
+    """Vectorized calculate_costs over arrays of scenarios.
+
+    Inputs are scalars or 1-D arrays (broadcast against each other), or a
+    DataFrame with the BATCH_INPUTS columns passed as the first argument.
+    Returns a dict with 'year' (1..max years) and one (scenario x year) array
+    per COST_METRICS key. Years beyond a scenario's own horizon are NaN.
+    Values match calculate_costs exactly: the arithmetic runs in the same order.
+    A credit_schedule (one price book for the whole batch) is applied with
+    tiered_consumption_cost_batch, O(n log tiers). growth_curve is one curve
+    for the batch or a sequence of one curve per scenario.
+    """
+    import numpy as np
+
+    if hasattr(annual_queries, 'columns'):
+        frame = annual_queries
+        annual_queries = frame['annual_queries'].to_numpy()
+        platform_fee = frame['platform_fee'].to_numpy()
+        credit_cost = frame['credit_cost'].to_numpy()
+        queries_per_credit = frame['queries_per_credit'].to_numpy()
+        if 'years' in frame:
+            years = frame['years'].to_numpy()
+        if 'growth_rate' in frame:
+            growth_rate = frame['growth_rate'].to_numpy()
+
+    annual_queries, platform_fee, credit_cost, queries_per_credit, growth_rate, years = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(v, dtype=np.float64))
+          for v in (annual_queries, platform_fee, credit_cost, queries_per_credit, growth_rate, years)]
+    )
+    years = years.astype(np.int64)
+    max_years = int(years.max()) if years.size else 0
+    year = np.arange(1, max_years + 1)
+
+    # Same expression order as calculate_costs, one column per projection year
+    year_queries = annual_queries[:, None] * _growth_factors(growth_rate, max_years, growth_curve)
+    credits_needed = year_queries / queries_per_credit[:, None]
+    if credit_schedule:
+        consumption_cost = tiered_consumption_cost_batch(credits_needed, credit_schedule)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            effective_credit_cost = np.where(credits_needed != 0, consumption_cost / credits_needed, 0.0)
+    else:
+        consumption_cost = credits_needed * credit_cost[:, None]
+        effective_credit_cost = np.repeat(credit_cost[:, None], max_years, axis=1)
+    fee = np.broadcast_to(platform_fee[:, None], year_queries.shape)
+    total_cost = fee + consumption_cost
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cost_per_query = total_cost / year_queries
+    monthly_cost = total_cost / 12
+
+    result = {
+        'year': year,
+        'queries': year_queries,
+        'credits_needed': credits_needed,
+        'platform_fee': np.array(fee),
+        'consumption_cost': consumption_cost,
+        'total_cost': total_cost,
+        'cost_per_query': cost_per_query,
+        'monthly_cost': monthly_cost,
+        'effective_credit_cost': effective_credit_cost
+    }
+
+    beyond_horizon = year[None, :] > years[:, None]
+    if beyond_horizon.any():
+        for key in COST_METRICS:
+            result[key][beyond_horizon] = np.nan
+
+    return result
+
+# Money metrics kept as integer cents by the exact engine
+MONEY_METRICS = ['platform_fee', 'consumption_cost', 'total_cost', 'monthly_cost']
+
+# Credit rounding for exact (integer-cents) pricing:
+#   none    - fractional credits; each year's consumption is rounded to the cent
+#   up      - bill whole credits, rounding each year's credits up
+#   nearest - whole credits, rounded half up
+#   down    - whole credits, rounded down
+CREDIT_ROUNDING = ['none', 'up', 'nearest', 'down']
+
+# Credit rounding choices shown in the UI
+CREDIT_ROUNDING_OPTIONS = {
+    'Round Up to Whole Credits': 'up',
+    'Fractional Credits': 'none',
+    'Nearest Whole Credit': 'nearest',
+    'Round Down to Whole Credits': 'down',
+}
+
+def _to_cents(dollars):
+    """Dollar amount (or array of amounts) as integer cents, to the nearest cent"""
+    if hasattr(dollars, 'dtype'):
+        import numpy as np
+
+        return np.rint(dollars * 100).astype(np.int64)
+    return round(dollars * 100)
+
+def _round_div(numerator, denominator):
+    """numerator / denominator rounded half up, for non-negative ints or int64 arrays"""
+    if isinstance(denominator, int) and denominator == 1:
+        return numerator
+    return (2 * numerator + denominator) // (2 * denominator)
+
+def _cents_tier_table(credit_schedule):
+    """Whole-credit tier limits, rates in cents and prefix costs in cents"""
+    bounds, rates, _ = _tier_table(credit_schedule)
+    if any(limit != int(limit) for limit in bounds[:-1]):
+        raise ValueError("Tier limits must be whole credits for exact pricing")
+    limits = [int(limit) for limit in bounds[:-1]]
+    rates = [_to_cents(rate) for rate in rates]
+    prefix = [0]
+    for lower, upper, rate in zip([0] + limits, limits, rates):
+        prefix.append(prefix[-1] + (upper - lower) * rate)
+    return limits, rates, prefix
+
+def _billable_units(queries, queries_per_credit, credit_rounding):
+    """Billable credits as (units, units per credit), both integers
+
+    Whole-credit rounding gives (credits, 1); fractional credits are kept
+    exact as (queries, queries_per_credit).
+    """
+    if credit_rounding == 'none':
+        return queries, queries_per_credit
+    if credit_rounding == 'up':
+        return (queries + queries_per_credit - 1) // queries_per_credit, 1
+    if credit_rounding == 'nearest':
+        return _round_div(queries, queries_per_credit), 1
+    if credit_rounding == 'down':
+        return queries // queries_per_credit, 1
+    raise ValueError(f"Unknown credit rounding: {credit_rounding}")
+
+def _consumption_cents(units, per_credit, price_cents, credit_schedule):
+    """Consumption cost in cents of units / per_credit credits.
+
+    Runs unchanged on Python ints and int64 arrays: tiers are selected with
+    comparisons and arithmetic instead of lookups, so the scalar and batch
+    engines share this code and agree to the cent.
+    """
+    if not credit_schedule:
+        return _round_div(units * price_cents, per_credit)
+
+    limits, rates, prefix = _cents_tier_table(credit_schedule)
+    mode = credit_schedule.get('mode', 'graduated')
+
+    if mode == 'committed':
+        committed = credit_schedule.get('committed_credits', 0)
+        if committed != int(committed):
+            raise ValueError("Committed credits must be whole credits for exact pricing")
+        rate = rates[bisect_left(limits, committed)]
+        committed_units = int(committed) * per_credit
+        billed = units + (committed_units - units) * (committed_units > units)
+        return _round_div(billed * rate, per_credit)
+
+    rate, lower, below = rates[0], 0, 0
+    for i, limit in enumerate(limits):
+        above = units > limit * per_credit
+        rate = rate + (rates[i + 1] - rates[i]) * above
+        lower = lower + (limit - (limits[i - 1] if i else 0)) * above
+        below = below + (prefix[i + 1] - prefix[i]) * above
+    if mode == 'all_units':
+        return _round_div(units * rate, per_credit)
+    return below + _round_div((units - lower * per_credit) * rate, per_credit)
+
+def calculate_costs_cents(annual_queries, platform_fee, credit_cost, queries_per_credit, years=3, growth_rate=0,
+                          credit_schedule=None, credit_rounding='up', growth_curve=None):
+    """calculate_costs in exact integer cents.
+
+    Each year's volume is rounded to whole queries and its credits rounded per
+    credit_rounding (see CREDIT_ROUNDING); fees, credit prices and every money
+    result are integer cents, so years and TCO add up to the cent. Returns a
+    CostTable with money columns in dollars (cents / 100) and the cents in
+    .cents. queries_per_credit must be a whole number.
+    """
+    if queries_per_credit != int(queries_per_credit):
+        raise ValueError("Queries per credit must be a whole number for exact pricing")
+    validate_growth_curve(growth_curve)
+    queries_per_credit = int(queries_per_credit)
+    fee_cents = _to_cents(platform_fee)
+    price_cents = _to_cents(credit_cost)
+
+    columns = {name: [] for name in CostTable.COLUMNS}
+    cents = {name: [] for name in MONEY_METRICS}
+
+    for year in range(1, years + 1):
+        year_queries = round(annual_queries * growth_factor(growth_rate, year - 1, growth_curve))
+        units, per_credit = _billable_units(year_queries, queries_per_credit, credit_rounding)
+        consumption_cents = _consumption_cents(units, per_credit, price_cents, credit_schedule)
+        total_cents = fee_cents + consumption_cents
+        credits_needed = units / per_credit
+
+        columns['year'].append(year)
+        columns['queries'].append(year_queries)
+        columns['credits_needed'].append(credits_needed)
+        columns['cost_per_query'].append(total_cents / 100 / year_queries if year_queries else float('nan'))
+        columns['effective_credit_cost'].append(consumption_cents / 100 / credits_needed if credits_needed else 0.0)
+        cents['platform_fee'].append(fee_cents)
+        cents['consumption_cost'].append(consumption_cents)
+        cents['total_cost'].append(total_cents)
+        cents['monthly_cost'].append(_round_div(total_cents, 12))
+
+    for name in MONEY_METRICS:
+        columns[name] = [value / 100 for value in cents[name]]
+    return CostTable(**columns, cents=cents)
+
+def calculate_costs_cents_batch(annual_queries, platform_fee=None, credit_cost=None, queries_per_credit=None,
+                                years=3, growth_rate=0, credit_schedule=None, credit_rounding='up', growth_curve=None):
+    """Vectorized calculate_costs_cents, laid out like calculate_costs_batch.
+
+    Adds result['cents'], a (scenario x year) int64 array per MONEY_METRICS
+    key; cents beyond a scenario's horizon are 0 (the float columns are NaN).
+    Same cents as calculate_costs_cents for every scenario.
+    """
+    import numpy as np
+
+    if hasattr(annual_queries, 'columns'):
+        frame = annual_queries
+        annual_queries, platform_fee, credit_cost, queries_per_credit = [
+            frame[name].to_numpy() for name in BATCH_INPUTS[:4]]
+        if 'years' in frame:
+            years = frame['years'].to_numpy()
+        if 'growth_rate' in frame:
+            growth_rate = frame['growth_rate'].to_numpy()
+
+    annual_queries, platform_fee, credit_cost, queries_per_credit, growth_rate, years = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(v, dtype=np.float64))
+          for v in (annual_queries, platform_fee, credit_cost, queries_per_credit, growth_rate, years)]
+    )
+    if np.any(queries_per_credit != np.rint(queries_per_credit)):
+        raise ValueError("Queries per credit must be a whole number for exact pricing")
+    years = years.astype(np.int64)
+    max_years = int(years.max()) if years.size else 0
+    year = np.arange(1, max_years + 1)
+
+    year_queries = np.rint(annual_queries[:, None] * _growth_factors(growth_rate, max_years, growth_curve)).astype(np.int64)
+    units, per_credit = _billable_units(year_queries, queries_per_credit.astype(np.int64)[:, None], credit_rounding)
+    consumption_cents = _consumption_cents(units, per_credit, _to_cents(credit_cost)[:, None], credit_schedule)
+    fee_cents = np.broadcast_to(_to_cents(platform_fee)[:, None], year_queries.shape)
+    total_cents = fee_cents + consumption_cents
+
+    cents = {
+        'platform_fee': np.array(fee_cents),
+        'consumption_cost': consumption_cents,
+        'total_cost': total_cents,
+        'monthly_cost': _round_div(total_cents, 12),
+    }
+    credits_needed = units / per_credit if credit_rounding == 'none' else units.astype(np.float64)
+    result = {'year': year, 'queries': year_queries.astype(np.float64), 'credits_needed': credits_needed, 'cents': cents}
+    for key in MONEY_METRICS:
+        result[key] = cents[key] / 100
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['cost_per_query'] = result['total_cost'] / result['queries']
+        result['effective_credit_cost'] = np.where(credits_needed != 0, result['consumption_cost'] / credits_needed, 0.0)
+
+    beyond_horizon = year[None, :] > years[:, None]
+    if beyond_horizon.any():
+        for key in COST_METRICS:
+            result[key][beyond_horizon] = np.nan
+        for key in MONEY_METRICS:
+            cents[key][beyond_horizon] = 0
+    return result
+
+def _spread_cents(cents, weights):
+    """Split (scenario x year) cents over the months in proportion to (scenario x year x 12) weights.
+
+    Months get the differences of the rounded running share, so each year's
+    months add up to its cents exactly; a year without weight is split evenly.
+    """
+    import numpy as np
+
+    totals = weights.sum(axis=2, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.where(totals > 0, np.cumsum(weights, axis=2) / totals, np.arange(1, 13) / 12)
+    running = np.rint(cents[:, :, None] * share).astype(np.int64)
+    running[:, :, -1] = cents
+    return np.diff(running, axis=2, prepend=0)
+
+def monthly_timeline(run_queries_per_month, platform_fee, credit_cost, queries_per_credit, years=3, growth_rate=0,
+                     build_months=0, build_queries_per_month=0, compound_monthly=False, growth_curve=None,
+                     credit_schedule=None, credit_rounding=None):
+    """Month-by-month projection for one or many scenarios, backed by arrays.
+
+    Each scenario runs build_months at build_queries_per_month, then the run
+    rate for the rest of the horizon (12 * years months, shared by all
+    scenarios). Growth steps up once per projection year like calculate_costs,
+    or follows the curve every month with compound_monthly. A growth_curve
+    (one for all scenarios) sets the curve and its seasonality. The platform
+    fee is spread evenly over the months. Inputs are scalars or 1-D arrays; returns 'month',
+    'year' (1-D, per month) and a (scenario x month) array for 'queries',
+    'credits_needed', 'platform_fee', 'consumption_cost' and 'total_cost'.
+
+    Tiers apply to yearly credits, so with a credit_schedule each projection
+    year's credits are priced together and the cost is spread over its months
+    by their credits. With credit_rounding each year is priced like
+    calculate_costs_cents (whole queries, rounded credits, integer cents) and
+    split into months that add up to it; the cents are in 'cents' as
+    (scenario x month) int64 arrays for 'platform_fee', 'consumption_cost'
+    and 'total_cost'.
+    """
+    import numpy as np
+
+    run_rate, build_rate, build_length, fee, price, ratio, growth = np.broadcast_arrays(
+        *[np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in
+          (run_queries_per_month, build_queries_per_month, build_months, platform_fee, credit_cost,
+           queries_per_credit, growth_rate)]
+    )
+    month_index = np.arange(12 * years)
+    year_index = month_index // 12
+
+    in_build = month_index[None, :] < build_length[:, None]
+    base_queries = np.where(in_build, build_rate[:, None], run_rate[:, None])
+    elapsed_years = month_index / 12 if compound_monthly else year_index
+    if growth_curve is None:
+        queries = base_queries * (1 + growth[:, None]) ** elapsed_years[None, :]
+    else:
+        # One factor row per distinct growth rate, over the distinct elapsed times
+        steps, step_index = np.unique(elapsed_years, return_inverse=True)
+        factors = _growth_factors(growth, len(steps), growth_curve, steps.tolist())
+        queries = base_queries * factors[:, step_index.reshape(-1)]
+        weights = seasonal_weights(growth_curve)
+        if weights is not None:
+            queries = queries * np.asarray(weights)[month_index % 12][None, :]
+
+    credits_needed = queries / ratio[:, None]
+    timeline = {
+        'month': month_index + 1,
+        'year': year_index + 1,
+        'queries': queries,
+        'credits_needed': credits_needed,
+    }
+
+    by_year = (len(queries), years, 12)
+    if credit_rounding:
+        if np.any(ratio != np.rint(ratio)):
+            raise ValueError("Queries per credit must be a whole number for exact pricing")
+        year_queries = np.rint(queries.reshape(by_year).sum(axis=2)).astype(np.int64)
+        units, per_credit = _billable_units(year_queries, ratio.astype(np.int64)[:, None], credit_rounding)
+        consumption_cents = _consumption_cents(units, per_credit, _to_cents(price)[:, None], credit_schedule)
+        fee_cents = np.broadcast_to(_to_cents(fee)[:, None], year_queries.shape)
+        fee_months = _spread_cents(fee_cents, np.ones(by_year)).reshape(queries.shape)
+        consumption_months = _spread_cents(consumption_cents, credits_needed.reshape(by_year)).reshape(queries.shape)
+        cents = {
+            'platform_fee': fee_months,
+            'consumption_cost': consumption_months,
+            'total_cost': fee_months + consumption_months,
+        }
+        timeline['cents'] = cents
+        for key, value in cents.items():
+            timeline[key] = value / 100
+        return timeline
+
+    if credit_schedule:
+        month_credits = credits_needed.reshape(by_year)
+        year_credits = month_credits.sum(axis=2, keepdims=True)
+        # Twelve monthly shares of a yearly volume can add up a hair off a tier limit
+        year_queries = np.round(queries.reshape(by_year).sum(axis=2, keepdims=True), 6)
+        year_cost = tiered_consumption_cost_batch(year_queries / ratio[:, None, None], credit_schedule)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            share = np.where(year_credits > 0, month_credits / year_credits, 1 / 12)
+        consumption_cost = (year_cost * share).reshape(queries.shape)
+    else:
+        consumption_cost = credits_needed * price[:, None]
+    monthly_fee = np.broadcast_to((fee / 12)[:, None], queries.shape)
+
+    timeline.update({
+        'platform_fee': monthly_fee,
+        'consumption_cost': consumption_cost,
+        'total_cost': monthly_fee + consumption_cost,
+    })
+    return timeline
+
+def iter_months(timeline, scenario=0):
+    """Yield one month record dict at a time for a scenario of a monthly_timeline"""
+    for i, month in enumerate(timeline['month'].tolist()):
+        queries = float(timeline['queries'][scenario, i])
+        total_cost = float(timeline['total_cost'][scenario, i])
+        yield {
+            'month': month,
+            'year': int(timeline['year'][i]),
+            'queries': queries,
+            'credits_needed': float(timeline['credits_needed'][scenario, i]),
+            'platform_fee': float(timeline['platform_fee'][scenario, i]),
+            'consumption_cost': float(timeline['consumption_cost'][scenario, i]),
+            'total_cost': total_cost,
+            'cost_per_query': total_cost / queries if queries else float('nan'),
+        }
+
+def aggregate_monthly_to_yearly(timeline):
+    """Roll a monthly_timeline up to the calculate_costs_batch yearly layout (with 'cents' for an exact one)"""
+    import numpy as np
+
+    n, months = timeline['queries'].shape
+    years = months // 12
+
+    def yearly(key):
+        return timeline[key].reshape(n, years, 12).sum(axis=2)
+
+    result = {'year': np.arange(1, years + 1)}
+    for key in ('queries', 'credits_needed', 'platform_fee', 'consumption_cost', 'total_cost'):
+        result[key] = yearly(key)
+    if 'cents' in timeline:
+        cents = {key: timeline['cents'][key].reshape(n, years, 12).sum(axis=2) for key in timeline['cents']}
+        cents['monthly_cost'] = _round_div(cents['total_cost'], 12)
+        result['cents'] = cents
+        for key in MONEY_METRICS:
+            result[key] = cents[key] / 100
+    else:
+        result['monthly_cost'] = result['total_cost'] / 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['cost_per_query'] = result['total_cost'] / result['queries']
+        result['effective_credit_cost'] = result['consumption_cost'] / result['credits_needed']
+    return result
+
+def batch_table(result, scenario=0):
+    """CostTable for one scenario of a batch result, as views (no copies)
+
+    Years beyond the scenario's own horizon (NaN in the batch) are left out.
+    """
+    import numpy as np
+
+    horizon = int(np.count_nonzero(~np.isnan(result['total_cost'][scenario])))
+    columns = {key: result[key][scenario, :horizon] for key in COST_METRICS}
+    cents = None
+    if 'cents' in result:
+        cents = {key: result['cents'][key][scenario, :horizon] for key in MONEY_METRICS}
+    return CostTable(year=result['year'][:horizon], **columns, cents=cents)
@@ -0,0 +1,190 @@
+"""Tables and download payloads for the pricing calculator.
+
+Builders take computed results and return plain values (DataFrame, CSV text,
+summary text) without making any Streamlit calls, so the page can cache them.
+"""
+
+import pandas as pd
+
+from pricing_engine import describe_growth, format_number
+
+def build_summary_table(costs):
+    """Formatted multi-year summary table for display, from a CostTable"""
+    return pd.DataFrame({
+        'Year': [f"Year {year}" for year in costs.year],
+        'Query Volume': [format_number(v) for v in costs.queries],
+        'Credits Needed': [format_number(v) for v in costs.credits_needed],
+        'Platform Fee': [format_number(v, prefix='$') for v in costs.platform_fee],
+        'Effective $/Credit': [format_number(v, decimals=2, prefix='$') for v in costs.effective_credit_cost],
+        'Consumption': [format_number(v, prefix='$') for v in costs.consumption_cost],
+        'Total Cost': [format_number(v, prefix='$') for v in costs.total_cost],
+        'Cost/Query': [format_number(v, decimals=4, prefix='$') for v in costs.cost_per_query],
+        'Monthly Avg': [format_number(v, prefix='$') for v in costs.monthly_cost]
+    })
+
+def build_cost_frame(costs, queries_per_credit, credit_cost, deployment_model):
+    """Full multi-year cost breakdown with typed (numeric) columns, from a CostTable"""
+    return pd.DataFrame({
+        'Year': costs.year,
+        'Query Volume': costs.queries,
+        'Queries per Credit': queries_per_credit,
+        'Credits Needed': costs.credits_needed,
+        'Credit Cost': credit_cost,
+        'Effective Credit Cost': costs.effective_credit_cost,
+        'Consumption Cost': costs.consumption_cost,
+        'Platform Fee': costs.platform_fee,
+        'Total Annual Cost': costs.total_cost,
+        'Cost per Query': costs.cost_per_query,
+        'Monthly Cost': costs.monthly_cost,
+        'Deployment Model': deployment_model
+    })
+
+def build_cost_csv(costs, queries_per_credit, credit_cost, deployment_model):
+    """Full multi-year cost breakdown as CSV text, from a CostTable"""
+    return build_cost_frame(costs, queries_per_credit, credit_cost, deployment_model).to_csv(index=False)
+
+def build_cost_parquet(costs, queries_per_credit, credit_cost, deployment_model):
+    """Full multi-year cost breakdown as Parquet bytes, from a CostTable"""
+    import io
+
+    frame = build_cost_frame(costs, queries_per_credit, credit_cost, deployment_model)
+    # Same column types whatever mix of int and float inputs produced the table
+    frame = frame.astype({column: 'float64' for column in frame if column not in ('Year', 'Deployment Model')})
+    output = io.BytesIO()
+    with ChunkedTableWriter(output, 'parquet') as writer:
+        writer.write(frame)
+    return output.getvalue()
+
+# Streaming export formats, with file extensions and download MIME types
+EXPORT_FORMATS = {
+    'csv': {'extensions': ['.csv'], 'mime': 'text/csv'},
+    'jsonl': {'extensions': ['.jsonl', '.ndjson', '.json'], 'mime': 'application/x-ndjson'},
+    'parquet': {'extensions': ['.parquet', '.pq'], 'mime': 'application/vnd.apache.parquet'},
+    'arrow': {'extensions': ['.arrow', '.feather', '.ipc'], 'mime': 'application/vnd.apache.arrow.file'},
+}
+
+class ChunkedTableWriter:
+    """Appends DataFrame chunks to a binary stream as CSV, JSONL, Parquet or Arrow IPC.
+
+    Each write() is encoded and flushed on its own (one Parquet row group or
+    Arrow record batch per chunk), so memory is bounded by the chunk size.
+    The schema is fixed by the first chunk; later chunks are cast to it, so
+    a column that pandas inferred differently in one chunk still lines up.
+    """
+
+    def __init__(self, out, fmt, row_group_size=None):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        self.out = out
+        self.fmt = fmt
+        self.row_group_size = row_group_size
+        self.schema = None
+        self.writer = None
+        self.rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _table(self, frame):
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self.schema is None:
+            self.schema = table.schema.remove_metadata()
+        elif not table.schema.equals(self.schema, check_metadata=False):
+            try:
+                table = table.cast(self.schema)
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError, ValueError) as error:
+                raise ValueError(f"chunk does not match the output columns: {error}")
+        return table
+
+    def write(self, frame):
+        """Append one chunk"""
+        if self.fmt == 'jsonl':
+            if len(frame):
+                text = frame.to_json(orient='records', lines=True, double_precision=15)
+                # Older pandas leaves off the final newline; newer ones end every line with one
+                self.out.write((text if text.endswith('\n') else text + '\n').encode())
+            self.rows += len(frame)
+            return
+
+        import pyarrow.csv as pa_csv
+        import pyarrow.ipc as pa_ipc
+        import pyarrow.parquet as pq
+
+        first = self.schema is None
+        table = self._table(frame)
+        if self.fmt == 'csv':
+            # Arrow's CSV writer is several times faster than DataFrame.to_csv for float columns
+            pa_csv.write_csv(table, self.out, pa_csv.WriteOptions(include_header=first, quoting_style='needed'))
+        elif self.fmt == 'parquet':
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.out, self.schema)
+            self.writer.write_table(table, row_group_size=self.row_group_size)
+        else:
+            if self.writer is None:
+                self.writer = pa_ipc.new_file(self.out, self.schema)
+            self.writer.write_table(table, max_chunksize=self.row_group_size)
+        self.rows += len(frame)
+
+    def close(self):
+        """Finish the file (Parquet / Arrow footers); the stream itself stays open"""
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+def build_executive_summary(generated, platform_fee, credit_cost, deployment_model, queries_per_credit,
+                            costs, growth_rate, comparison_costs,
+                            cost_difference, cost_difference_pct, cheaper_option, credit_pricing='Flat',
+                            growth_curve=None):
+    """One-page executive summary text; comparison_costs maps deployment model -> Year 1 costs"""
+    year1 = costs[0]
+    total_tco = costs.total('total_cost')
+    total_queries = costs.total('queries')
+    avg_cost_per_query = total_tco / total_queries
+    if credit_pricing == 'Flat':
+        credit_cost_line = f"${credit_cost} per credit"
+    else:
+        credit_cost_line = f"{credit_pricing}, Year 1 effective {format_number(year1['effective_credit_cost'], decimals=2, prefix='$')} per credit"
+    if growth_curve is None:
+        growth_line = f"Annual Growth Rate: {growth_rate*100:.0f}%"
+    else:
+        growth_line = f"Volume Growth: {describe_growth(growth_rate, growth_curve)}"
+    comparison_lines = '\n'.join(
+        f"{name}: {format_number(model_costs['total_cost'], prefix='$')} "
+        f"({format_number(model_costs['cost_per_query'], decimals=4, prefix='$')}/query)"
+        for name, model_costs in comparison_costs.items()
+    )
+
+    return f"""
+AI PLATFORM - PRICING SUMMARY
+Generated: {generated}
+
+CONFIGURATION
+Platform Fee: {format_number(platform_fee, prefix='$')}
+Credit Cost: {credit_cost_line}
+Deployment Model: {deployment_model}
+Queries per Credit: {queries_per_credit}
+
+YEAR 1 SUMMARY
+Annual Query Volume: {format_number(year1['queries'])}
+Credits Required: {format_number(year1['credits_needed'])}
+Consumption Cost: {format_number(year1['consumption_cost'], prefix='$')}
+Total Annual Cost: {format_number(year1['total_cost'], prefix='$')}
+Cost per Query: {format_number(year1['cost_per_query'], decimals=4, prefix='$')}
+Monthly Cost: {format_number(year1['monthly_cost'], prefix='$')}
+
+{len(costs)}-YEAR PROJECTION
+Total Cost of Ownership: {format_number(total_tco, prefix='$')}
+Total Queries: {format_number(total_queries)}
+Average Cost per Query: {format_number(avg_cost_per_query, decimals=4, prefix='$')}
+{growth_line}
+
+DEPLOYMENT COMPARISON
+{comparison_lines}
+Difference: {format_number(cost_difference, prefix='$')} ({format_number(cost_difference_pct, decimals=1)}%)
+Recommendation: {cheaper_option} for this volume
+"""
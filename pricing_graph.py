@@ -0,0 +1,113 @@
+"""Dependency graph of the pricing calculator's derived values.
+
+The page sets its inputs (widget values) on a DerivedGraph each rerun and
+reads derived values (costs, comparison, TCO, exports, figures) from named
+nodes. A node is a function of inputs and other nodes; it is recomputed only
+when something upstream of it changed since it was last computed, otherwise
+its value from an earlier rerun is returned as-is. Changing the growth rate,
+for example, recomputes the projection and its exports but not the Year 1
+deployment comparison, which doesn't depend on it.
+
+Nodes are computed lazily, so a node the rerun never reads (a figure of a
+report section that isn't shown) costs nothing. The page keeps one graph per
+session; the shared st.cache_data caches behind the node functions still
+serve identical inputs across sessions. No Streamlit calls here.
+"""
+
+class DerivedGraph:
+    """Memoized derived values, recomputed only downstream of changed inputs.
+
+    Every input and node carries a version that is bumped whenever its value
+    changes; a node remembers the versions of its dependencies it was last
+    computed from. A node recomputed to an equal value keeps its version, so
+    its dependents stay current. Values are shared between reruns, so treat
+    them as read-only.
+    """
+
+    def __init__(self):
+        self.inputs = {}
+        self.nodes = {}
+        self.values = {}
+        self.versions = {}
+        self.stamps = {}
+        self.recomputed = []
+
+    def set(self, **inputs):
+        """Set input values; an input only counts as changed if its new value differs"""
+        for name, value in inputs.items():
+            if name in self.nodes:
+                raise ValueError(f"{name} is a derived node, not an input")
+            if name in self.inputs and _same(self.inputs[name], value):
+                continue
+            self.inputs[name] = value
+            self.versions[name] = self.versions.get(name, 0) + 1
+
+    def node(self, name, func, *deps, **named_deps):
+        """Define node name as func(dep=value, ..., param=value of named_deps[param]).
+
+        Dependencies are input or node names. Redefining a node (as the page
+        does every rerun) keeps its memoized value unless its dependencies change.
+        """
+        if name in self.inputs:
+            raise ValueError(f"{name} is an input, not a derived node")
+        params = dict({dep: dep for dep in deps}, **named_deps)
+        previous = self.nodes.get(name)
+        if previous is not None and previous[1] != params:
+            self.stamps.pop(name, None)
+        self.nodes[name] = (func, params)
+
+    def begin_rerun(self):
+        """Start recording the nodes recomputed by this rerun"""
+        self.recomputed = []
+
+    def _version(self, name):
+        if name in self.nodes:
+            self.get(name)
+        elif name not in self.inputs:
+            raise KeyError(f"unknown input or node {name!r}")
+        return self.versions[name]
+
+    def get(self, name):
+        """Value of an input or node, computing the node if it is stale"""
+        if name not in self.nodes:
+            if name not in self.inputs:
+                raise KeyError(f"unknown input or node {name!r}")
+            return self.inputs[name]
+
+        func, params = self.nodes[name]
+        stamp = tuple(self._version(source) for source in params.values())
+        if self.stamps.get(name) != stamp:
+            value = func(**{param: self.get(source) for param, source in params.items()})
+            self.stamps[name] = stamp
+            self.recomputed.append(name)
+            # A recomputed value equal to the old one leaves its dependents current
+            if name not in self.values or not _same(self.values[name], value):
+                self.values[name] = value
+                self.versions[name] = self.versions.get(name, 0) + 1
+        return self.values[name]
+
+    __getitem__ = get
+
+    def downstream(self, name):
+        """Nodes that depend on name, directly or through other nodes"""
+        found = []
+        frontier = [name]
+        while frontier:
+            current = frontier.pop()
+            for node, (_, params) in self.nodes.items():
+                if current in params.values() and node not in found:
+                    found.append(node)
+                    frontier.append(node)
+        return found
+
+def _same(old, new):
+    """Whether a value is unchanged: same type and equal (5 and 5.0 differ).
+
+    Values without a plain truth-valued == (DataFrames, arrays) only match themselves.
+    """
+    if type(old) is not type(new):
+        return False
+    try:
+        return bool(old == new)
+    except (TypeError, ValueError):
+        return old is new
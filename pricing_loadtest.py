@@ -0,0 +1,390 @@
+"""Concurrent-session load test for the pricing calculator page.
+
+Starts the page with `streamlit run` (or targets a running server with --url)
+and drives simulated users over Streamlit's browser websocket protocol. Each
+session connects like a browser tab, loads the page, then keeps changing one
+random input (sidebar prices, deployment model, volume method and its inputs,
+projection settings, report section) and waits for the rerun to finish, with a
+random think time between changes. Concurrency steps up through --sessions;
+every level reports rerun latency percentiles, throughput, errors and server
+memory per session, and the summary names the largest level whose p95 rerun
+latency stays within --slo:
+
+    python pricing_loadtest.py                                  # 1, 5, 10, 25, 50 sessions
+    python pricing_loadtest.py --sessions 10,50,100 --duration 60 --think-time 5
+    python pricing_loadtest.py --url http://localhost:8501 --server-pid 4242 -o load.json
+
+Latency is measured by the client from sending a rerun to the server's
+script_finished message, so it includes time queued behind other sessions'
+reruns. Memory is the server's resident set size (read from /proc, so Linux
+and the same machine only), taken while the level's sessions are connected;
+Python rarely hands memory back, so per-session figures from later levels are
+lower bounds. Run the client on a different machine (or cores) from the server
+when measuring high concurrency; at a few hundred sessions the client's own
+message parsing starts to show.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from urllib.parse import urlparse
+
+from pricing_benchmarks import APP_PATH, environment
+
+DEFAULT_SESSIONS = [1, 5, 10, 25, 50]
+
+# Widgets a simulated user changes, by label (the first widget with a label wins)
+USER_INPUTS = [
+    'Annual Platform Fee ($)',
+    'Cost per Credit ($)',
+    'Exact cents',
+    'Select Deployment',
+    'How do you want to estimate volume?',
+    'Small\n125K queries',
+    'Medium\n200K queries',
+    'Large\n300K queries',
+    'Annual Query Volume',
+    'Build Phase Duration (months)',
+    'Queries per Month (Build)',
+    'Run Phase Duration (months)',
+    'Queries per Month (Run)',
+    'Projection Period (years)',
+    'Annual Growth Rate (%)',
+    'Report Section',
+]
+
+WIDGET_TYPES = ['number_input', 'slider', 'radio', 'selectbox', 'checkbox', 'button']
+
+class SessionError(Exception):
+    """A simulated session failed (connection lost, rerun timed out or raised)"""
+
+class PageSession:
+    """One simulated browser tab: the page's widgets and the values this user set"""
+
+    def __init__(self, url, rng, timeout=60):
+        self.stream_url = stream_url(url)
+        self.rng = rng
+        self.timeout = timeout
+        self.connection = None
+        self.widgets = {}
+        self.form_submitters = {}
+        self.states = {}
+
+    async def connect(self):
+        from tornado.websocket import websocket_connect
+
+        try:
+            self.connection = await asyncio.wait_for(websocket_connect(self.stream_url), self.timeout)
+        except (OSError, asyncio.TimeoutError) as error:
+            raise SessionError(f"connect failed: {error}")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    async def rerun(self, triggers=()):
+        """Rerun the page with the widget values set so far; returns seconds until it finished"""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.query_string = ''
+        message.rerun_script.widget_states.widgets.extend(list(self.states.values()) + list(triggers))
+
+        started = time.perf_counter()
+        await self.connection.write_message(message.SerializeToString(), binary=True)
+        widgets, submitters, exceptions = {}, {}, []
+        deadline = started + self.timeout
+        while True:
+            try:
+                data = await asyncio.wait_for(self.connection.read_message(), max(0.0, deadline - time.perf_counter()))
+            except asyncio.TimeoutError:
+                raise SessionError(f"rerun took over {self.timeout}s")
+            if data is None:
+                raise SessionError("server closed the connection")
+            reply = ForwardMsg()
+            reply.ParseFromString(data)
+            kind = reply.WhichOneof('type')
+            if kind == 'delta' and reply.delta.WhichOneof('type') == 'new_element':
+                element = reply.delta.new_element
+                element_type = element.WhichOneof('type')
+                if element_type == 'exception':
+                    exceptions.append(element.exception.message)
+                elif element_type in WIDGET_TYPES:
+                    widget = getattr(element, element_type)
+                    widgets.setdefault(widget.label, (element_type, widget))
+                    if element_type == 'button' and widget.is_form_submitter:
+                        submitters[widget.form_id] = widget.id
+            elif kind == 'script_finished':
+                if reply.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise SessionError("page failed to compile")
+                if reply.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    break
+        elapsed = time.perf_counter() - started
+
+        self.widgets, self.form_submitters = widgets, submitters
+        if exceptions:
+            raise SessionError(f"page raised: {exceptions[0]}")
+        return elapsed
+
+    def change_input(self):
+        """Set a random USER_INPUTS widget to a random value; returns (label, triggers)"""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        labels = [label for label in USER_INPUTS if label in self.widgets]
+        if not labels:
+            return None, []
+        label = self.rng.choice(labels)
+        widget_type, widget = self.widgets[label]
+        state = WidgetState(id=widget.id)
+        triggers = []
+        if widget_type == 'button':
+            state.trigger_value = True
+            triggers.append(state)
+        else:
+            if widget_type == 'number_input':
+                value = self._number(widget)
+                if widget.data_type == widget.INT:
+                    state.int_value = int(round(value))
+                else:
+                    state.double_value = value
+            elif widget_type == 'slider':
+                steps = int((widget.max - widget.min) / widget.step) if widget.step else 0
+                state.double_array_value.data.append(widget.min + self.rng.randint(0, steps) * widget.step)
+            elif widget_type in ('radio', 'selectbox'):
+                state.int_value = self.rng.randrange(len(widget.options))
+            else:
+                previous = self.states.get(widget.id)
+                state.bool_value = not (previous.bool_value if previous is not None else widget.default)
+            self.states[widget.id] = state
+        # Widgets in a form only apply when the form is submitted
+        if widget.form_id and widget_type != 'button' and widget.form_id in self.form_submitters:
+            triggers.append(WidgetState(id=self.form_submitters[widget.form_id], trigger_value=True))
+        return label, triggers
+
+    def _number(self, widget):
+        """Random value around a number input's default, within its limits"""
+        low = widget.min if widget.has_min else 0.0
+        high = widget.max if widget.has_max else float('inf')
+        center = widget.default or (low + min(high, low + 1000)) / 2
+        return self.rng.uniform(max(low, center / 2), min(high, center * 2))
+
+def stream_url(url):
+    """Websocket URL of the page's browser stream"""
+    parsed = urlparse(url)
+    scheme = 'wss' if parsed.scheme == 'https' else 'ws'
+    return f"{scheme}://{parsed.netloc}{parsed.path.rstrip('/')}/_stcore/stream"
+
+def server_rss(pid):
+    """Resident set size of a process in bytes, or None where /proc isn't available"""
+    if pid is None:
+        return None
+    try:
+        with open(f'/proc/{pid}/status') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+def percentile(values, q):
+    """Nearest-rank percentile (q from 0 to 100) of a list of numbers, None if empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(q / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+async def simulate_user(session, stop_at, think_time, latencies, changes):
+    """Keep changing inputs on one loaded session until stop_at"""
+    while True:
+        if think_time > 0:
+            await asyncio.sleep(session.rng.expovariate(1 / think_time))
+        if time.perf_counter() >= stop_at:
+            return
+        label, triggers = session.change_input()
+        latencies.append(await session.rerun(triggers))
+        changes[label] = changes.get(label, 0) + 1
+
+async def run_level(url, sessions, duration, think_time, seed=0, server_pid=None, timeout=60):
+    """Load test at one concurrency level; returns its metrics"""
+    rss_before = server_rss(server_pid)
+    users = [PageSession(url, random.Random(seed * 100003 + i), timeout) for i in range(sessions)]
+    errors = []
+
+    async def load(session):
+        await session.connect()
+        return await session.rerun()
+
+    try:
+        loaded = []
+        for session, outcome in zip(users, await asyncio.gather(*[load(s) for s in users], return_exceptions=True)):
+            if isinstance(outcome, Exception):
+                errors.append(str(outcome))
+                session.close()
+            else:
+                loaded.append((session, outcome))
+
+        latencies, changes = [], {}
+        started = time.perf_counter()
+        outcomes = await asyncio.gather(
+            *[simulate_user(session, started + duration, think_time, latencies, changes) for session, _ in loaded],
+            return_exceptions=True
+        )
+        elapsed = time.perf_counter() - started
+        errors += [str(outcome) for outcome in outcomes if isinstance(outcome, Exception)]
+        rss_after = server_rss(server_pid)
+    finally:
+        for session in users:
+            session.close()
+
+    load_times = [seconds for _, seconds in loaded]
+    result = {
+        'sessions': sessions,
+        'duration_s': elapsed,
+        'reruns': len(latencies),
+        'errors': len(errors),
+        'throughput_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'load_p50_s': percentile(load_times, 50),
+        'load_max_s': max(load_times) if load_times else None,
+        'rss_mb': None if rss_after is None else rss_after / 2**20,
+        'rss_per_session_mb': None,
+        'changes': changes,
+        'error_samples': errors[:5],
+    }
+    for q in (50, 90, 95, 99):
+        result[f'p{q}_s'] = percentile(latencies, q)
+    result['max_s'] = max(latencies) if latencies else None
+    if rss_before is not None and rss_after is not None:
+        result['rss_per_session_mb'] = (rss_after - rss_before) / 2**20 / sessions
+    return result
+
+async def warm_up(url, timeout=60):
+    """Load the page once, so the server's first-run imports and cold caches aren't charged to a level"""
+    session = PageSession(url, random.Random(0), timeout)
+    try:
+        await session.connect()
+        await session.rerun()
+    finally:
+        session.close()
+
+def capacity(levels, slo):
+    """Largest level (in the order run) up to which every level met the SLO: no errors, p95 within slo"""
+    supported = 0
+    for level in levels:
+        if level['errors'] or level['p95_s'] is None or level['p95_s'] > slo:
+            break
+        supported = level['sessions']
+    return supported
+
+def start_server(port, timeout=60):
+    """Start the page with streamlit run on port and wait until it is healthy; returns the process"""
+    command = [sys.executable, '-m', 'streamlit', 'run', APP_PATH, '--server.headless', 'true',
+               '--server.port', str(port), '--browser.gatherUsageStats', 'false']
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               cwd=os.path.dirname(APP_PATH))
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"streamlit exited with status {process.returncode}")
+        try:
+            with urllib.request.urlopen(f'http://localhost:{port}/_stcore/health', timeout=2) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.25)
+    process.terminate()
+    raise RuntimeError(f"streamlit did not start on port {port} within {timeout}s")
+
+def _format_ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:,.0f}"
+
+def _format_mb(megabytes):
+    return '-' if megabytes is None else f"{megabytes:,.1f}"
+
+def print_levels(levels, slo, out=sys.stdout):
+    """Plain-text table of the levels and the capacity summary"""
+    print(f"{'sessions':>8}  {'reruns':>7}  {'errors':>6}  {'rerun/s':>7}  {'p50 ms':>7}  {'p90 ms':>7}  "
+          f"{'p95 ms':>7}  {'p99 ms':>7}  {'max ms':>7}  {'RSS MB':>7}  {'MB/sess':>7}", file=out)
+    for level in levels:
+        print(f"{level['sessions']:>8}  {level['reruns']:>7}  {level['errors']:>6}  "
+              f"{level['throughput_per_s']:>7.1f}  {_format_ms(level['p50_s']):>7}  {_format_ms(level['p90_s']):>7}  "
+              f"{_format_ms(level['p95_s']):>7}  {_format_ms(level['p99_s']):>7}  {_format_ms(level['max_s']):>7}  "
+              f"{_format_mb(level['rss_mb']):>7}  {_format_mb(level['rss_per_session_mb']):>7}", file=out)
+    supported = capacity(levels, slo)
+    if supported:
+        print(f"\nOne server kept p95 rerun latency within {slo:g}s with no errors up to {supported} "
+              f"concurrent sessions (highest level tested: {levels[-1]['sessions']}).", file=out)
+    else:
+        print(f"\nOne server missed p95 within {slo:g}s already at {levels[0]['sessions']} sessions.", file=out)
+
+def build_parser():
+    """Command-line options"""
+    parser = argparse.ArgumentParser(description="Load test the pricing calculator page with concurrent sessions.")
+    parser.add_argument('--url', help="running server to test, e.g. http://localhost:8501 "
+                                      "(default: start one with streamlit run)")
+    parser.add_argument('--port', type=int, default=8599, help="port for the started server (default: 8599)")
+    parser.add_argument('--server-pid', type=int, help="pid of the --url server, for memory figures")
+    parser.add_argument('--sessions', default=','.join(str(n) for n in DEFAULT_SESSIONS),
+                        help=f"comma-separated concurrency levels (default: {','.join(str(n) for n in DEFAULT_SESSIONS)})")
+    parser.add_argument('--duration', type=float, default=20, help="seconds per level (default: 20)")
+    parser.add_argument('--think-time', type=float, default=2,
+                        help="mean seconds between a user's changes, exponential; 0 = back-to-back (default: 2)")
+    parser.add_argument('--slo', type=float, default=1.0, help="p95 rerun latency budget in seconds (default: 1.0)")
+    parser.add_argument('--timeout', type=float, default=60, help="seconds before a rerun counts as failed (default: 60)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for the simulated inputs (default: 0)")
+    parser.add_argument('-o', '--output', help="write the levels and environment to a JSON file")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        levels_to_run = [int(n) for n in args.sessions.split(',') if n]
+    except ValueError:
+        parser.error("--sessions must be comma-separated whole numbers")
+    if not levels_to_run or min(levels_to_run) < 1:
+        parser.error("--sessions needs at least one level of 1 or more")
+
+    server = None
+    url, server_pid = args.url, args.server_pid
+    if url is None:
+        try:
+            server = start_server(args.port)
+        except RuntimeError as error:
+            parser.exit(1, f"{parser.prog}: error: {error}\n")
+        url, server_pid = f'http://localhost:{args.port}', server.pid
+
+    levels = []
+    try:
+        try:
+            asyncio.run(warm_up(url, args.timeout))
+        except SessionError as error:
+            parser.exit(1, f"{parser.prog}: error: warm-up load failed: {error}\n")
+        for sessions in levels_to_run:
+            print(f"running {sessions} session(s) for {args.duration:g}s", file=sys.stderr)
+            levels.append(asyncio.run(run_level(url, sessions, args.duration, args.think_time,
+                                                args.seed + len(levels), server_pid, args.timeout)))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_levels(levels, args.slo)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'environment': environment(), 'url': url, 'think_time_s': args.think_time,
+                       'slo_s': args.slo, 'capacity_sessions': capacity(levels, args.slo), 'levels': levels},
+                      output, indent=2)
+    return 0 if all(level['errors'] == 0 for level in levels) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""Price a whole book of customers in parallel and roll up the revenue.
+
+Splits the book into chunks, prices each chunk with calculate_costs_batch in a
+pool of worker processes, and reduces every chunk to a small cube of sums by
+deployment model, size template and year before sending it back, so only the
+roll-ups cross process boundaries:
+
+    python pricing_portfolio.py accounts.csv                  # print roll-ups
+    python pricing_portfolio.py accounts.csv -o forecast.csv --workers 8 --progress
+
+Records use the pricing_cli.py layout (annual_queries, size_template or the
+phase columns, deployment_model, growth_rate, ...) with the same defaults.
+Accounts whose volume comes from annual_queries roll up under the 'Direct'
+template and phase-estimated accounts under 'Phases'.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from pricing_cli import (
+    RecordError,
+    add_default_options,
+    detect_format,
+    load_option_files,
+    price_inputs,
+    read_chunks,
+    resolve_inputs,
+)
+from pricing_engine import MONEY_METRICS, SIZE_TEMPLATES
+
+# Cube dimensions and the additive columns summed over them
+ROLLUP_KEYS = ['deployment_model', 'size_template', 'year']
+ROLLUP_SUMS = ['accounts', 'queries', 'credits_needed', 'platform_fee', 'consumption_cost', 'total_cost']
+
+# Roll-ups reported, by the cube keys they keep
+ROLLUPS = {
+    'deployment_model': ['deployment_model', 'year'],
+    'size_template': ['size_template', 'year'],
+    'year': ['year'],
+}
+
+def default_options(**overrides):
+    """pricing_cli defaults as a namespace, for calling price_portfolio from Python"""
+    parser = argparse.ArgumentParser()
+    add_default_options(parser)
+    defaults = parser.parse_args([])
+    for name, value in overrides.items():
+        if not hasattr(defaults, name):
+            raise TypeError(f"unknown option {name!r}")
+        setattr(defaults, name, value)
+    return defaults
+
+def volume_segments(chunk):
+    """Size template each record rolls up under: its template, 'Direct' or 'Phases'"""
+    import numpy as np
+
+    n = len(chunk)
+    segments = np.full(n, 'Phases', dtype=object)
+    if 'size_template' in chunk:
+        templates = chunk['size_template'].to_numpy(dtype=object)
+        known = np.array([name in SIZE_TEMPLATES for name in templates], dtype=bool)
+        segments[known] = templates[known]
+    if 'annual_queries' in chunk:
+        direct = chunk['annual_queries'].notna().to_numpy()
+        segments[direct] = 'Direct'
+    return segments
+
+def rollup_chunk(chunk, defaults, first_line):
+    """Price one chunk and sum it by ROLLUP_KEYS (money in cents for exact pricing)"""
+    import numpy as np
+    import pandas as pd
+
+    inputs, models = resolve_inputs(chunk, defaults, first_line)
+    result = price_inputs(inputs, defaults)
+
+    n, max_years = result['total_cost'].shape
+    in_horizon = ~np.isnan(result['total_cost']).reshape(-1)
+    columns = {
+        'deployment_model': np.repeat(np.asarray(models, dtype=object), max_years),
+        'size_template': np.repeat(volume_segments(chunk), max_years),
+        'year': np.tile(result['year'], n),
+        'accounts': np.ones(n * max_years, dtype=np.int64),
+    }
+    for key in ROLLUP_SUMS[1:]:
+        if 'cents' in result and key in MONEY_METRICS:
+            columns[key] = result['cents'][key].reshape(-1)
+        else:
+            columns[key] = result[key].reshape(-1)
+    frame = pd.DataFrame(columns)[in_horizon]
+    return frame.groupby(ROLLUP_KEYS, sort=False)[ROLLUP_SUMS].sum()
+
+def _book_chunks(book, chunk_size, fmt=None):
+    """(chunk, first_line) pairs from a DataFrame or a CSV / JSONL path"""
+    if hasattr(book, 'columns'):
+        chunks = (book.iloc[start:start + chunk_size] for start in range(0, len(book), chunk_size))
+    else:
+        chunks = read_chunks(book, detect_format(book, fmt), chunk_size)
+    first_line = 1
+    for chunk in chunks:
+        yield chunk, first_line
+        first_line += len(chunk)
+
+def _rollup_all(chunks, defaults, workers):
+    """Cube partials for every chunk, in a process pool unless workers == 1"""
+    if workers == 1:
+        for chunk, first_line in chunks:
+            yield rollup_chunk(chunk, defaults, first_line), len(chunk)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    # Keep a couple of chunks queued per worker so reading the book overlaps
+    # with pricing without holding the whole book in memory
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for chunk, first_line in chunks:
+            pending[pool.submit(rollup_chunk, chunk, defaults, first_line)] = len(chunk)
+            while len(pending) >= max_pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result(), pending.pop(future)
+        for future in list(pending):
+            yield future.result(), pending.pop(future)
+
+def price_portfolio(book, defaults=None, workers=None, chunk_size=20000, fmt=None, progress=None):
+    """Price every account of book and return the summed cube indexed by ROLLUP_KEYS.
+
+    book is a DataFrame or a CSV / JSONL path. workers defaults to the CPU
+    count; 1 prices in this process. progress(accounts_done) is called after
+    each chunk. Money columns are dollars; with exact pricing
+    (defaults.credit_rounding) they are summed in cents first.
+    """
+    import pandas as pd
+
+    if defaults is None:
+        defaults = default_options()
+    workers = workers or os.cpu_count() or 1
+
+    partials = []
+    done = 0
+    for partial, accounts in _rollup_all(_book_chunks(book, chunk_size, fmt), defaults, workers):
+        partials.append(partial)
+        done += accounts
+        if progress:
+            progress(done)
+
+    if not partials:
+        return pd.DataFrame(columns=ROLLUP_KEYS + ROLLUP_SUMS).set_index(ROLLUP_KEYS)
+    cube = pd.concat(partials).groupby(ROLLUP_KEYS).sum()
+    if defaults.credit_rounding:
+        for key in MONEY_METRICS:
+            if key in cube:
+                cube[key] = cube[key] / 100
+    return cube
+
+def rollups(cube):
+    """Roll-up tables by deployment model, size template and year, with per-query ratios"""
+    import numpy as np
+
+    tables = {}
+    for name, keys in ROLLUPS.items():
+        table = cube.groupby(level=keys).sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            table['cost_per_query'] = table['total_cost'] / table['queries']
+            table['effective_credit_cost'] = table['consumption_cost'] / table['credits_needed']
+        table['monthly_cost'] = table['total_cost'] / 12
+        tables[name] = table.reset_index()
+    return tables
+
+def write_rollups(tables, path):
+    """Write roll-ups as one long CSV (a 'rollup' column per table) or as JSON"""
+    import pandas as pd
+
+    if path.endswith('.json'):
+        payload = {name: table.to_dict(orient='records') for name, table in tables.items()}
+        with open(path, 'w') as out:
+            json.dump(payload, out, indent=2, default=float)
+        return
+    frames = []
+    for name, table in tables.items():
+        keys = ROLLUPS[name]
+        group = table[keys[0]] if len(keys) > 1 else 'All'
+        frames.append(table.drop(columns=keys[:-1]).assign(rollup=name, group=group))
+    long_table = pd.concat(frames, ignore_index=True)
+    columns = ['rollup', 'group'] + [c for c in long_table if c not in ('rollup', 'group')]
+    long_table[columns].to_csv(path, index=False)
+
+def print_rollups(tables, out=sys.stdout):
+    """Roll-up tables as text"""
+    for name, table in tables.items():
+        print(f"\nBy {name.replace('_', ' ')}", file=out)
+        print(table.to_string(index=False, float_format=lambda v: f"{v:,.2f}"), file=out)
+
+def build_parser():
+    """Command-line options"""
+    parser = argparse.ArgumentParser(description="Price a customer book in parallel and roll up revenue.")
+    parser.add_argument('input', help="CSV or JSONL book of accounts")
+    parser.add_argument('-o', '--output', help="write roll-ups to a .csv or .json file instead of printing")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help="default: from file extension")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count; 1 = no pool)")
+    parser.add_argument('--chunk-size', type=int, default=20000, help="accounts per work item (default: 20000)")
+    add_default_options(parser)
+    parser.add_argument('--progress', action='store_true', help="report progress on stderr")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    load_option_files(args)
+    defaults = default_options(**{name: getattr(args, name) for name in vars(default_options())})
+
+    started = time.perf_counter()
+    progress = None
+    if args.progress:
+        def progress(done):
+            elapsed = time.perf_counter() - started
+            print(f"priced {done:,} accounts ({done / elapsed:,.0f}/s)", file=sys.stderr)
+    try:
+        cube = price_portfolio(args.input, defaults, args.workers, args.chunk_size, args.input_format, progress)
+    except (RecordError, ValueError) as error:
+        parser.exit(1, f"{parser.prog}: error: {error}\n")
+
+    tables = rollups(cube)
+    if args.output:
+        write_rollups(tables, args.output)
+    else:
+        print_rollups(tables)
+
+if __name__ == '__main__':
+    main()
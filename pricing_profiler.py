@@ -0,0 +1,113 @@
+"""Opt-in render timing for the pricing calculator page.
+
+The page marks where each section starts with profiler.section(name) and
+wraps its pricing calls with profiler.timed(name, func). A disabled profiler
+(NULL_PROFILER) makes section() a no-op and timed() return func unchanged, so
+instrumentation costs nothing unless profiling is turned on. No Streamlit
+calls here; the page renders the results.
+"""
+
+import time
+
+# Rerun breakdowns kept per session for the debug panel
+PROFILE_HISTORY = 20
+
+class NullProfiler:
+    """Profiler stand-in used when profiling is off"""
+
+    enabled = False
+
+    def section(self, name):
+        pass
+
+    def timed(self, name, func):
+        return func
+
+class RerunProfiler:
+    """Wall-clock time per page section and per pricing call for one rerun"""
+
+    enabled = True
+
+    def __init__(self, use_cprofile=False):
+        self.started = time.perf_counter()
+        self.started_at = time.strftime('%H:%M:%S')
+        self.sections = []
+        self.calls = []
+        self.current = None
+        self.section_started = self.started
+        self.cprofile = None
+        if use_cprofile:
+            import cProfile
+
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def section(self, name):
+        """End the running section and start timing the next one"""
+        now = time.perf_counter()
+        if self.current is not None:
+            self.sections.append((self.current, now - self.section_started))
+        self.current = name
+        self.section_started = now
+
+    def timed(self, name, func):
+        """func wrapped to record its duration under the running section"""
+        def timed_call(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.calls.append((self.current, name, time.perf_counter() - started))
+        return timed_call
+
+    def finish(self):
+        """Close the last section and return the rerun record"""
+        self.section(None)
+        record = {
+            'started_at': self.started_at,
+            'total_s': time.perf_counter() - self.started,
+            'sections': self.sections,
+            'calls': self.calls,
+            'cprofile': None,
+        }
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            record['cprofile'] = {'report': cprofile_report(self.cprofile), 'dump': cprofile_dump(self.cprofile)}
+        return record
+
+NULL_PROFILER = NullProfiler()
+
+def cprofile_report(profile, limit=30, sort='cumulative'):
+    """Top functions of a cProfile.Profile as pstats text"""
+    import io
+    import pstats
+
+    output = io.StringIO()
+    pstats.Stats(profile, stream=output).strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+def cprofile_dump(profile):
+    """A cProfile.Profile as .prof file bytes, readable with pstats / snakeviz"""
+    import marshal
+    import pstats
+
+    return marshal.dumps(pstats.Stats(profile).stats)
+
+def history_table(history):
+    """Section milliseconds per rerun, newest first, as DataFrame-ready columns"""
+    names = []
+    for record in history:
+        for name, _ in record['sections']:
+            if name not in names:
+                names.append(name)
+
+    table = {'Rerun': [], 'Total (ms)': []}
+    for name in names:
+        table[name] = []
+    for record in reversed(history):
+        table['Rerun'].append(record['started_at'])
+        table['Total (ms)'].append(round(record['total_s'] * 1000, 1))
+        durations = dict(record['sections'])
+        for name in names:
+            table[name].append(round(durations[name] * 1000, 1) if name in durations else None)
+    return table
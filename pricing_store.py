@@ -0,0 +1,206 @@
+"""Persistent scenario store for saved quotes (SQLite, standard library only).
+
+Pricing inputs and the deployment model are keyed by a content hash of
+their canonical JSON, so the same scenario is stored once however many
+quotes use it:
+
+    results   hash -> deployment model, inputs and computed CostTable columns
+    quotes    one row per saved quote (customer, deployment model, saved
+              time, headline numbers) pointing at a results hash
+
+Quote listings read only the quotes table through its indexes, so filtering
+thousands of saved quotes never loads their results. Each call opens its own
+connection, which keeps the store safe to share between Streamlit sessions.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+from pricing_engine import CostTable
+
+# Next to the code rather than the working directory, so it doesn't depend on where the app was started
+DEFAULT_STORE_PATH = os.environ.get(
+    'PRICING_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'pricing_scenarios.db')
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    hash TEXT PRIMARY KEY,
+    inputs TEXT NOT NULL,
+    results TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY,
+    customer TEXT NOT NULL,
+    customer_key TEXT NOT NULL,
+    deployment_model TEXT NOT NULL,
+    saved_at REAL NOT NULL,
+    hash TEXT NOT NULL REFERENCES results(hash),
+    annual_queries REAL,
+    years INTEGER,
+    total_cost REAL,
+    UNIQUE (customer_key, hash)
+);
+CREATE INDEX IF NOT EXISTS quotes_by_customer ON quotes (customer_key, saved_at);
+CREATE INDEX IF NOT EXISTS quotes_by_model ON quotes (deployment_model, saved_at);
+CREATE INDEX IF NOT EXISTS quotes_by_saved ON quotes (saved_at);
+CREATE INDEX IF NOT EXISTS quotes_by_hash ON quotes (hash);
+"""
+
+# Columns returned by list_quotes (results are loaded separately)
+QUOTE_FIELDS = ['id', 'customer', 'deployment_model', 'saved_at', 'hash', 'annual_queries', 'years', 'total_cost']
+
+def _canonical(value):
+    """JSON-ready copy of value with whole floats as ints, so 150000 and 150000.0 hash alike"""
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def content_hash(inputs):
+    """SHA-256 of the canonical JSON of an input set"""
+    text = json.dumps(_canonical(inputs), sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def quote_hash(deployment_model, inputs):
+    """Content hash of a quoted scenario (the deployment model and its pricing inputs)"""
+    return content_hash({'deployment_model': deployment_model, 'inputs': inputs})
+
+def _encode_costs(costs):
+    """CostTable as JSON text (columns, plus integer cents when present)"""
+    columns = {name: [value.item() if hasattr(value, 'item') else value for value in column]
+               for name, column in costs.columns().items()}
+    cents = None if costs.cents is None else {key: [int(v) for v in column] for key, column in costs.cents.items()}
+    return json.dumps({'columns': columns, 'cents': cents}, separators=(',', ':'))
+
+def _decode_costs(text):
+    """Inverse of _encode_costs"""
+    data = json.loads(text)
+    return CostTable(**data['columns'], cents=data['cents'])
+
+class ScenarioStore:
+    """Saved pricing scenarios and quotes in one SQLite file"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA foreign_keys=ON')
+        return connection
+
+    def _put_results(self, connection, deployment_model, inputs, costs):
+        """Store the results of a scenario (kept as-is if already stored); returns its hash"""
+        key = quote_hash(deployment_model, inputs)
+        scenario = {'deployment_model': deployment_model, 'inputs': inputs}
+        connection.execute(
+            'INSERT OR IGNORE INTO results (hash, inputs, results, created_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(_canonical(scenario), sort_keys=True), _encode_costs(costs), time.time())
+        )
+        return key
+
+    def save_quote(self, customer, deployment_model, inputs, costs):
+        """Save a quote for customer; saving the same inputs again only refreshes its time.
+
+        Returns the quote id.
+        """
+        customer = customer.strip()
+        if not customer:
+            raise ValueError("customer name is required")
+        with closing(self._connect()) as connection, connection:
+            key = self._put_results(connection, deployment_model, inputs, costs)
+            connection.execute(
+                """INSERT INTO quotes (customer, customer_key, deployment_model, saved_at, hash,
+                                       annual_queries, years, total_cost)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (customer_key, hash) DO UPDATE SET saved_at = excluded.saved_at,
+                                                                 customer = excluded.customer,
+                                                                 deployment_model = excluded.deployment_model""",
+                (customer, customer.casefold(), deployment_model, time.time(), key,
+                 float(costs.queries[0]) if len(costs) else None, len(costs), costs.total('total_cost'))
+            )
+            return connection.execute('SELECT id FROM quotes WHERE customer_key = ? AND hash = ?',
+                                      (customer.casefold(), key)).fetchone()[0]
+
+    def _where(self, customer=None, deployment_model=None, since=None, until=None, inputs_hash=None):
+        """SQL WHERE clause and parameters for the quote filters"""
+        clauses, params = [], []
+        if customer:
+            # Case-insensitive prefix match as a range, so it uses quotes_by_customer
+            prefix = customer.strip().casefold()
+            clauses.append('customer_key >= ? AND customer_key < ?')
+            params += [prefix, prefix + '\U0010ffff']
+        if deployment_model:
+            clauses.append('deployment_model = ?')
+            params.append(deployment_model)
+        if since is not None:
+            clauses.append('saved_at >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('saved_at < ?')
+            params.append(until)
+        if inputs_hash:
+            clauses.append('hash = ?')
+            params.append(inputs_hash)
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def list_quotes(self, limit=50, offset=0, **filters):
+        """Saved quotes, newest first, without their results.
+
+        Filters: customer (case-insensitive prefix), deployment_model, since
+        and until (Unix times), inputs_hash. Returns a list of QUOTE_FIELDS dicts.
+        """
+        where, params = self._where(**filters)
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"SELECT {', '.join(QUOTE_FIELDS)} FROM quotes{where} ORDER BY saved_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset]
+            ).fetchall()
+        return [dict(zip(QUOTE_FIELDS, row)) for row in rows]
+
+    def count_quotes(self, **filters):
+        """Number of saved quotes matching the list_quotes filters"""
+        where, params = self._where(**filters)
+        with closing(self._connect()) as connection:
+            return connection.execute(f'SELECT COUNT(*) FROM quotes{where}', params).fetchone()[0]
+
+    def load_quote(self, quote_id):
+        """A saved quote with its 'inputs' and 'costs' (CostTable), or None"""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                f"SELECT {', '.join('q.' + f for f in QUOTE_FIELDS)}, r.inputs, r.results "
+                "FROM quotes q JOIN results r ON r.hash = q.hash WHERE q.id = ?",
+                (quote_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        quote = dict(zip(QUOTE_FIELDS, row))
+        quote['inputs'] = json.loads(row[-2])['inputs']
+        quote['costs'] = _decode_costs(row[-1])
+        return quote
+
+    def delete_quote(self, quote_id):
+        """Delete a quote, and its results once no other quote uses them"""
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute('SELECT hash FROM quotes WHERE id = ?', (quote_id,)).fetchone()
+            if row is None:
+                return False
+            connection.execute('DELETE FROM quotes WHERE id = ?', (quote_id,))
+            connection.execute('DELETE FROM results WHERE hash = ? AND NOT EXISTS '
+                               '(SELECT 1 FROM quotes WHERE hash = ?)', (row[0], row[0]))
+            return True
@@ -0,0 +1,370 @@
+"""Actual usage from production query logs, for forecast-vs-actual burn-down.
+
+Query logs have one line per query with an ISO 8601 timestamp and the
+deployment it ran on, and optionally the credits billed for it. They are read
+as a stream of record batches (CSV through pyarrow, JSONL through pandas
+chunks; .gz / .bz2 are decompressed on the fly) and reduced to query and
+credit counts per month and deployment, so a multi-GB log never has to fit
+in memory:
+
+    python pricing_usage.py queries.csv.gz
+
+Like pricing_engine, this module has no UI dependencies and imports its
+heavy dependencies lazily.
+"""
+
+import argparse
+import os
+import sys
+
+from pricing_engine import DEPLOYMENT_MODELS
+
+# Log column names
+TIMESTAMP_COLUMN = 'timestamp'
+DEPLOYMENT_COLUMN = 'deployment'
+CREDITS_COLUMN = 'credits'
+
+# Bytes per CSV record batch, and lines per JSONL chunk
+CSV_BLOCK_SIZE = 64 << 20
+JSONL_CHUNK_LINES = 500000
+
+# Month prefix ('YYYY-MM') of a usable timestamp
+MONTH_PATTERN = r'^\d{4}-(0[1-9]|1[0-2])$'
+
+# Months of recent actuals averaged into the burn rate
+BURN_RATE_MONTHS = 3
+
+# Server directory whose query logs the app may read; unset, the app only takes uploads
+USAGE_LOG_DIR = os.environ.get('PRICING_USAGE_LOG_DIR')
+
+# File names listed from USAGE_LOG_DIR
+USAGE_LOG_SUFFIXES = ('.csv', '.jsonl', '.ndjson', '.json', '.gz', '.bz2')
+
+def _month_index(month):
+    """'YYYY-MM' as a month count, so month arithmetic is integer arithmetic"""
+    year, number = month.split('-')
+    return int(year) * 12 + int(number) - 1
+
+def _month_label(index):
+    """Inverse of _month_index"""
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def log_format(name):
+    """'csv' or 'jsonl' from a log file name, ignoring a compression suffix"""
+    for suffix in ('.gz', '.bz2'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return 'jsonl' if name.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+def _open_csv(source, block_size, columns):
+    """Streaming pyarrow CSV reader over source for the given columns"""
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    stream = pa.input_stream(source) if isinstance(source, str) else source
+    return pa_csv.open_csv(
+        stream,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=columns,
+            column_types={TIMESTAMP_COLUMN: pa.string(), DEPLOYMENT_COLUMN: pa.string(), CREDITS_COLUMN: pa.float64()},
+        ),
+    )
+
+def _csv_batches(source, block_size):
+    """(month, deployment, credits) pyarrow arrays per CSV record batch"""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    try:
+        reader = _open_csv(source, block_size, [TIMESTAMP_COLUMN, DEPLOYMENT_COLUMN, CREDITS_COLUMN])
+        has_credits = True
+    except (pa.ArrowInvalid, pa.ArrowKeyError) as error:
+        if CREDITS_COLUMN not in str(error):
+            raise ValueError(str(error))
+        # The credits column is optional: reopen without it
+        if not isinstance(source, str):
+            source.seek(0)
+        try:
+            reader = _open_csv(source, block_size, [TIMESTAMP_COLUMN, DEPLOYMENT_COLUMN])
+        except (pa.ArrowInvalid, pa.ArrowKeyError) as error:
+            raise ValueError(str(error))
+        has_credits = False
+
+    for batch in reader:
+        month = pc.utf8_slice_codeunits(batch.column(TIMESTAMP_COLUMN), 0, 7)
+        if has_credits:
+            credits = batch.column(CREDITS_COLUMN)
+        else:
+            credits = pa.nulls(len(batch), type=pa.float64())
+        yield month, batch.column(DEPLOYMENT_COLUMN), credits
+
+def _jsonl_batches(source, chunk_lines):
+    """(month, deployment, credits) pyarrow arrays per JSONL chunk"""
+    import pandas as pd
+    import pyarrow as pa
+
+    with pd.read_json(source, lines=True, chunksize=chunk_lines, dtype=False, convert_dates=False) as reader:
+        for chunk in reader:
+            month = chunk[TIMESTAMP_COLUMN].astype('string').str.slice(0, 7)
+            credits = chunk[CREDITS_COLUMN] if CREDITS_COLUMN in chunk else pd.Series(None, index=chunk.index, dtype='float64')
+            yield (pa.array(month, type=pa.string()),
+                   pa.array(chunk[DEPLOYMENT_COLUMN].astype('string'), type=pa.string()),
+                   pa.array(pd.to_numeric(credits, errors='coerce'), type=pa.float64(), from_pandas=True))
+
+def aggregate_usage_log(source, fmt=None, progress=None):
+    """Query and credit counts per month and deployment from a query log.
+
+    source is a path or a binary file object; fmt is 'csv' or 'jsonl'
+    (default: from the file name). Lines without a usable timestamp (empty,
+    or not starting with YYYY-MM) are skipped. Returns 'month' (sorted
+    'YYYY-MM' labels, gaps filled), 'deployments', 'queries' and 'credits'
+    (deployment -> per-month array; 'credits' only counts lines that carry a
+    credits value), 'credited_queries' (the queries those credits cover),
+    'lines' and 'skipped' (lines without a usable timestamp). progress(lines)
+    is called after each batch.
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    if fmt is None:
+        fmt = log_format(source if isinstance(source, str) else getattr(source, 'name', ''))
+    if fmt == 'jsonl':
+        batches = _jsonl_batches(source, JSONL_CHUNK_LINES)
+    else:
+        batches = _csv_batches(source, CSV_BLOCK_SIZE)
+
+    # (month, deployment) -> [queries, credits, credited queries]; a handful of keys per batch
+    totals = {}
+    lines = skipped = 0
+    for month, deployment, credits in batches:
+        lines += len(month)
+        usable = pc.fill_null(pc.match_substring_regex(month, MONTH_PATTERN), False)
+        skipped += len(month) - (pc.sum(usable).as_py() or 0)
+        table = pa.table({
+            'month': month,
+            'deployment': deployment,
+            'credits': credits,
+            'credited': credits.is_valid(),
+        }).filter(usable)
+        grouped = table.group_by(['month', 'deployment']).aggregate([
+            ('month', 'count'), ('credits', 'sum'), ('credited', 'sum'),
+        ]).to_pydict()
+        for key in zip(grouped['month'], grouped['deployment'], grouped['month_count'],
+                       grouped['credits_sum'], grouped['credited_sum']):
+            entry = totals.setdefault(key[:2], [0, 0.0, 0])
+            entry[0] += key[2]
+            entry[1] += key[3] or 0.0
+            entry[2] += key[4] or 0
+        if progress:
+            progress(lines)
+
+    if not totals:
+        return {'month': [], 'deployments': [], 'queries': {}, 'credits': {}, 'credited_queries': {},
+                'lines': lines, 'skipped': skipped}
+
+    indices = {month: _month_index(month) for month, _ in totals}
+    first, last = min(indices.values()), max(indices.values())
+    deployments = sorted({deployment or '' for _, deployment in totals})
+    usage = {
+        'month': [_month_label(index) for index in range(first, last + 1)],
+        'deployments': deployments,
+        'queries': {d: np.zeros(last - first + 1, dtype=np.int64) for d in deployments},
+        'credits': {d: np.zeros(last - first + 1) for d in deployments},
+        'credited_queries': {d: np.zeros(last - first + 1, dtype=np.int64) for d in deployments},
+        'lines': lines,
+        'skipped': skipped,
+    }
+    for (month, deployment), (queries, credits, credited) in totals.items():
+        position = indices[month] - first
+        usage['queries'][deployment or ''][position] += queries
+        usage['credits'][deployment or ''][position] += credits
+        usage['credited_queries'][deployment or ''][position] += credited
+    return usage
+
+def usage_log_path(name, directory=USAGE_LOG_DIR):
+    """Real path of log name in directory; ValueError if it resolves outside it (.., symlinks)"""
+    if not directory:
+        raise ValueError("no query log directory is configured")
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or path == root:
+        raise ValueError(f"{name} is not in the query log directory")
+    return path
+
+def list_usage_logs(directory=USAGE_LOG_DIR):
+    """Names of the query log files in directory, sorted; none if it is unset or missing"""
+    if not directory or not os.path.isdir(directory):
+        return []
+    names = []
+    for entry in os.scandir(directory):
+        if entry.name.endswith(USAGE_LOG_SUFFIXES) and entry.is_file():
+            try:
+                usage_log_path(entry.name, directory)
+            except ValueError:
+                continue  # a symlink out of the directory
+            names.append(entry.name)
+    return sorted(names)
+
+def aggregate_usage_file(path, modified=None):
+    """aggregate_usage_log of a file on disk.
+
+    modified is not used here: callers that memoize pass the file's
+    modification time so a grown log is read again.
+    """
+    return aggregate_usage_log(path)
+
+def aggregate_usage_bytes(data, name):
+    """aggregate_usage_log of an in-memory log (e.g. an upload), decompressed by file name"""
+    import bz2
+    import gzip
+    import io
+
+    stream = io.BytesIO(data)
+    if name.endswith('.gz'):
+        stream = gzip.GzipFile(fileobj=stream)
+    elif name.endswith('.bz2'):
+        stream = bz2.BZ2File(stream)
+    return aggregate_usage_log(stream, log_format(name))
+
+def fitted_queries_per_credit(usage):
+    """Observed queries per credit for each deployment whose log lines carry credits.
+
+    One row per deployment with the billed queries and credits, the fitted
+    ratio (billed queries / credits; None without credits) and the
+    configured DEPLOYMENT_MODELS ratio (None for unknown deployments).
+    """
+    rows = []
+    for deployment in usage['deployments']:
+        credited = int(usage['credited_queries'][deployment].sum())
+        credits = float(usage['credits'][deployment].sum())
+        configured = DEPLOYMENT_MODELS.get(deployment, {}).get('queries_per_credit')
+        rows.append({
+            'deployment': deployment,
+            'queries': int(usage['queries'][deployment].sum()),
+            'credited_queries': credited,
+            'credits': credits,
+            'fitted': credited / credits if credited and credits > 0 else None,
+            'configured': configured,
+        })
+    return rows
+
+def actual_credits(usage, queries_per_credit=None):
+    """Credits burned per month, from query counts and each deployment's ratio.
+
+    queries_per_credit maps deployment -> ratio and defaults to
+    DEPLOYMENT_MODELS. Returns (credits per month, queries per month,
+    deployments left out because they have no ratio).
+    """
+    import numpy as np
+
+    ratios = {name: model['queries_per_credit'] for name, model in DEPLOYMENT_MODELS.items()}
+    ratios.update(queries_per_credit or {})
+    credits = np.zeros(len(usage['month']))
+    queries = np.zeros(len(usage['month']), dtype=np.int64)
+    unmatched = []
+    for deployment in usage['deployments']:
+        if not ratios.get(deployment):
+            unmatched.append(deployment)
+            continue
+        credits += usage['queries'][deployment] / ratios[deployment]
+        queries += usage['queries'][deployment]
+    return credits, queries, unmatched
+
+def burn_down(costs, usage, start_month=None, balance=None, queries_per_credit=None,
+              burn_rate_months=BURN_RATE_MONTHS):
+    """Projected vs actual credit balance per month, with the projected exhaustion month.
+
+    costs is the calculate_costs projection (its yearly credits are spread
+    evenly over each year's months) starting at start_month ('YYYY-MM',
+    default: the first month of the log). balance is the credits available
+    at the start (default: every projected credit). The actual balance
+    runs through the last logged month; from there the average burn of the
+    last burn_rate_months months is extrapolated to find when the balance
+    reaches zero. Returns 'month', 'projected_balance', 'actual_balance'
+    (NaN after the last actual month), 'projected_credits' and
+    'actual_credits' per month, 'burn_rate', 'exhaustion_month' and
+    'exhaustion_offset' (months from start_month, fractional; None when the
+    balance is not being burned down), 'unmatched' deployments.
+    """
+    import numpy as np
+
+    credits, _, unmatched = actual_credits(usage, queries_per_credit)
+    if start_month is None:
+        start_month = usage['month'][0] if usage['month'] else None
+    if start_month is None:
+        raise ValueError("no usage in the log and no start month")
+    start = _month_index(start_month)
+
+    horizon = 12 * len(costs)
+    projected = np.repeat(np.asarray(costs.credits_needed, dtype=np.float64) / 12, 12)
+    if balance is None:
+        balance = float(projected.sum())
+
+    # Actual months inside the projection window
+    actual = np.full(horizon, np.nan)
+    if usage['month']:
+        offset = _month_index(usage['month'][0]) - start
+        for position in range(len(credits)):
+            if 0 <= offset + position < horizon:
+                actual[offset + position] = credits[position]
+    observed = np.flatnonzero(~np.isnan(actual))
+    last_actual = int(observed[-1]) if observed.size else -1
+    actual_to_date = np.nan_to_num(actual[:last_actual + 1])
+
+    actual_balance = np.full(horizon, np.nan)
+    actual_balance[:last_actual + 1] = balance - np.cumsum(actual_to_date)
+
+    recent = actual_to_date[max(0, last_actual + 1 - burn_rate_months):]
+    burn_rate = float(recent.mean()) if recent.size else 0.0
+    remaining = balance - float(actual_to_date.sum())
+    if remaining <= 0:
+        # Already exhausted: find the month the cumulative burn crossed the balance
+        crossed = int(np.argmax(np.cumsum(actual_to_date) >= balance))
+        exhaustion_offset = float(crossed + 1)
+    elif burn_rate > 0:
+        exhaustion_offset = last_actual + 1 + remaining / burn_rate
+    else:
+        exhaustion_offset = None
+
+    return {
+        'month': [_month_label(start + i) for i in range(horizon)],
+        'projected_credits': projected,
+        'actual_credits': actual,
+        'projected_balance': balance - np.cumsum(projected),
+        'actual_balance': actual_balance,
+        'balance': balance,
+        'burn_rate': burn_rate,
+        'exhaustion_offset': exhaustion_offset,
+        'exhaustion_month': None if exhaustion_offset is None else _month_label(start + int(exhaustion_offset)),
+        'unmatched': unmatched,
+    }
+
+def build_parser():
+    """Command-line options"""
+    parser = argparse.ArgumentParser(description="Summarize a query log by month and deployment.")
+    parser.add_argument('input', help="CSV or JSONL query log (optionally .gz / .bz2)")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="default: from file extension")
+    parser.add_argument('--progress', action='store_true', help="report progress on stderr")
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    progress = (lambda lines: print(f"read {lines:,} lines", file=sys.stderr)) if args.progress else None
+    try:
+        usage = aggregate_usage_log(args.input, args.format, progress)
+    except (OSError, ValueError, KeyError) as error:
+        parser.exit(1, f"{parser.prog}: error: {error}\n")
+
+    print(f"{usage['lines']:,} lines ({usage['skipped']:,} without a usable timestamp), {len(usage['month'])} months")
+    print('month    ' + ''.join(f"{d:>16}" for d in usage['deployments']))
+    for i, month in enumerate(usage['month']):
+        print(f"{month}  " + ''.join(f"{int(usage['queries'][d][i]):>16,}" for d in usage['deployments']))
+    for row in fitted_queries_per_credit(usage):
+        fitted = f"{row['fitted']:,.1f} queries/credit" if row['fitted'] else "n/a (no credits in log)"
+        print(f"{row['deployment']}: fitted {fitted}, configured {row['configured'] or 'n/a'}")
+
+if __name__ == '__main__':
+    main()
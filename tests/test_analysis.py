@@ -0,0 +1,150 @@
+"""Scenario analysis (pricing_analysis)"""
+import numpy as np
+import pytest
+
+from pricing_analysis import (COMMITMENT_TERMS, _goal_metric, break_even_annual_year, break_even_table,
+                              break_even_tco_year, break_even_volume, goal_seek, optimize_commitment, projection_totals,
+                              sensitivity_parameters, simulate_costs, tornado_analysis, validate_commitment_terms)
+from pricing_engine import calculate_costs, calculate_costs_batch, calculate_costs_cents, tiered_consumption_cost_batch
+
+ALL_UNITS = {'mode': 'all_units', 'tiers': [{'up_to': 500, 'credit_cost': 6}, {'up_to': 2000, 'credit_cost': 4},
+                                            {'up_to': None, 'credit_cost': 3}]}
+
+@pytest.mark.parametrize('metric', ['total_cost', 'tco', 'cost_per_query'])
+def test_goal_seek_all_units_matches_scan(metric):
+    # All-units cost drops at each tier limit, so bisecting the whole range can land on the wrong side
+    volumes = np.arange(1, 400001, dtype=float)
+    scan = _goal_metric(metric, calculate_costs_batch(volumes, 10000, 0.0, 100, 3, 0.3, credit_schedule=ALL_UNITS))
+    targets = np.quantile(scan, [0.2, 0.5, 0.9] if metric == 'cost_per_query' else [0.1, 0.3, 0.5, 0.7])
+
+    solved = goal_seek(targets, metric, 'annual_queries', platform_fee=10000, queries_per_credit=100, years=3,
+                       growth_rate=0.3, credit_schedule=ALL_UNITS)
+
+    for target, volume in zip(targets, solved):
+        within = volumes[scan <= target]
+        expected = within.min() if metric == 'cost_per_query' else within.max()
+        assert volume == pytest.approx(expected, abs=1)
+
+def test_goal_seek_closed_form_matches_engine():
+    solved = goal_seek([250000, 300000], 'total_cost', 'annual_queries',
+                       platform_fee=150000, credit_cost=5, queries_per_credit=400)
+    np.testing.assert_allclose(solved, [8000000, 12000000])
+
+def test_goal_seek_unreachable_target_is_nan():
+    assert np.isnan(goal_seek([100.0], 'total_cost', 'annual_queries', platform_fee=10000,
+                              queries_per_credit=100, credit_schedule=ALL_UNITS)).all()
+
+SENSITIVITY_INPUTS = {'platform_fee': 150000, 'credit_cost': 5, 'queries_per_credit': 400,
+                      'annual_queries': 2000000, 'growth_rate': 0.15}
+
+@pytest.mark.parametrize('pricing', [{'credit_schedule': ALL_UNITS},
+                                     {'growth_curve': {'type': 'logistic', 'saturation': 3}},
+                                     {'credit_schedule': ALL_UNITS, 'growth_curve': {'type': 'custom', 'factors': [1, 2, 2.5]}}])
+def test_projection_totals_match_engine(pricing):
+    tco, queries = projection_totals(years=3, **SENSITIVITY_INPUTS, **pricing)
+    costs = calculate_costs(2000000, 150000, 5, 400, 3, 0.15, **pricing)
+    assert tco == pytest.approx(costs.total('total_cost'))
+    assert queries == pytest.approx(costs.total('queries'))
+
+def test_projection_totals_exact_cents_match_engine():
+    tco, _ = projection_totals(years=3, credit_schedule=ALL_UNITS, credit_rounding='up', **SENSITIVITY_INPUTS)
+    costs = calculate_costs_cents(2000000, 150000, 5, 400, 3, 0.15, credit_schedule=ALL_UNITS, credit_rounding='up')
+    assert tco == costs.total('total_cost')
+
+def test_tornado_skips_inputs_the_pricing_ignores():
+    custom = {'type': 'custom', 'factors': [1, 2, 2.5]}
+    assert set(sensitivity_parameters(ALL_UNITS, custom)) == {'platform_fee', 'queries_per_credit', 'annual_queries'}
+    bars = tornado_analysis(SENSITIVITY_INPUTS, 3, 0.2, credit_schedule=ALL_UNITS, growth_curve=custom)
+    assert {bar['parameter'] for bar in bars} == set(sensitivity_parameters(ALL_UNITS, custom))
+
+@pytest.mark.parametrize('pricing', [{'credit_schedule': ALL_UNITS},
+                                     {'growth_curve': {'type': 'logistic', 'saturation': 3}},
+                                     {'credit_schedule': ALL_UNITS, 'growth_curve': {'type': 'custom', 'factors': [1, 2, 2.5]}}])
+def test_simulation_without_uncertainty_matches_engine(pricing):
+    simulation = simulate_costs(200000, 150000, 5, 400, 3, 0.15, trials=10, volume_spread=0, growth_spread=0,
+                                seed=0, **pricing)
+    costs = calculate_costs(200000, 150000, 5, 400, 3, 0.15, **pricing)
+    np.testing.assert_allclose(simulation['total_cost'][1], costs.to_frame()['total_cost'])
+    assert simulation['tco'][1][-1] == pytest.approx(costs.total('total_cost'))
+
+def test_simulation_exact_cents_matches_engine():
+    simulation = simulate_costs(200000, 150000, 5, 400, 3, 0.15, trials=10, volume_spread=0, growth_spread=0,
+                                seed=0, credit_schedule=ALL_UNITS, credit_rounding='up')
+    costs = calculate_costs_cents(200000, 150000, 5, 400, 3, 0.15, credit_schedule=ALL_UNITS, credit_rounding='up')
+    assert simulation['tco'][1][-1] == costs.total('total_cost')
+
+def test_simulation_scatters_around_growth_curve():
+    curve = {'type': 'custom', 'factors': [1, 2, 2.5]}
+    simulation = simulate_costs(200000, 0, 1, 1, 3, 0.15, trials=100000, volume_spread=0, growth_spread=0.05,
+                                seed=0, growth_curve=curve)
+    np.testing.assert_allclose(simulation['total_cost'][1], [200000, 400000, 500000], rtol=0.01)
+
+MODEL_A = {'platform_fee': 300000, 'credit_cost': 5, 'queries_per_credit': 400}
+MODEL_B = {'platform_fee': 100000, 'credit_cost': 5, 'queries_per_credit': 250}
+
+def projection_tco(model, volume, **pricing):
+    return calculate_costs(volume, model['platform_fee'], model['credit_cost'], model['queries_per_credit'], 3, 0.15,
+                           **pricing).total('total_cost')
+
+@pytest.mark.parametrize('pricing', [{'credit_schedule': ALL_UNITS},
+                                     {'growth_curve': {'type': 'logistic', 'saturation': 3}},
+                                     {'credit_schedule': ALL_UNITS, 'growth_curve': {'type': 'custom', 'factors': [1, 2, 2.5]}}])
+def test_break_even_volume_matches_engine(pricing):
+    volume = float(break_even_volume(MODEL_A, MODEL_B, 3, 0.15, **pricing))
+    below, above = volume * (1 - 1e-6), volume * (1 + 1e-6)
+    assert projection_tco(MODEL_A, below, **pricing) > projection_tco(MODEL_B, below, **pricing)
+    assert projection_tco(MODEL_A, above, **pricing) < projection_tco(MODEL_B, above, **pricing)
+
+def test_break_even_single_tier_matches_closed_form():
+    single_tier = {'mode': 'graduated', 'tiers': [{'up_to': None, 'credit_cost': 5}]}
+    compound = {'type': 'compound'}
+    assert float(break_even_volume(MODEL_A, MODEL_B, 3, 0.15, credit_schedule=single_tier)) == \
+        pytest.approx(float(break_even_volume(MODEL_A, MODEL_B, 3, 0.15)))
+    assert float(break_even_annual_year(MODEL_A, MODEL_B, 10000000, 0.15, growth_curve=compound)) == \
+        pytest.approx(float(break_even_annual_year(MODEL_A, MODEL_B, 10000000, 0.15)))
+
+def test_break_even_tco_year_falls_in_the_year_tco_crosses():
+    tco_year = float(break_even_tco_year(MODEL_A, MODEL_B, 25000000, 0.15, credit_schedule=ALL_UNITS))
+    gaps = [calculate_costs(25000000, model['platform_fee'], 5, model['queries_per_credit'], years, 0.15,
+                            credit_schedule=ALL_UNITS).total('total_cost') for years in (int(tco_year), int(tco_year) + 1)
+            for model in (MODEL_A, MODEL_B)]
+    assert (gaps[0] - gaps[1]) * (gaps[2] - gaps[3]) < 0
+
+def test_break_even_table_under_schedule_has_no_shared_price():
+    rows = break_even_table({'A': MODEL_A, 'B': MODEL_B}, 2000000, 3, 0.15, credit_schedule=ALL_UNITS)
+    assert np.isnan(rows[0]['credit_cost'])
+    assert rows[0]['volume'] == pytest.approx(float(break_even_volume(MODEL_A, MODEL_B, 3, 0.15, credit_schedule=ALL_UNITS)))
+
+USAGE = np.array([[1800.0, 2100.0, 2500.0], [900.0, 1200.0, 1600.0], [2600.0, 3000.0, 3300.0]])
+
+def test_commitment_single_tier_schedule_matches_flat():
+    single_tier = {'mode': 'graduated', 'tiers': [{'up_to': None, 'credit_cost': 5}]}
+    flat = optimize_commitment(USAGE, 5, 1000)
+    tiered = optimize_commitment(USAGE, 5, 1000, credit_schedule=single_tier)
+    assert tiered['payg']['expected_cost'] == pytest.approx(flat['payg']['expected_cost'])
+    assert [option['terms'] for option in tiered['options']] == [option['terms'] for option in flat['options']]
+    assert tiered['best']['expected_cost'] == pytest.approx(flat['best']['expected_cost'])
+
+def test_commitment_payg_uses_credit_schedule():
+    result = optimize_commitment(USAGE, 5, 1000, credit_schedule=ALL_UNITS)
+    payg = 3 * 1000 + tiered_consumption_cost_batch(USAGE, ALL_UNITS).sum(axis=1)
+    assert result['payg']['expected_cost'] == pytest.approx(payg.mean())
+    assert result['best']['expected_cost'] <= result['payg']['expected_cost']
+
+def test_commitment_uses_given_terms():
+    terms = {'Flex': {'discounts': [(0, 0.1)], 'overage_premium': 0.0, 'rollover': 1.0}}
+    result = optimize_commitment(USAGE, 5, terms=terms)
+    assert [option['terms'] for option in result['options']] == ['Flex']
+
+@pytest.mark.parametrize('terms', [
+    {},
+    {'': COMMITMENT_TERMS[next(iter(COMMITMENT_TERMS))]},
+    {'A': {'discounts': [], 'overage_premium': 0.1, 'rollover': 0}},
+    {'A': {'discounts': [(0, 1.0)], 'overage_premium': 0.1, 'rollover': 0}},
+    {'A': {'discounts': [(0, 0.1)], 'overage_premium': -0.1, 'rollover': 0}},
+    {'A': {'discounts': [(0, 0.1)], 'overage_premium': 0.1, 'rollover': 1.5}},
+])
+def test_validate_commitment_terms_rejects_bad_contracts(terms):
+    with pytest.raises(ValueError):
+        validate_commitment_terms(terms)
+    validate_commitment_terms(COMMITMENT_TERMS)
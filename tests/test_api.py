@@ -0,0 +1,72 @@
+"""Pricing API (pricing_api)"""
+import asyncio
+import json
+
+import pytest
+
+from pricing_api import PricingServer, RequestError, price_batch, price_scenario, resolve_scenario, seek_goal
+
+SCENARIO = {'annual_queries': 200000, 'deployment_model': 'Customer VPC', 'years': 3, 'growth_rate': 0.15}
+
+def test_batch_matches_single():
+    scenarios = [SCENARIO, dict(SCENARIO, growth_curve={'type': 'linear'}), dict(SCENARIO, size_template='Large',
+                                                                                 annual_queries=None, years=5)]
+    batch = price_batch({'scenarios': scenarios})['results']
+    assert batch == [price_scenario(scenario) for scenario in scenarios]
+
+@pytest.mark.parametrize('payload', [
+    {},
+    dict(SCENARIO, annual_queries=-1),
+    dict(SCENARIO, years=2.5),
+    dict(SCENARIO, deployment_model='Mainframe'),
+    dict(SCENARIO, platform_fee='lots'),
+    dict(SCENARIO, credit_schedule={'mode': 'graduated'}),
+    dict(SCENARIO, growth_curve={'type': 'custom'}),
+])
+def test_invalid_scenarios_are_rejected(payload):
+    with pytest.raises(RequestError) as error:
+        resolve_scenario(payload)
+    assert error.value.status == 400
+
+def test_goal_seek_round_trips():
+    # The solved volume prices back to the target
+    solved = seek_goal(dict(SCENARIO, target=300000, metric='total_cost', solve_for='annual_queries'))
+    volume = solved['solutions'][0]
+    year1 = price_scenario(dict(SCENARIO, annual_queries=volume))['costs'][0]
+    assert year1['total_cost'] == pytest.approx(300000)
+
+def test_server_answers_bad_requests():
+    async def exchange(raw):
+        server = PricingServer()
+        listener = await asyncio.start_server(server.serve_connection, '127.0.0.1', 0)
+        async with listener:
+            reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+            writer.write(raw)
+            await writer.drain()
+            status = (await reader.readline()).decode()
+            writer.close()
+            return status.split(' ', 2)[1]
+
+    body = json.dumps(SCENARIO).encode()
+    assert asyncio.run(exchange(b"POST /v1/costs HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)) == '200'
+    assert asyncio.run(exchange(b"POST /v1/costs HTTP/1.1\r\nContent-Length: abc\r\n\r\n")) == '400'
+    assert asyncio.run(exchange(b"POST /v1/costs HTTP/1.1\r\nContent-Length: -5\r\n\r\n")) == '400'
+    assert asyncio.run(exchange(b"POST /v1/nowhere HTTP/1.1\r\nContent-Length: 2\r\n\r\n{}")) == '404'
+    assert asyncio.run(exchange(b"GET /health HTTP/1.1\r\n\r\n")) == '200'
+
+@pytest.mark.parametrize('body, message', [
+    (b'[]', 'must be a JSON object'),
+    (b'1', 'must be a JSON object'),
+    (b'{"annual_queries": NaN}', 'NaN is not a number'),
+    (b'{"annual_queries": 200000, "growth_rate": Infinity}', 'Infinity is not a number'),
+    (b'{"annual_queries": 1e999}', 'out of range'),
+    (b'{"annual_queries": ', 'invalid JSON'),
+])
+def test_server_rejects_bad_bodies(body, message):
+    with pytest.raises(RequestError, match=message) as error:
+        asyncio.run(PricingServer().handle('POST', '/v1/costs', body))
+    assert error.value.status == 400
+
+def test_non_finite_numbers_are_rejected():
+    with pytest.raises(RequestError, match='finite'):
+        resolve_scenario(dict(SCENARIO, platform_fee=float('inf')))
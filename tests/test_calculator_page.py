@@ -0,0 +1,56 @@
+"""Calculator page runs end to end (streamlit.testing)"""
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from pricing_engine import DEPLOYMENT_MODELS
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'consumption_pricing_calculator.py')
+
+def run_goal_seek(solve_for):
+    """Page in Goal Seek mode solving the default Year 1 cost target for solve_for"""
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    [radio for radio in at.sidebar.radio if radio.label == 'How do you want to estimate volume?'][0].set_value('Goal Seek').run()
+    [select for select in at.selectbox if select.label == 'Solve For'][0].set_value(solve_for).run()
+    assert not at.exception
+    return at
+
+@pytest.mark.parametrize('solve_for, key', [('Cost per Credit ($)', 'effective_credit_cost'),
+                                            ('Platform Fee ($)', 'platform_fee')])
+def test_comparison_uses_goal_seek_price(solve_for, key):
+    at = run_goal_seek(solve_for)
+    graph = at.session_state['derived_graph']
+    solved = graph['credit_cost' if key == 'effective_credit_cost' else 'platform_fee']
+    comparison_costs = graph['comparison_summary']['comparison_costs']
+
+    # The selected model's comparison column is the quote itself
+    selected = graph['deployment_model']
+    assert comparison_costs[selected][key] == pytest.approx(solved)
+    assert comparison_costs[selected]['total_cost'] == pytest.approx(graph['year1']['total_cost'])
+    assert comparison_costs[selected]['total_cost'] == pytest.approx(300000)
+    # Models without their own price are priced at the solved one too
+    for name, model in DEPLOYMENT_MODELS.items():
+        if 'credit_cost' not in model and 'platform_fee' not in model:
+            assert comparison_costs[name][key] == pytest.approx(solved)
+
+def test_exact_cents_with_fitted_ratio():
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    model = at.session_state['derived_graph']['deployment_model']
+    at.session_state['fitted_queries_per_credit'] = {model: 398.7}
+    [checkbox for checkbox in at.sidebar.checkbox if checkbox.label == 'Exact cents'][0].check().run()
+    [checkbox for checkbox in at.sidebar.checkbox if checkbox.label.startswith('Use ratio fitted')][0].check().run()
+    assert not at.exception
+    graph = at.session_state['derived_graph']
+    assert graph['queries_per_credit'] == 399
+    assert graph['credit_rounding'] is not None
+
+def test_commitment_optimizer_uses_credit_schedule():
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    [radio for radio in at.sidebar.radio if radio.label == 'Credit Pricing'][0].set_value('All-units Tiers').run()
+    report_view = at.radio(key='report_view')
+    report_view.set_value([option for option in report_view.options if 'Multi-Year' in option][0]).run()
+    [checkbox for checkbox in at.checkbox if checkbox.label.startswith('Find the cheapest')][0].check().run()
+    assert not at.exception
+    assert not at.error
+    assert any('credit price book' in markdown.value for markdown in at.markdown if 'contract types' in markdown.value)
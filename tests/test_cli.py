@@ -0,0 +1,46 @@
+"""Bulk pricing command line (pricing_cli)"""
+import json
+
+import pandas as pd
+import pytest
+
+from pricing_cli import main
+from pricing_engine import DEPLOYMENT_MODELS, calculate_costs, calculate_costs_cents
+
+RECORDS = """customer_id,annual_queries,size_template,deployment_model,years,growth_rate
+A-1,200000,,Customer VPC,3,0.15
+A-2,,Large,Uniphore VPC,2,0
+A-3,750000,,,1,
+"""
+
+@pytest.fixture
+def extract(tmp_path):
+    path = tmp_path / 'extract.csv'
+    path.write_text(RECORDS)
+    return path
+
+def test_prices_match_engine(extract, tmp_path):
+    output = tmp_path / 'quotes.csv'
+    main([str(extract), '-o', str(output), '--chunk-size', '2'])
+    quotes = pd.read_csv(output)
+
+    assert quotes.groupby('customer_id').size().to_dict() == {'A-1': 3, 'A-2': 2, 'A-3': 1}
+    first = quotes[quotes.customer_id == 'A-1']
+    expected = calculate_costs(200000, 150000, 5, DEPLOYMENT_MODELS['Customer VPC']['queries_per_credit'],
+                               years=3, growth_rate=0.15)
+    assert first.total_cost.tolist() == pytest.approx(expected.total_cost, rel=1e-12)
+
+def test_exact_cents(extract, tmp_path):
+    output = tmp_path / 'quotes.jsonl'
+    main([str(extract), '-o', str(output), '--credit-rounding', 'up'])
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    expected = calculate_costs_cents(200000, 150000, 5, DEPLOYMENT_MODELS['Customer VPC']['queries_per_credit'],
+                                     years=3, growth_rate=0.15, credit_rounding='up')
+    assert [row['total_cost'] for row in rows if row['customer_id'] == 'A-1'] == list(expected.total_cost)
+
+def test_bad_record_exits(tmp_path):
+    path = tmp_path / 'extract.csv'
+    path.write_text("customer_id,annual_queries\nB-1,-5\n")
+    with pytest.raises(SystemExit) as exit_info:
+        main([str(path), '-o', str(tmp_path / 'quotes.csv')])
+    assert exit_info.value.code == 1
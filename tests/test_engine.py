@@ -0,0 +1,109 @@
+"""Pricing engine (pricing_engine): the scalar, batch, exact-cents and monthly paths agree"""
+import numpy as np
+import pytest
+
+from pricing_engine import (
+    CREDIT_ROUNDING,
+    MONEY_METRICS,
+    aggregate_monthly_to_yearly,
+    batch_table,
+    calculate_costs,
+    calculate_costs_batch,
+    calculate_costs_cents,
+    calculate_costs_cents_batch,
+    monthly_timeline,
+)
+
+SCHEDULES = {
+    'flat': None,
+    'graduated': {'mode': 'graduated', 'tiers': [{'up_to': 500, 'credit_cost': 5}, {'up_to': 2500, 'credit_cost': 4.5},
+                                                 {'up_to': None, 'credit_cost': 4}]},
+    'all_units': {'mode': 'all_units', 'tiers': [{'up_to': 500, 'credit_cost': 5}, {'up_to': 2500, 'credit_cost': 4.5},
+                                                 {'up_to': None, 'credit_cost': 4}]},
+    'committed': {'mode': 'committed', 'committed_credits': 1000,
+                  'tiers': [{'up_to': 500, 'credit_cost': 5}, {'up_to': None, 'credit_cost': 4}]},
+}
+
+CURVES = [None, {'type': 'linear'}, {'type': 'logistic', 'saturation': 4},
+          {'type': 'custom', 'factors': [0.25, 1, 1.5]}]
+
+# Scenarios straddling the tier limits, with mixed horizons and growth rates
+SCENARIOS = {
+    'annual_queries': [1, 150000, 200000, 333333, 1000000, 4000000],
+    'platform_fee': [0, 150000, 150000, 99999.99, 250000, 150000],
+    'credit_cost': [5, 5, 4.37, 5, 0.01, 12.5],
+    'queries_per_credit': [400, 400, 100, 400, 250, 1000],
+    'years': [1, 3, 3, 5, 2, 4],
+    'growth_rate': [0, 0.15, 0.3, 0.07, 1.0, 0.15],
+}
+
+def scenario(i):
+    return {name: values[i] for name, values in SCENARIOS.items()}
+
+@pytest.mark.parametrize('schedule', SCHEDULES)
+@pytest.mark.parametrize('curve', range(len(CURVES)))
+def test_batch_matches_scalar(schedule, curve):
+    batch = calculate_costs_batch(**SCENARIOS, credit_schedule=SCHEDULES[schedule], growth_curve=CURVES[curve])
+    for i in range(len(SCENARIOS['years'])):
+        scalar = calculate_costs(**scenario(i), credit_schedule=SCHEDULES[schedule], growth_curve=CURVES[curve])
+        # Bit-identical, not just close
+        assert batch_table(batch, i).rows() == scalar.rows()
+
+@pytest.mark.parametrize('schedule', SCHEDULES)
+@pytest.mark.parametrize('rounding', CREDIT_ROUNDING)
+def test_cents_batch_matches_scalar(schedule, rounding):
+    batch = calculate_costs_cents_batch(**SCENARIOS, credit_schedule=SCHEDULES[schedule], credit_rounding=rounding,
+                                        growth_curve=CURVES[1])
+    for i in range(len(SCENARIOS['years'])):
+        scalar = calculate_costs_cents(**scenario(i), credit_schedule=SCHEDULES[schedule], credit_rounding=rounding,
+                                       growth_curve=CURVES[1])
+        table = batch_table(batch, i)
+        for key in MONEY_METRICS:
+            assert [int(c) for c in table.cents[key]] == list(scalar.cents[key])
+        assert table.rows() == scalar.rows()
+
+@pytest.mark.parametrize('schedule', SCHEDULES)
+def test_cents_match_float_to_the_cent(schedule):
+    # Whole queries every year (no growth) and fractional credits: the only difference is rounding to cents
+    inputs = dict(SCENARIOS, growth_rate=0)
+    exact = calculate_costs_cents_batch(**inputs, credit_schedule=SCHEDULES[schedule], credit_rounding='none')
+    approximate = calculate_costs_batch(**inputs, credit_schedule=SCHEDULES[schedule])
+    in_horizon = ~np.isnan(approximate['total_cost'])
+    for key in ('platform_fee', 'consumption_cost', 'total_cost'):
+        difference = exact['cents'][key][in_horizon] - approximate[key][in_horizon] * 100
+        assert np.abs(difference).max() <= 0.5 + 1e-6
+
+def test_whole_credits_match_float_exactly():
+    # Volumes in whole credits bill the same under every rounding, and in whole cents
+    inputs = dict(annual_queries=[400, 400000, 1200000], platform_fee=150000, credit_cost=5,
+                  queries_per_credit=400, years=1, growth_rate=0)
+    approximate = calculate_costs_batch(**inputs)
+    for rounding in CREDIT_ROUNDING:
+        exact = calculate_costs_cents_batch(**inputs, credit_rounding=rounding)
+        for key in ('queries', 'credits_needed', 'platform_fee', 'consumption_cost', 'total_cost'):
+            np.testing.assert_array_equal(exact[key], approximate[key])
+
+def test_cents_totals_add_up():
+    costs = calculate_costs_cents(**scenario(3), credit_schedule=SCHEDULES['graduated'])
+    assert costs.total('total_cost') * 100 == sum(costs.cents['total_cost'])
+    assert costs.total('total_cost') == pytest.approx(sum(costs.total_cost))
+
+@pytest.mark.parametrize('schedule', SCHEDULES)
+@pytest.mark.parametrize('curve', range(len(CURVES)))
+def test_monthly_roll_up_matches_projection(schedule, curve):
+    timeline = monthly_timeline(200000 / 12, 150000, 5, 400, 3, 0.15, growth_curve=CURVES[curve],
+                                credit_schedule=SCHEDULES[schedule])
+    costs = calculate_costs(200000, 150000, 5, 400, 3, 0.15, credit_schedule=SCHEDULES[schedule],
+                            growth_curve=CURVES[curve])
+    np.testing.assert_allclose(aggregate_monthly_to_yearly(timeline)['total_cost'][0], costs.total_cost, rtol=1e-12)
+
+@pytest.mark.parametrize('schedule', SCHEDULES)
+@pytest.mark.parametrize('rounding', CREDIT_ROUNDING)
+def test_monthly_cents_add_up_to_projection(schedule, rounding):
+    timeline = monthly_timeline(200000 / 12, 150000.01, 4.37, 400, 3, 0.15, growth_curve=CURVES[2],
+                                credit_schedule=SCHEDULES[schedule], credit_rounding=rounding)
+    costs = calculate_costs_cents(200000, 150000.01, 4.37, 400, 3, 0.15, credit_schedule=SCHEDULES[schedule],
+                                  credit_rounding=rounding, growth_curve=CURVES[2])
+    yearly = batch_table(aggregate_monthly_to_yearly(timeline))
+    for key in MONEY_METRICS:
+        assert [int(c) for c in yearly.cents[key]] == list(costs.cents[key])
@@ -0,0 +1,68 @@
+"""Chunked table export (pricing_exports)"""
+import io
+
+import pandas as pd
+import pandas.testing as pdt
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from pricing_exports import EXPORT_FORMATS, ChunkedTableWriter
+
+CHUNKS = [
+    pd.DataFrame({'customer_id': ['A-1', 'A-1', 'A-2'], 'year': [1, 2, 1], 'total_cost': [175000.5, 181250.25, 90000.0]}),
+    pd.DataFrame({'customer_id': ['A-3', 'A-4'], 'year': [1, 1], 'total_cost': [210000.75, 1.5]}),
+    pd.DataFrame({'customer_id': ['A-5'], 'year': [3], 'total_cost': [99.125]}),
+]
+
+def read_back(data, fmt):
+    """DataFrame from bytes written in fmt"""
+    if fmt == 'csv':
+        return pd.read_csv(io.BytesIO(data))
+    if fmt == 'jsonl':
+        return pd.read_json(io.BytesIO(data), lines=True)
+    if fmt == 'parquet':
+        return pq.read_table(io.BytesIO(data)).to_pandas()
+    return pa.ipc.open_file(io.BytesIO(data)).read_all().to_pandas()
+
+def write(fmt, chunks, **options):
+    out = io.BytesIO()
+    with ChunkedTableWriter(out, fmt, **options) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return writer, out.getvalue()
+
+@pytest.mark.parametrize('fmt', list(EXPORT_FORMATS))
+def test_chunks_round_trip(fmt):
+    writer, data = write(fmt, CHUNKS)
+    assert writer.rows == 6
+    pdt.assert_frame_equal(read_back(data, fmt), pd.concat(CHUNKS, ignore_index=True))
+
+def test_one_row_group_or_batch_per_chunk():
+    _, data = write('parquet', CHUNKS)
+    assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == len(CHUNKS)
+    _, data = write('arrow', CHUNKS)
+    assert pa.ipc.open_file(io.BytesIO(data)).num_record_batches == len(CHUNKS)
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet', 'arrow'])
+def test_later_chunks_cast_to_first_schema(fmt):
+    # Whole-valued costs come out of pandas as int64; the file keeps the first chunk's float64
+    whole = pd.DataFrame({'customer_id': ['A-6'], 'year': [2], 'total_cost': [120000]})
+    writer, data = write(fmt, [CHUNKS[0], whole])
+    assert writer.schema.field('total_cost').type == pa.float64()
+    result = read_back(data, fmt)
+    assert result['total_cost'].dtype == 'float64'
+    assert result['total_cost'].tolist()[-1] == 120000.0
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet', 'arrow'])
+@pytest.mark.parametrize('chunk', [
+    pd.DataFrame({'customer_id': ['A-6'], 'year': [2], 'total_cost': ['n/a']}),
+    pd.DataFrame({'customer_id': ['A-6'], 'year': [2]}),
+])
+def test_mismatched_chunk_raises(fmt, chunk):
+    with pytest.raises(ValueError, match="does not match the output columns"):
+        write(fmt, [CHUNKS[0], chunk])
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        ChunkedTableWriter(io.BytesIO(), 'xlsx')
@@ -0,0 +1,73 @@
+"""Derived value graph (pricing_graph)"""
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from pricing_graph import DerivedGraph
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'consumption_pricing_calculator.py')
+
+@pytest.fixture
+def graph():
+    graph = DerivedGraph()
+    graph.set(volume=1000, rate=0.1, price=5)
+    graph.node('year1', lambda volume, price: volume * price, 'volume', 'price')
+    graph.node('projection', lambda year1, rate: [year1 * (1 + rate) ** year for year in range(3)], 'year1', 'rate')
+    graph.node('total', lambda years: sum(years), years='projection')
+    graph.node('label', lambda price: f"${price}/credit", 'price')
+    for name in ('total', 'label'):
+        graph.get(name)
+    return graph
+
+def test_only_downstream_nodes_recompute(graph):
+    graph.begin_rerun()
+    graph.set(volume=1000, rate=0.2, price=5)
+    assert graph['total'] == pytest.approx(5000 + 6000 + 7200)
+    assert graph['label'] == '$5/credit'
+    assert graph.recomputed == ['projection', 'total']
+    assert set(graph.recomputed) <= set(graph.downstream('rate'))
+
+def test_unchanged_inputs_recompute_nothing(graph):
+    graph.begin_rerun()
+    graph.set(volume=1000, rate=0.1, price=5)
+    graph.get('total')
+    graph.get('label')
+    assert graph.recomputed == []
+    # 5 and 5.0 are different inputs
+    graph.set(price=5.0)
+    graph.get('label')
+    assert graph.recomputed == ['label']
+
+def test_equal_recomputed_value_stops_propagation(graph):
+    graph.begin_rerun()
+    graph.set(volume=500, price=10)
+    graph.get('total')
+    assert graph.recomputed == ['year1']
+
+def test_redefined_node_recomputes():
+    graph = DerivedGraph()
+    graph.set(x=2)
+    graph.node('double', lambda x: 2 * x, 'x')
+    assert graph['double'] == 4
+    graph.node('double', lambda y: 2 * y, y='x')
+    graph.begin_rerun()
+    assert graph['double'] == 4
+    assert graph.recomputed == ['double']
+
+def test_inputs_and_nodes_are_distinct(graph):
+    with pytest.raises(ValueError):
+        graph.set(total=1)
+    with pytest.raises(ValueError):
+        graph.node('rate', lambda: 0)
+    with pytest.raises(KeyError):
+        graph.get('missing')
+
+def test_page_growth_change_skips_deployment_comparison():
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    [slider for slider in at.slider if slider.label == 'Annual Growth Rate (%)'][0].set_value(30).run()
+    assert not at.exception
+    page_graph = at.session_state['derived_graph']
+    assert 'costs' in page_graph.recomputed
+    assert 'comparison' not in page_graph.recomputed
+    assert set(page_graph.recomputed) <= set(page_graph.downstream('growth_rate'))
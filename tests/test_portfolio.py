@@ -0,0 +1,65 @@
+"""Book roll-ups (pricing_portfolio)"""
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from pricing_engine import DEPLOYMENT_MODELS, SIZE_TEMPLATES, calculate_costs_batch
+from pricing_portfolio import ROLLUP_SUMS, default_options, price_portfolio, rollups
+
+MODELS = list(DEPLOYMENT_MODELS)[:2]
+TEMPLATES = [name for name, template in SIZE_TEMPLATES.items() if template.get('annual_queries')]
+
+@pytest.fixture
+def book():
+    rng = np.random.default_rng(7)
+    n = 60
+    book = pd.DataFrame({
+        'annual_queries': rng.integers(50000, 2000000, n).astype(float),
+        'size_template': None,
+        'deployment_model': [MODELS[i % 2] for i in range(n)],
+        'platform_fee': rng.integers(50, 300, n) * 1000.0,
+        'credit_cost': rng.choice([4.0, 5.0, 6.5], n),
+        'queries_per_credit': rng.choice([250.0, 400.0], n),
+        'years': rng.integers(1, 5, n),
+        'growth_rate': rng.choice([0.0, 0.1, 0.25], n),
+    })
+    # A third of the book is sized from templates instead
+    book.loc[::3, 'annual_queries'] = np.nan
+    book.loc[::3, 'size_template'] = [TEMPLATES[i % len(TEMPLATES)] for i in range(len(book.loc[::3]))]
+    return book
+
+def test_rollups_match_engine(book):
+    cube = price_portfolio(book, workers=1, chunk_size=7)
+
+    queries = book['annual_queries'].fillna(book['size_template'].map(
+        lambda name: SIZE_TEMPLATES[name]['annual_queries'] if name else np.nan))
+    result = calculate_costs_batch(queries.to_numpy(), book['platform_fee'].to_numpy(), book['credit_cost'].to_numpy(),
+                                   book['queries_per_credit'].to_numpy(), book['years'].to_numpy(),
+                                   book['growth_rate'].to_numpy())
+    tables = rollups(cube)
+    by_year = tables['year'].set_index('year')
+    for key in ROLLUP_SUMS[1:]:
+        assert by_year[key].to_numpy() == pytest.approx(np.nansum(result[key], axis=0))
+    assert by_year['accounts'].tolist() == (~np.isnan(result['total_cost'])).sum(axis=0).tolist()
+
+    by_model = tables['deployment_model'].groupby('deployment_model')['total_cost'].sum()
+    for model in MODELS:
+        rows = (book['deployment_model'] == model).to_numpy()
+        assert by_model[model] == pytest.approx(np.nansum(result['total_cost'][rows]))
+    by_template = tables['size_template'].groupby('size_template')['accounts'].sum()
+    assert by_template['Direct'] == book['years'][book['annual_queries'].notna()].sum()
+
+@pytest.mark.parametrize('credit_rounding', [None, 'up'])
+def test_parallel_matches_serial(book, credit_rounding):
+    defaults = default_options(credit_rounding=credit_rounding)
+    serial = price_portfolio(book, defaults, workers=1, chunk_size=9)
+    parallel = price_portfolio(book, defaults, workers=2, chunk_size=9)
+    if credit_rounding:
+        pdt.assert_frame_equal(parallel, serial)
+    else:
+        pdt.assert_frame_equal(parallel, serial, check_exact=False, rtol=1e-12)
+
+def test_empty_book():
+    cube = price_portfolio(pd.DataFrame({'annual_queries': []}), workers=1)
+    assert cube.empty
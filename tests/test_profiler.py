@@ -0,0 +1,47 @@
+"""Render timing (pricing_profiler)"""
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from pricing_profiler import NULL_PROFILER, RerunProfiler, history_table
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'consumption_pricing_calculator.py')
+
+def test_one_timing_per_section():
+    profiler = RerunProfiler()
+    profiler.section("Setup")
+    square = profiler.timed("square", lambda x: x * x)
+    profiler.section("Sidebar")
+    assert square(3) == 9
+    profiler.section("Export")
+    record = profiler.finish()
+
+    assert [name for name, _ in record['sections']] == ["Setup", "Sidebar", "Export"]
+    assert all(seconds >= 0 for _, seconds in record['sections'])
+    assert sum(seconds for _, seconds in record['sections']) <= record['total_s']
+    assert [(section, name) for section, name, _ in record['calls']] == [("Sidebar", "square")]
+    assert record['cprofile'] is None
+
+def test_null_profiler_is_a_no_op():
+    func = lambda: 1
+    NULL_PROFILER.section("Setup")
+    assert NULL_PROFILER.timed("func", func) is func
+
+def test_history_table_rows_per_rerun():
+    history = [{'started_at': '10:00:00', 'total_s': 0.5, 'sections': [("Setup", 0.1), ("Sidebar", 0.4)]},
+               {'started_at': '10:00:05', 'total_s': 0.2, 'sections': [("Setup", 0.2)]}]
+    assert history_table(history) == {'Rerun': ['10:00:05', '10:00:00'], 'Total (ms)': [200.0, 500.0],
+                                      'Setup': [200.0, 100.0], 'Sidebar': [None, 400.0]}
+
+def test_page_records_each_section_once_per_rerun(monkeypatch):
+    monkeypatch.setenv('PRICING_PROFILE', '1')
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    at.run()
+    assert not at.exception
+    history = at.session_state['profile_history']
+    assert len(history) == 2
+    for record in history:
+        names = [name for name, _ in record['sections']]
+        assert len(names) == len(set(names))
+        assert names[0] == "Setup" and names[-1] == "Saved Quotes"
+    assert [name for name, _ in history[0]['sections']] == [name for name, _ in history[1]['sections']]
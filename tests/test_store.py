@@ -0,0 +1,58 @@
+"""Scenario store (pricing_store)"""
+import sqlite3
+from contextlib import closing
+
+import pytest
+
+from pricing_engine import calculate_costs
+from pricing_store import ScenarioStore, content_hash, quote_hash
+
+INPUTS = {'annual_queries': 200000, 'platform_fee': 150000, 'credit_cost': 5, 'queries_per_credit': 400,
+          'years': 3, 'growth_rate': 0.15}
+
+@pytest.fixture
+def store(tmp_path):
+    return ScenarioStore(str(tmp_path / 'data' / 'scenarios.db'))
+
+def stored_results(store):
+    """Number of result rows in the store"""
+    with closing(sqlite3.connect(store.path)) as connection:
+        return connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+def test_hash_ignores_key_order_and_whole_floats():
+    reordered = dict(reversed(list(INPUTS.items())), platform_fee=150000.0)
+    assert content_hash(reordered) == content_hash(INPUTS)
+    assert quote_hash('Customer VPC', reordered) == quote_hash('Customer VPC', INPUTS)
+    assert quote_hash('Customer VPC', INPUTS) != quote_hash('SaaS', INPUTS)
+
+def test_deployment_model_is_part_of_the_scenario(store):
+    costs = calculate_costs(**INPUTS)
+    vpc = store.save_quote('Acme Corp', 'Customer VPC', INPUTS, costs)
+    saas = store.save_quote('Acme Corp', 'SaaS', INPUTS, costs)
+    assert vpc != saas and stored_results(store) == 2
+    assert [q['id'] for q in store.list_quotes(inputs_hash=quote_hash('SaaS', INPUTS))] == [saas]
+    assert store.load_quote(saas)['deployment_model'] == 'SaaS'
+
+def test_quotes_share_results(store):
+    costs = calculate_costs(**INPUTS)
+    first = store.save_quote('Acme Corp', 'Customer VPC', INPUTS, costs)
+    # Saving the same inputs for the same customer (any case) refreshes the quote
+    assert store.save_quote('ACME CORP', 'Customer VPC', INPUTS, costs) == first
+    other = store.save_quote('Acme Labs', 'Customer VPC', INPUTS, costs)
+
+    assert store.count_quotes(customer='acme') == 2
+    assert [q['id'] for q in store.list_quotes(customer='acme labs')] == [other]
+    quote = store.load_quote(first)
+    assert quote['inputs'] == INPUTS and quote['costs'] == costs
+    assert quote['hash'] == quote_hash('Customer VPC', INPUTS)
+    assert stored_results(store) == 1
+
+    assert store.delete_quote(first)
+    assert stored_results(store) == 1
+    assert store.delete_quote(other)
+    assert stored_results(store) == 0
+    assert not store.delete_quote(other)
+
+def test_customer_name_required(store):
+    with pytest.raises(ValueError):
+        store.save_quote('  ', 'Customer VPC', INPUTS, calculate_costs(**INPUTS))
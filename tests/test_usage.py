@@ -0,0 +1,49 @@
+"""Query log ingestion (pricing_usage)"""
+import os
+
+import pytest
+
+from pricing_usage import aggregate_usage_file, list_usage_logs, usage_log_path
+
+LOG = "timestamp,deployment,credits\n2026-01-10T10:00:00,Customer VPC,0.0025\n2026-02-03T09:30:00,Customer VPC,0.0025\n"
+
+@pytest.fixture
+def log_dir(tmp_path):
+    logs = tmp_path / 'logs'
+    logs.mkdir()
+    (logs / 'queries.csv').write_text(LOG)
+    (logs / 'notes.txt').write_text("not a log")
+    (tmp_path / 'secret.csv').write_text(LOG)
+    os.symlink(tmp_path / 'secret.csv', logs / 'linked.csv')
+    return logs
+
+def test_lists_only_logs_inside_the_directory(log_dir):
+    assert list_usage_logs(str(log_dir)) == ['queries.csv']
+    assert list_usage_logs(None) == []
+
+@pytest.mark.parametrize('name', ['../secret.csv', 'linked.csv', '/etc/passwd', '.', ''])
+def test_paths_outside_the_directory_are_rejected(log_dir, name):
+    with pytest.raises(ValueError):
+        usage_log_path(name, str(log_dir))
+
+def test_reads_a_log_from_the_directory(log_dir):
+    usage = aggregate_usage_file(usage_log_path('queries.csv', str(log_dir)))
+    assert usage['month'] == ['2026-01', '2026-02']
+
+def test_no_directory_configured():
+    with pytest.raises(ValueError):
+        usage_log_path('queries.csv', None)
+
+@pytest.mark.parametrize('suffix, log', [
+    ('csv', "timestamp,deployment,credits\n2026-01-10T10:00:00,Customer VPC,1\n,Customer VPC,1\nyesterday,Customer VPC,1\n"),
+    ('jsonl', '{"timestamp": "2026-01-10T10:00:00", "deployment": "Customer VPC", "credits": 1}\n'
+              '{"timestamp": "", "deployment": "Customer VPC", "credits": 1}\n'
+              '{"timestamp": null, "deployment": "Customer VPC", "credits": 1}\n'),
+])
+def test_lines_without_a_usable_timestamp_are_skipped(tmp_path, suffix, log):
+    path = tmp_path / f'queries.{suffix}'
+    path.write_text(log)
+    usage = aggregate_usage_file(str(path))
+    assert usage['month'] == ['2026-01']
+    assert usage['queries']['Customer VPC'].tolist() == [1]
+    assert (usage['lines'], usage['skipped']) == (3, 2)